@@ -0,0 +1,330 @@
+# 📄 backend/analyzers/dex_parser.py - Streaming DEX Opcode and API-Call Features
+# ================================================================================
+
+import os
+import re
+import mmap
+import struct
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+DEX_MAGIC = b'dex\n'
+DEX_ENTRY_PATTERN = re.compile(r'^classes\d*\.dex$')
+SPOOL_CHUNK_BYTES = 64 * 1024  # zipfile keeps about two chunks of inflate buffers
+MAX_DEX_BYTES = 128 * 1024 * 1024  # uncompressed size per classes*.dex (real ones stay well under 64MB)
+TYPE_CODE_ITEM = 0x2001
+
+# magic, checksum, signature, file_size, header_size, endian_tag, link (size, off), map_off,
+# then (size, off) for string_ids, type_ids, proto_ids, field_ids, method_ids, class_defs, data
+_HEADER = struct.Struct('<8sI20s20I')
+_MAP_ITEM = struct.Struct('<HHII')
+_CODE_ITEM = struct.Struct('<HHHHII')
+_METHOD_ID = np.dtype([('class_idx', '<u2'), ('proto_idx', '<u2'), ('name_idx', '<u4')])
+
+# Instruction width in 16-bit code units per opcode (Dalvik bytecode formats)
+OPCODE_WIDTHS = (
+    [1, 1, 2, 3, 1, 2, 3, 1, 2, 3, 1, 1, 1, 1, 1, 1,      # 0x00 nop .. 0x0f return
+     1, 1, 1, 2, 3, 2, 2, 3, 5, 2, 2, 3, 2, 1, 1, 2,      # 0x10 return-wide .. 0x1f check-cast
+     2, 1, 2, 2, 3, 3, 3, 1, 1, 2, 3, 3, 3, 2, 2, 2]      # 0x20 instance-of .. 0x2f cmpg-float
+    + [2] * 2 + [2] * 12 + [1] * 6                        # cmp-long, cmpg-double; if-*; unused
+    + [2] * 14 + [2] * 14 + [2] * 14                      # aget/aput, iget/iput, sget/sput
+    + [3] * 5 + [1] + [3] * 5 + [1] * 2                   # invoke-*, unused, invoke-*/range, unused
+    + [1] * 21 + [2] * 32 + [1] * 32 + [2] * 8 + [2] * 11  # unop, binop, binop/2addr, lit16, lit8
+    + [1] * 23 + [4, 4, 3, 3, 2, 2]                       # unused, invoke-polymorphic/custom, const-method-*
+)
+INVOKE_OPCODES = frozenset(range(0x6e, 0x73)) | frozenset(range(0x74, 0x79))
+# First code unit of the switch / array-data payloads embedded in method bodies
+PAYLOAD_IDENTS = frozenset((0x0100, 0x0200, 0x0300))
+
+# Opcode families reported as opcode_<family> (share of all instructions)
+OPCODE_FAMILIES = {
+    'nop': [(0x00, 0x00)],
+    'move': [(0x01, 0x0d)],
+    'return': [(0x0e, 0x11)],
+    'const': [(0x12, 0x1c), (0xfe, 0xff)],
+    'monitor': [(0x1d, 0x1e)],
+    'type_check': [(0x1f, 0x20)],
+    'new_instance': [(0x22, 0x22)],
+    'array': [(0x21, 0x21), (0x23, 0x26), (0x44, 0x51)],
+    'throw': [(0x27, 0x27)],
+    'goto': [(0x28, 0x2a)],
+    'switch': [(0x2b, 0x2c)],
+    'compare': [(0x2d, 0x31)],
+    'branch': [(0x32, 0x3d)],
+    'instance_field': [(0x52, 0x5f)],
+    'static_field': [(0x60, 0x6d)],
+    'invoke': [(0x6e, 0x72), (0x74, 0x78), (0xfa, 0xfd)],
+    'arithmetic': [(0x7b, 0xe2)]
+}
+
+# Sensitive framework calls reported as api_<Class>_<method> (1 when the code calls them)
+SENSITIVE_APIS = {
+    'api_SmsManager_sendTextMessage': ('Landroid/telephony/SmsManager;', 'sendTextMessage'),
+    'api_SmsManager_sendMultipartTextMessage': ('Landroid/telephony/SmsManager;', 'sendMultipartTextMessage'),
+    'api_TelephonyManager_getDeviceId': ('Landroid/telephony/TelephonyManager;', 'getDeviceId'),
+    'api_TelephonyManager_getSubscriberId': ('Landroid/telephony/TelephonyManager;', 'getSubscriberId'),
+    'api_TelephonyManager_getLine1Number': ('Landroid/telephony/TelephonyManager;', 'getLine1Number'),
+    'api_TelephonyManager_getSimSerialNumber': ('Landroid/telephony/TelephonyManager;', 'getSimSerialNumber'),
+    'api_PackageManager_getInstalledPackages': ('Landroid/content/pm/PackageManager;', 'getInstalledPackages'),
+    'api_ActivityManager_getRunningTasks': ('Landroid/app/ActivityManager;', 'getRunningTasks'),
+    'api_WindowManager_addView': ('Landroid/view/WindowManager;', 'addView'),
+    'api_AccessibilityService_performGlobalAction': ('Landroid/accessibilityservice/AccessibilityService;',
+                                                     'performGlobalAction'),
+    'api_DevicePolicyManager_lockNow': ('Landroid/app/admin/DevicePolicyManager;', 'lockNow'),
+    'api_ClipboardManager_getPrimaryClip': ('Landroid/content/ClipboardManager;', 'getPrimaryClip'),
+    'api_LocationManager_getLastKnownLocation': ('Landroid/location/LocationManager;', 'getLastKnownLocation'),
+    'api_MediaRecorder_start': ('Landroid/media/MediaRecorder;', 'start'),
+    'api_Runtime_exec': ('Ljava/lang/Runtime;', 'exec'),
+    'api_DexClassLoader_init': ('Ldalvik/system/DexClassLoader;', '<init>'),
+    'api_Method_invoke': ('Ljava/lang/reflect/Method;', 'invoke'),
+    'api_Cipher_getInstance': ('Ljavax/crypto/Cipher;', 'getInstance')
+}
+
+DEX_FEATURE_PREFIXES = ('opcode_', 'api_')
+
+
+def _family_lookup():
+    """Opcode -> family index (-1 for unused opcodes)"""
+    lookup = np.full(256, -1, dtype=np.intp)
+    for i, ranges in enumerate(OPCODE_FAMILIES.values()):
+        for low, high in ranges:
+            lookup[low:high + 1] = i
+    return lookup
+
+
+_OPCODE_FAMILY = _family_lookup()
+
+
+def dex_entries(apk):
+    """classes.dex, classes2.dex, ... of an open APK, in load order"""
+    names = [name for name in apk.namelist() if DEX_ENTRY_PATTERN.match(name)]
+    return sorted(names, key=lambda name: (len(name), name))
+
+
+def extract_dex_features(apk_path, n_jobs=-1, max_dex_bytes=MAX_DEX_BYTES):
+    """opcode_* and api_* features of every classes*.dex in an APK
+
+    Each DEX is streamed out of the archive into a temporary file and memory
+    mapped, so peak memory does not grow with the DEX size: tables are read
+    in place and only fixed-size counters are kept. Multidex APKs are parsed
+    in a process pool of up to n_jobs workers (-1 for all CPUs); an APK given
+    as an open file object (an in-memory upload) is parsed in this process.
+    A DEX larger than max_dex_bytes uncompressed raises ValueError before
+    it can fill the disk (compression bombs).
+    """
+    with zipfile.ZipFile(apk_path) as apk:
+        entries = dex_entries(apk)
+    if not entries:
+        return {}
+
+    n_workers = min(os.cpu_count() if n_jobs in (None, -1) else n_jobs, len(entries))
+    if n_workers > 1 and isinstance(apk_path, (str, os.PathLike)):
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(count_dex_entry, [apk_path] * len(entries), entries,
+                                    [max_dex_bytes] * len(entries)))
+    else:
+        results = [count_dex_entry(apk_path, entry, max_dex_bytes) for entry in entries]
+
+    opcodes = np.sum([result['opcodes'] for result in results], axis=0)
+    api_calls = {name: sum(result['api_calls'][name] for result in results) for name in SENSITIVE_APIS}
+    return counts_to_features(opcodes, api_calls)
+
+
+def counts_to_features(opcodes, api_calls):
+    """Feature dict from per-opcode counts and sensitive API call counts"""
+    family_counts = np.bincount(_OPCODE_FAMILY[_OPCODE_FAMILY >= 0], weights=np.asarray(opcodes)[_OPCODE_FAMILY >= 0],
+                                minlength=len(OPCODE_FAMILIES))
+    total = max(float(np.sum(opcodes)), 1.0)
+    features = {f'opcode_{family}': round(float(count) / total, 6)
+                for family, count in zip(OPCODE_FAMILIES, family_counts)}
+    features.update({name: int(count > 0) for name, count in api_calls.items()})
+    return features
+
+
+def count_dex_entry(apk_path, entry, max_dex_bytes=MAX_DEX_BYTES):
+    """Opcode and sensitive-API counts of one DEX entry (runs in a pool worker for multidex APKs)"""
+    with tempfile.TemporaryFile(prefix='bankguard_dex_') as spool:
+        with zipfile.ZipFile(apk_path) as apk:
+            info = apk.getinfo(entry)
+            if info.file_size > max_dex_bytes:
+                raise ValueError(f"{entry} is {info.file_size} bytes uncompressed (limit {max_dex_bytes})")
+            # Never spool more than the declared size or the limit, whatever the stream yields
+            limit = min(info.file_size, max_dex_bytes)
+            spooled = 0
+            with apk.open(info) as source:
+                while True:
+                    chunk = source.read(SPOOL_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    spooled += len(chunk)
+                    if spooled > limit:
+                        raise ValueError(f"{entry} inflates past {limit} bytes")
+                    spool.write(chunk)
+        spool.flush()
+        if spool.tell() == 0:
+            raise ValueError(f"{entry} is empty")
+        with mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            reader = DexReader(data)
+            try:
+                return reader.count()
+            finally:
+                reader.release()
+
+
+class DexReader:
+    """Reads the tables of a DEX file in place from a buffer (a memory map)
+
+    Call release() before closing the buffer: the tables are views into it.
+    """
+
+    def __init__(self, data):
+        if len(data) < _HEADER.size or data[:4] != DEX_MAGIC:
+            raise ValueError("Not a DEX file")
+        header = _HEADER.unpack_from(data, 0)
+        (_, _, endian_tag, _, _, self.map_off,
+         string_ids_size, string_ids_off, type_ids_size, type_ids_off, _, _, _, _,
+         method_ids_size, method_ids_off) = header[3:19]
+        if endian_tag != 0x12345678:
+            raise ValueError("Unsupported DEX byte order")
+
+        self.data = data
+        self.view = memoryview(data)
+        self.string_ids = np.frombuffer(data, dtype='<u4', count=string_ids_size, offset=string_ids_off)
+        self.type_ids = np.frombuffer(data, dtype='<u4', count=type_ids_size, offset=type_ids_off)
+        self.method_ids = np.frombuffer(data, dtype=_METHOD_ID, count=method_ids_size, offset=method_ids_off)
+
+    def release(self):
+        self.string_ids = self.type_ids = self.method_ids = None
+        self.view.release()
+
+    def string(self, index):
+        """Decoded string_ids[index] (MUTF-8 read as UTF-8; exact for the ASCII names looked up here)"""
+        position = int(self.string_ids[index])
+        while self.data[position] & 0x80:  # uleb128 UTF-16 length
+            position += 1
+        end = self.data.find(b'\0', position + 1)
+        return self.data[position + 1:end].decode('utf-8', errors='replace')
+
+    def find_string(self, value):
+        """Index of a string in the (sorted) string table, or None"""
+        low, high = 0, len(self.string_ids)
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(middle) < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < len(self.string_ids) and self.string(low) == value else None
+
+    def find_type(self, descriptor):
+        """Index of a type descriptor in the (sorted) type table, or None"""
+        string_index = self.find_string(descriptor)
+        if string_index is None:
+            return None
+        type_index = int(np.searchsorted(self.type_ids, string_index))
+        return type_index if type_index < len(self.type_ids) and self.type_ids[type_index] == string_index else None
+
+    def sensitive_methods(self):
+        """method_ids index -> SENSITIVE_APIS feature name, for the sensitive methods this DEX references"""
+        methods = {}
+        for feature, (descriptor, name) in SENSITIVE_APIS.items():
+            type_index, name_index = self.find_type(descriptor), self.find_string(name)
+            if type_index is None or name_index is None:
+                continue
+            matches = (self.method_ids['class_idx'] == type_index) & (self.method_ids['name_idx'] == name_index)
+            methods.update({int(index): feature for index in np.flatnonzero(matches)})
+        return methods
+
+    def code_items(self):
+        """(first unit offset, unit count) of every method body, from the map list"""
+        data = self.view
+        count = struct.unpack_from('<I', data, self.map_off)[0]
+        for i in range(count):
+            item_type, _, size, offset = _MAP_ITEM.unpack_from(data, self.map_off + 4 + i * _MAP_ITEM.size)
+            if item_type != TYPE_CODE_ITEM:
+                continue
+            position = offset
+            for _ in range(size):
+                position = (position + 3) & ~3
+                _, _, _, tries_size, _, insns_size = _CODE_ITEM.unpack_from(data, position)
+                insns = position + _CODE_ITEM.size
+                yield insns, insns_size
+                position = insns + 2 * insns_size
+                if tries_size:
+                    position += (2 if insns_size % 2 else 0) + 8 * tries_size
+                    position = self._skip_handlers(position)
+
+    def _skip_handlers(self, position):
+        """Offset after an encoded_catch_handler_list"""
+        size, position = _read_uleb128(self.data, position)
+        for _ in range(size):
+            handlers, position = _read_sleb128(self.data, position)
+            for _ in range(2 * abs(handlers) + (1 if handlers <= 0 else 0)):
+                _, position = _read_uleb128(self.data, position)
+        return position
+
+    def count(self):
+        """Per-opcode instruction counts and sensitive API call counts over all method bodies"""
+        opcodes = [0] * 256
+        api_calls = dict.fromkeys(SENSITIVE_APIS, 0)
+        sensitive = self.sensitive_methods()
+        widths = OPCODE_WIDTHS
+
+        for start, n_units in self.code_items():
+            units = self.view[start:start + 2 * n_units].cast('H')
+            i = 0
+            while i < n_units:
+                unit = units[i]
+                opcode = unit & 0xFF
+                if unit in PAYLOAD_IDENTS:
+                    i += _payload_width(units, i)
+                    continue
+                opcodes[opcode] += 1
+                if opcode in INVOKE_OPCODES and sensitive:
+                    feature = sensitive.get(units[i + 1])
+                    if feature is not None:
+                        api_calls[feature] += 1
+                i += widths[opcode]
+            units.release()
+
+        return {'opcodes': opcodes, 'api_calls': api_calls}
+
+
+def _payload_width(units, i):
+    """Code units of a switch / array-data payload pseudo-instruction"""
+    ident = units[i]
+    if ident == 0x0100:  # packed-switch-payload
+        return 4 + 2 * units[i + 1]
+    if ident == 0x0200:  # sparse-switch-payload
+        return 2 + 4 * units[i + 1]
+    # fill-array-data-payload
+    element_width = units[i + 1]
+    size = units[i + 2] | (units[i + 3] << 16)
+    return 4 + (size * element_width + 1) // 2
+
+
+def _read_uleb128(data, position):
+    result, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def _read_sleb128(data, position):
+    result, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            if byte & 0x40:
+                result -= 1 << shift
+            return result, position
+
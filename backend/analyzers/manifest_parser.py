@@ -0,0 +1,238 @@
+# 📄 backend/analyzers/manifest_parser.py - Android Binary XML Manifest Parser
+# ================================================================================
+
+import struct
+import zipfile
+import zlib
+import xml.etree.ElementTree as ElementTree
+
+MANIFEST_ENTRY = 'AndroidManifest.xml'
+MAX_MANIFEST_BYTES = 4 * 1024 * 1024  # real manifests are a few KB to a few hundred KB
+
+# Chunk types (frameworks/base/libs/androidfw/include/androidfw/ResourceTypes.h)
+RES_STRING_POOL_TYPE = 0x0001
+RES_XML_TYPE = 0x0003
+RES_XML_START_NAMESPACE_TYPE = 0x0100
+RES_XML_END_NAMESPACE_TYPE = 0x0101
+RES_XML_START_ELEMENT_TYPE = 0x0102
+RES_XML_END_ELEMENT_TYPE = 0x0103
+RES_XML_RESOURCE_MAP_TYPE = 0x0180
+
+UTF8_FLAG = 0x100
+NO_ENTRY = 0xFFFFFFFF
+TYPE_STRING = 0x03
+ANDROID_NAME_RESOURCE_ID = 0x01010003  # android:name
+ANDROID_NAMESPACE = 'http://schemas.android.com/apk/res/android'
+
+PERMISSION_TAGS = frozenset(('uses-permission', 'uses-permission-sdk-23', 'uses-permission-sdk-m'))
+
+_CHUNK_HEADER = struct.Struct('<HHI')
+_STRING_POOL_HEADER = struct.Struct('<IIIII')
+_START_ELEMENT = struct.Struct('<IIHHH')
+_ATTRIBUTE = struct.Struct('<IIIHBBI')
+
+
+class InvalidAPKError(ValueError):
+    """The upload is not an APK whose manifest can be read (not a zip, no or malformed manifest)"""
+
+
+class ManifestInfo:
+    """What the classifier needs from a manifest: package, requested permissions, intent-filter actions"""
+
+    __slots__ = ('package', 'permissions', 'intent_actions')
+
+    def __init__(self, package=None, permissions=None, intent_actions=None):
+        self.package = package
+        self.permissions = permissions if permissions is not None else set()
+        self.intent_actions = intent_actions if intent_actions is not None else set()
+
+    def to_dict(self):
+        return {
+            'package': self.package,
+            'permissions': sorted(self.permissions),
+            'intent_actions': sorted(self.intent_actions)
+        }
+
+
+def read_apk_manifest(apk_path):
+    """ManifestInfo of an APK (path or seekable file object), reading only its AndroidManifest.xml entry
+
+    Raises InvalidAPKError for anything that is not a readable APK, including
+    manifests over MAX_MANIFEST_BYTES uncompressed (compression bombs).
+    """
+    try:
+        with zipfile.ZipFile(apk_path) as apk:
+            try:
+                info = apk.getinfo(MANIFEST_ENTRY)
+            except KeyError:
+                raise InvalidAPKError(f"APK has no {MANIFEST_ENTRY}")
+            if info.file_size > MAX_MANIFEST_BYTES:
+                raise InvalidAPKError(f"{MANIFEST_ENTRY} is {info.file_size} bytes uncompressed "
+                                      f"(limit {MAX_MANIFEST_BYTES})")
+            # The declared size bounds what is inflated: zipfile stops reading there
+            data = apk.read(info)
+    except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError, RuntimeError) as e:
+        raise InvalidAPKError(f"Not a readable APK: {str(e)}") from e
+    return parse_manifest(data)
+
+
+def parse_manifest(data):
+    """ManifestInfo of a manifest in Android binary XML (or, for unbuilt sources, plain XML)
+
+    Raises InvalidAPKError when the manifest is malformed.
+    """
+    try:
+        if data[:1] == b'<' or data[:3] == b'\xef\xbb\xbf':
+            return _parse_text_manifest(data)
+        return _BinaryXmlParser(data).parse()
+    except InvalidAPKError:
+        raise
+    except (ValueError, struct.error, IndexError, ElementTree.ParseError) as e:
+        raise InvalidAPKError(f"Malformed {MANIFEST_ENTRY}: {str(e)}") from e
+
+
+class _BinaryXmlParser:
+    """Single pass over the chunks of an Android binary XML document
+
+    Only element and attribute names are compared, and pool strings are
+    decoded lazily (once each) when an element of interest refers to them;
+    the document is never expanded into a tree.
+    """
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.string_offsets = ()
+        self.strings_start = 0
+        self.utf8 = False
+        self.resource_ids = ()
+        self._decoded = {}
+        self._depth = 0
+        self._intent_filter_depth = None
+
+    def parse(self):
+        """ManifestInfo of the document
+
+        Sizes are clamped the way Android's own parser tolerates them:
+        obfuscated manifests often declare a document or chunk size larger than
+        the file, and a chunk that cannot be decoded is skipped rather than
+        failing the whole manifest. Parsing stops at a chunk too small to step
+        over (everything read up to there is kept).
+        """
+        data = self.data
+        if len(data) < 8:
+            raise ValueError("Manifest is too short to be binary XML")
+        chunk_type, header_size, document_size = _CHUNK_HEADER.unpack_from(data, 0)
+        if chunk_type != RES_XML_TYPE:
+            raise ValueError(f"Not an Android binary XML document (chunk type 0x{chunk_type:04x})")
+        end = document_size if header_size <= document_size <= len(data) else len(data)
+
+        info = ManifestInfo()
+        offset = header_size if 8 <= header_size < end else 8
+        while offset + 8 <= end:
+            chunk_type, header_size, chunk_size = _CHUNK_HEADER.unpack_from(data, offset)
+            if chunk_size < 8:
+                break
+            chunk_size = min(chunk_size, end - offset)
+            try:
+                self._read_chunk(info, offset, chunk_type, header_size, chunk_size)
+            except (struct.error, IndexError):
+                pass
+            offset += chunk_size
+        return info
+
+    def _read_chunk(self, info, offset, chunk_type, header_size, chunk_size):
+        data = self.data
+        if chunk_type == RES_STRING_POOL_TYPE:
+            self._read_string_pool(offset, header_size)
+        elif chunk_type == RES_XML_RESOURCE_MAP_TYPE:
+            count = (chunk_size - header_size) // 4
+            self.resource_ids = struct.unpack_from(f'<{count}I', data, offset + header_size)
+        elif chunk_type == RES_XML_START_ELEMENT_TYPE:
+            self._depth += 1
+            tag = self._string(_START_ELEMENT.unpack_from(data, offset + header_size)[1])
+            if tag in PERMISSION_TAGS:
+                name = self._attribute(offset, header_size, 'name')
+                if name:
+                    info.permissions.add(name)
+            elif tag == 'action' and self._intent_filter_depth is not None:
+                name = self._attribute(offset, header_size, 'name')
+                if name:
+                    info.intent_actions.add(name)
+            elif tag == 'intent-filter':
+                self._intent_filter_depth = self._depth
+            elif tag == 'manifest' and info.package is None:
+                info.package = self._attribute(offset, header_size, 'package')
+        elif chunk_type == RES_XML_END_ELEMENT_TYPE:
+            if self._depth == self._intent_filter_depth:
+                self._intent_filter_depth = None
+            self._depth -= 1
+
+    def _read_string_pool(self, offset, header_size):
+        string_count, _, flags, strings_start, _ = _STRING_POOL_HEADER.unpack_from(self.data, offset + 8)
+        self.string_offsets = struct.unpack_from(f'<{string_count}I', self.data, offset + header_size)
+        self.strings_start = offset + strings_start
+        self.utf8 = bool(flags & UTF8_FLAG)
+        self._decoded = {}
+
+    def _string(self, index):
+        """Pool string by index (None for no entry), decoded on first use"""
+        if index == NO_ENTRY or index >= len(self.string_offsets):
+            return None
+        value = self._decoded.get(index)
+        if value is None:
+            value = self._decode(self.strings_start + self.string_offsets[index])
+            self._decoded[index] = value
+        return value
+
+    def _decode(self, position):
+        data = self.data
+        if self.utf8:
+            # UTF-16 length then UTF-8 byte length, each 1 byte or 2 with the high bit set
+            position += 2 if data[position] & 0x80 else 1
+            length = data[position]
+            if length & 0x80:
+                length = ((length & 0x7F) << 8) | data[position + 1]
+                position += 1
+            position += 1
+            return bytes(data[position:position + length]).decode('utf-8', errors='replace')
+
+        length = data[position] | (data[position + 1] << 8)
+        if length & 0x8000:
+            length = ((length & 0x7FFF) << 16) | data[position + 2] | (data[position + 3] << 8)
+            position += 2
+        position += 2
+        return bytes(data[position:position + 2 * length]).decode('utf-16-le', errors='replace')
+
+    def _attribute(self, offset, header_size, wanted):
+        """String value of an element attribute by name ('name' also matches by android:name resource ID)"""
+        element = offset + header_size
+        _, _, attribute_start, attribute_size, attribute_count = _START_ELEMENT.unpack_from(self.data, element)
+        position = element + attribute_start
+        for _ in range(attribute_count):
+            _, name, raw_value, _, _, data_type, value = _ATTRIBUTE.unpack_from(self.data, position)
+            position += attribute_size
+
+            # Obfuscated manifests may blank attribute names but keep their resource IDs
+            resource_id = self.resource_ids[name] if name < len(self.resource_ids) else None
+            if (wanted == 'name' and resource_id == ANDROID_NAME_RESOURCE_ID) or self._string(name) == wanted:
+                if raw_value != NO_ENTRY:
+                    return self._string(raw_value)
+                # References (@string/...) would need resources.arsc and are skipped
+                return self._string(value) if data_type == TYPE_STRING else None
+        return None
+
+
+def _parse_text_manifest(data):
+    """ManifestInfo of a plain-text AndroidManifest.xml"""
+    name_attribute = f'{{{ANDROID_NAMESPACE}}}name'
+    root = ElementTree.fromstring(data)
+    info = ManifestInfo(package=root.get('package'))
+    for element in root.iter():
+        if element.tag in PERMISSION_TAGS and element.get(name_attribute):
+            info.permissions.add(element.get(name_attribute))
+        elif element.tag == 'intent-filter':
+            info.intent_actions.update(
+                action.get(name_attribute) for action in element.iter('action') if action.get(name_attribute)
+            )
+    return info
+
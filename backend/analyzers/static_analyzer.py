@@ -0,0 +1,184 @@
+# 📄 backend/analyzers/static_analyzer.py - Feature Extraction
+# ================================================================================
+
+import logging
+
+from analyzers.dex_parser import DEX_FEATURE_PREFIXES, MAX_DEX_BYTES, extract_dex_features
+from analyzers.manifest_parser import read_apk_manifest
+from models.feature_schema import FeatureSchema
+
+logger = logging.getLogger(__name__)
+
+# Namespaces whose permissions and intent actions are defined by the platform (or Google
+# services); only these map to DroidRL columns, so an app-defined com.evil.permission.SEND_SMS
+# cannot set permission_SEND_SMS
+PERMISSION_NAMESPACES = (
+    'android.permission.', 'com.android.alarm.permission.', 'com.android.browser.permission.',
+    'com.android.launcher.permission.', 'com.android.voicemail.permission.',
+    'com.google.android.c2dm.permission.', 'com.google.android.gms.permission.'
+)
+INTENT_NAMESPACES = (
+    'android.intent.action.', 'android.provider.Telephony.', 'android.net.conn.', 'android.net.wifi.',
+    'android.bluetooth.adapter.action.', 'android.bluetooth.device.action.', 'android.app.action.',
+    'android.media.', 'android.nfc.action.', 'android.accessibilityservice.', 'android.service.'
+)
+
+
+def _column_suffix(name, namespaces):
+    """Last component of a name declared directly in one of the namespaces, else None"""
+    for namespace in namespaces:
+        if name.startswith(namespace):
+            suffix = name[len(namespace):]
+            return suffix if suffix and '.' not in suffix else None
+    return None
+
+
+class StaticAnalyzer:
+    def __init__(self, dex_jobs=-1, max_dex_bytes=MAX_DEX_BYTES):
+        """Initialize static analyzer for APK files
+        
+        dex_jobs is the number of worker processes parsing the DEX files of a
+        multidex APK (-1 for all CPUs, 1 to parse them in this process);
+        a DEX over max_dex_bytes uncompressed is skipped like a broken one.
+        """
+        self.dex_jobs = dex_jobs
+        self.max_dex_bytes = max_dex_bytes
+        # DroidRL dataset feature mapping
+        self.droidrl_permissions = [
+            'ACCESS_CHECKIN_PROPERTIES', 'ACCESS_COARSE_LOCATION', 'ACCESS_FINE_LOCATION',
+            'ACCESS_LOCATION_EXTRA_COMMANDS', 'ACCESS_MOCK_LOCATION', 'ACCESS_NETWORK_STATE',
+            'ACCESS_SURFACE_FLINGER', 'ACCESS_WIFI_STATE', 'ACCOUNT_MANAGER', 'ADD_VOICEMAIL',
+            'BATTERY_STATS', 'BIND_ACCESSIBILITY_SERVICE', 'BIND_APPWIDGET', 'BIND_DEVICE_ADMIN',
+            'BIND_INPUT_METHOD', 'BIND_REMOTEVIEWS', 'BIND_TEXT_SERVICE', 'BIND_VPN_SERVICE',
+            'BIND_WALLPAPER', 'BLUETOOTH', 'BLUETOOTH_ADMIN', 'BLUETOOTH_PRIVILEGED',
+            'BRICK', 'BROADCAST_PACKAGE_REMOVED', 'BROADCAST_SMS', 'BROADCAST_STICKY',
+            'BROADCAST_WAP_PUSH', 'CALL_PHONE', 'CALL_PRIVILEGED', 'CAMERA',
+            'CAPTURE_AUDIO_OUTPUT', 'CAPTURE_SECURE_VIDEO_OUTPUT', 'CAPTURE_VIDEO_OUTPUT',
+            'CHANGE_COMPONENT_ENABLED_STATE', 'CHANGE_CONFIGURATION', 'CHANGE_NETWORK_STATE',
+            'CHANGE_WIFI_MULTICAST_STATE', 'CHANGE_WIFI_STATE', 'CLEAR_APP_CACHE',
+            'CLEAR_APP_USER_DATA', 'CONTROL_LOCATION_UPDATES', 'DELETE_CACHE_FILES',
+            'DELETE_PACKAGES', 'DEVICE_POWER', 'DIAGNOSTIC', 'DISABLE_KEYGUARD',
+            'DUMP', 'EXPAND_STATUS_BAR', 'FACTORY_TEST', 'FLASHLIGHT', 'FORCE_BACK',
+            'GET_ACCOUNTS', 'GET_PACKAGE_SIZE', 'GET_TASKS', 'GET_TOP_ACTIVITY_INFO',
+            'GLOBAL_SEARCH', 'HARDWARE_TEST', 'INJECT_EVENTS', 'INSTALL_LOCATION_PROVIDER',
+            'INSTALL_PACKAGES', 'INTERNAL_SYSTEM_WINDOW', 'INTERNET', 'KILL_BACKGROUND_PROCESSES',
+            'LOCATION_HARDWARE', 'MANAGE_ACCOUNTS', 'MANAGE_APP_TOKENS', 'MANAGE_DOCUMENTS',
+            'MASTER_CLEAR', 'MODIFY_AUDIO_SETTINGS', 'MODIFY_PHONE_STATE', 'MOUNT_FORMAT_FILESYSTEMS',
+            'MOUNT_UNMOUNT_FILESYSTEMS', 'NFC', 'PERSISTENT_ACTIVITY', 'PROCESS_OUTGOING_CALLS',
+            'READ_CALENDAR', 'READ_CALL_LOG', 'READ_CONTACTS', 'READ_EXTERNAL_STORAGE',
+            'READ_FRAME_BUFFER', 'READ_HISTORY_BOOKMARKS', 'READ_INPUT_STATE', 'READ_LOGS',
+            'READ_PHONE_STATE', 'READ_PROFILE', 'READ_SMS', 'READ_SOCIAL_STREAM',
+            'READ_SYNC_SETTINGS', 'READ_SYNC_STATS', 'READ_USER_DICTIONARY', 'REBOOT',
+            'RECEIVE_BOOT_COMPLETED', 'RECEIVE_MMS', 'RECEIVE_SMS', 'RECEIVE_WAP_PUSH',
+            'RECORD_AUDIO', 'REORDER_TASKS', 'RESTART_PACKAGES', 'SEND_RESPOND_VIA_MESSAGE',
+            'SEND_SMS', 'SET_ACTIVITY_WATCHER', 'SET_ALARM', 'SET_ALWAYS_FINISH',
+            'SET_ANIMATION_SCALE', 'SET_DEBUG_APP', 'SET_ORIENTATION', 'SET_POINTER_SPEED',
+            'SET_PREFERRED_APPLICATIONS', 'SET_PROCESS_LIMIT', 'SET_TIME', 'SET_TIME_ZONE',
+            'SET_WALLPAPER', 'SET_WALLPAPER_HINTS', 'SIGNAL_PERSISTENT_PROCESSES',
+            'STATUS_BAR', 'SUBSCRIBED_FEEDS_READ', 'SUBSCRIBED_FEEDS_WRITE', 'SYSTEM_ALERT_WINDOW',
+            'UPDATE_DEVICE_STATS', 'USE_CREDENTIALS', 'USE_SIP', 'VIBRATE', 'WAKE_LOCK',
+            'WRITE_APN_SETTINGS', 'WRITE_CALENDAR', 'WRITE_CALL_LOG', 'WRITE_CONTACTS',
+            'WRITE_EXTERNAL_STORAGE', 'WRITE_GSERVICES', 'WRITE_HISTORY_BOOKMARKS',
+            'WRITE_PROFILE', 'WRITE_SECURE_SETTINGS', 'WRITE_SETTINGS', 'WRITE_SMS',
+            'WRITE_SOCIAL_STREAM', 'WRITE_SYNC_SETTINGS', 'WRITE_USER_DICTIONARY'
+        ]
+        
+        # Banking-specific critical permissions
+        self.banking_critical = [
+            'SEND_SMS', 'READ_SMS', 'CALL_PHONE', 'READ_PHONE_STATE',
+            'SYSTEM_ALERT_WINDOW', 'BIND_ACCESSIBILITY_SERVICE', 'CAMERA',
+            'RECORD_AUDIO', 'ACCESS_FINE_LOCATION'
+        ]
+        
+        # Column layout of vectors built without a model's schema
+        self.feature_schema = FeatureSchema([f'permission_{perm}' for perm in self.droidrl_permissions])
+    
+    def extract_features(self, apk_path, feature_names=None):
+        """Extract DroidRL features from an APK's AndroidManifest.xml
+        
+        Requested permissions map to permission_<NAME> and intent-filter actions
+        to intent_<ACTION> columns, using the last dotted component of names in
+        the platform namespaces (android.permission.SEND_SMS -> permission_SEND_SMS,
+        android.intent.action.BOOT_COMPLETED -> intent_BOOT_COMPLETED); names an
+        app defines itself are ignored. The
+        classes*.dex files add opcode_<family> instruction shares and
+        api_<Class>_<method> sensitive call flags (see analyzers.dex_parser).
+        apk_path may also be a seekable file object, such as an in-memory upload.
+        
+        feature_names (the model's feature_names) limits extraction to the
+        columns the model was trained on; features dropped by training-time
+        feature selection are not computed.
+        
+        An upload whose manifest cannot be read raises InvalidAPKError: it gets
+        no features (and so no verdict). A broken DEX only drops the DEX features.
+        """
+        try:
+            logger.info(f"🔍 Extracting features from: {apk_path}")
+            manifest = read_apk_manifest(apk_path)
+            features = self.manifest_to_features(manifest, feature_names)
+            if self._wants_dex_features(feature_names):
+                features.update(self._extract_dex_features(apk_path, feature_names))
+            
+            logger.info(f"✅ Extracted {len(features)} features "
+                        f"({len(manifest.permissions)} permissions, {len(manifest.intent_actions)} intent actions)")
+            return features
+            
+        except Exception as e:
+            logger.error(f"❌ Feature extraction failed: {str(e)}")
+            raise
+    
+    def manifest_to_features(self, manifest, feature_names=None):
+        """Feature dict of a parsed manifest: every wanted permission column, plus the intent columns set"""
+        features = {f'permission_{perm}': 0 for perm in self._wanted_permissions(feature_names)}
+        wanted = None if feature_names is None else set(feature_names)
+        
+        for permission in manifest.permissions:
+            suffix = _column_suffix(permission, PERMISSION_NAMESPACES)
+            key = f'permission_{suffix}'
+            if suffix is not None and (key in features or (wanted is not None and key in wanted)):
+                features[key] = 1
+        
+        if wanted is not None:
+            features.update({name: 0 for name in wanted if name.startswith('intent_')})
+        for action in manifest.intent_actions:
+            suffix = _column_suffix(action, INTENT_NAMESPACES)
+            key = f'intent_{suffix}'
+            if suffix is not None and (wanted is None or key in wanted):
+                features[key] = 1
+        return features
+    
+    def _wants_dex_features(self, feature_names=None):
+        """DEX parsing is skipped when the model has no opcode_/api_ columns"""
+        return feature_names is None or any(name.startswith(DEX_FEATURE_PREFIXES) for name in feature_names)
+    
+    def _extract_dex_features(self, apk_path, feature_names=None):
+        """DEX features (restricted to feature_names); a broken DEX leaves the manifest features intact"""
+        try:
+            dex_features = extract_dex_features(apk_path, n_jobs=self.dex_jobs, max_dex_bytes=self.max_dex_bytes)
+        except Exception as e:
+            logger.warning(f"⚠️ DEX parsing failed, using manifest features only: {str(e)}")
+            return {}
+        if feature_names is None:
+            return dex_features
+        wanted = set(feature_names)
+        return {name: value for name, value in dex_features.items() if name in wanted}
+    
+    def features_to_vector(self, features_dict, packed=False, feature_schema=None):
+        """Convert features dict to ML-compatible vector (or a bit-packed row when packed=True)
+        
+        With a feature_schema (the classifier's), the vector has exactly the
+        model's columns in the model's order, so it needs no realignment;
+        packed rows carry the schema hash, which the classifier checks.
+        Without one, the DroidRL permission layout is used.
+        """
+        schema = feature_schema if feature_schema is not None else self.feature_schema
+        if packed:
+            return schema.encode_packed(features_dict)
+        return schema.encode(features_dict)
+    
+    def _wanted_permissions(self, feature_names=None):
+        """Permissions to extract: all known ones, or those among the given feature names"""
+        if feature_names is None:
+            return self.droidrl_permissions
+        wanted = set(feature_names)
+        return [perm for perm in self.droidrl_permissions if f'permission_{perm}' in wanted]
@@ -1,5 +1,5 @@
 # 📄 backend/app.py - Main Flask Application
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Request, request, jsonify, send_from_directory
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
@@ -7,48 +7,153 @@ import json
 import logging
 from datetime import datetime
 import time
+import numpy as np
 
+from config import Config
 from models.banking_classifier import BankingAPKClassifier
+from models.hyperparameter_search import load_tuned_params
+from models.model_registry import ModelRegistry, ModelManager
+from models.prediction_cache import PredictionCache
+from models.training_jobs import TrainingJobManager
+from analyzers.manifest_parser import InvalidAPKError
 from analyzers.static_analyzer import StaticAnalyzer
 from utils.report_generator import ForensicReportGenerator
+from database.analysis_store import AnalysisStore
 from database.operations import DatabaseManager
+from utils.uploads import SpooledUpload, purge_scratch_dir, spool_upload
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend connection
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max
-app.config['UPLOAD_FOLDER'] = 'data/temp/'
+app.config['UPLOAD_FOLDER'] = Config.UPLOAD_FOLDER
+app.config['UPLOAD_MEMORY_LIMIT'] = Config.UPLOAD_MEMORY_LIMIT
+
+class UploadRequest(Request):
+    """Request whose uploaded files are parsed straight into SpooledUpload buffers
+    
+    Each file is hashed while the multipart body is read, kept in memory up to
+    UPLOAD_MEMORY_LIMIT and spilled to UPLOAD_FOLDER beyond it; buffers are
+    closed (spill files deleted) when the request ends.
+    """
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledUpload(app.config['UPLOAD_FOLDER'], app.config['UPLOAD_MEMORY_LIMIT'])
+
+app.request_class = UploadRequest
 
 # Initialize components
-classifier = BankingAPKClassifier()
-static_analyzer = StaticAnalyzer()
+def new_classifier():
+    """Classifier configured from Config (untrained; the cascade band survives loading a model)"""
+    classifier = BankingAPKClassifier(
+        svm_member=Config.SVM_MEMBER,
+        svm_approx_components=Config.SVM_APPROX_COMPONENTS,
+        precision=Config.INFERENCE_PRECISION,
+        ensemble_params=load_tuned_params(Config.TUNED_PARAMS_PATH)
+    )
+    if Config.CASCADE_BAND:
+        classifier.set_cascade(*Config.CASCADE_BAND)
+    return classifier
+
+# Identical feature vectors (re-uploads, repackaged APKs) reuse the cached prediction
+prediction_cache = PredictionCache(
+    max_entries=Config.PREDICTION_CACHE_SIZE,
+    ttl_seconds=Config.PREDICTION_CACHE_TTL_SECONDS,
+    disk_dir=Config.PREDICTION_CACHE_DIR
+) if Config.PREDICTION_CACHE_ENABLED else None
+
+# Requests read the serving model through model_manager.current(); new versions
+# are loaded and warmed up in the background, then swapped in atomically
+model_registry = ModelRegistry(Config.MODEL_REGISTRY_DIR)
+model_manager = ModelManager(
+    model_registry,
+    classifier_factory=new_classifier,
+    warmup_batch_sizes=Config.WARMUP_BATCH_SIZES,
+    import_path=Config.MODEL_PATH,  # pre-registry artifact, imported into an empty registry
+    on_swap=prediction_cache.invalidate if prediction_cache else None
+)
+
+# Training runs in separate processes; finished jobs are hot-swapped in
+training_jobs = TrainingJobManager(
+    model_registry,
+    classifier_kwargs={
+        'svm_member': Config.SVM_MEMBER,
+        'svm_approx_components': Config.SVM_APPROX_COMPONENTS,
+        'min_feature_frequency': Config.FEATURE_MIN_FREQUENCY,
+        'feature_budget': Config.FEATURE_BUDGET,
+        'ensemble_params': load_tuned_params(Config.TUNED_PARAMS_PATH)
+    },
+    on_published=model_manager.load_version
+)
+static_analyzer = StaticAnalyzer(dex_jobs=Config.DEX_PARSE_JOBS, max_dex_bytes=Config.MAX_DEX_BYTES)
 report_generator = ForensicReportGenerator()
 db_manager = DatabaseManager()
 
+# Analysis results by upload SHA-256: repeat uploads get the stored verdict and report
+analysis_store = AnalysisStore(Config.ANALYSIS_STORE_DIR)
+ANALYSIS_RESPONSE_FIELDS = ('analysis_id', 'model_version', 'prediction', 'risk_score', 'confidence',
+                            'explanation', 'forensic_report')
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load trained model on startup
-try:
-    classifier.load_model('data/trained_models/bankguard_model.joblib')
-    logger.info("✅ Pre-trained model loaded successfully!")
-except:
-    logger.warning("⚠️ No pre-trained model found. Training new model...")
-    classifier.train_on_dataset('data/datasets/fullset_train.csv')
-    classifier.save_model('data/trained_models/bankguard_model.joblib')
+# Load the registry's active model version without blocking startup (memory-mapped
+# serving artifact, so all worker processes share one copy of the model arrays).
+# The server binds immediately; requests that need the model wait for it briefly.
+if Config.MODEL_LOADING == 'background':
+    model_manager.start()
+
+def serving_model():
+    """(version, classifier) for this request, starting a lazy load on first use"""
+    model_version, classifier = model_manager.snapshot()
+    if classifier is None:
+        model_manager.start()
+        model_version, classifier = model_manager.wait_until_ready(Config.MODEL_LOAD_WAIT_SECONDS)
+    return model_version, classifier
+
+def predict_cached(model_version, classifier, features, include_member_probabilities=False):
+    """(prediction result, cache_hit) through the prediction cache when it is enabled"""
+    if prediction_cache is None:
+        return classifier.predict_with_explanation(features, include_member_probabilities), False
+    return prediction_cache.predict(classifier, model_version, features, include_member_probabilities)
+
+def model_unavailable():
+    """503 response while no model is serving"""
+    readiness = model_manager.readiness()
+    response = jsonify({
+        'error': readiness['error'] or 'Model is loading, retry shortly',
+        'readiness': readiness
+    })
+    response.headers['Retry-After'] = '5'
+    return response, 503
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness; readiness is reported alongside)"""
+    readiness = model_manager.readiness()
     return jsonify({
         'status': 'healthy',
-        'model_loaded': classifier.is_trained,
+        'ready': readiness['ready'],
+        'model_loaded': readiness['ready'],
+        'model_version': readiness['model_version'],
+        'readiness': readiness,
         'timestamp': datetime.now().isoformat(),
         'version': '1.0.0',
         'dataset': 'DroidRL fullset_train.csv'
     })
 
+@app.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving HTTP"""
+    return jsonify({'status': 'alive', 'timestamp': datetime.now().isoformat()})
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once a warmed-up model is serving, 503 before"""
+    readiness = model_manager.readiness()
+    return jsonify(readiness), 200 if readiness['ready'] else 503
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_apk():
     """Main APK analysis endpoint"""
@@ -57,21 +162,28 @@ def analyze_apk():
         
         # Handle JSON prediction (for demo with pre-extracted features)
         if request.is_json:
+            # One model reference per request: a concurrent hot swap does not affect it
+            model_version, classifier = serving_model()
+            if classifier is None:
+                return model_unavailable()
+            
             features = request.get_json()
             logger.info("Analyzing pre-extracted features")
             
-            # Direct prediction with features
-            prediction_result = classifier.predict_with_explanation(features)
+            # Direct prediction with features (cached per model version and feature vector)
+            prediction_result, cache_hit = predict_cached(model_version, classifier, features)
             processing_time = time.time() - start_time
             prediction_result['processing_time'] = round(processing_time, 2)
             
             return jsonify({
                 'success': True,
+                'model_version': model_version,
                 'prediction': prediction_result['prediction'],
                 'risk_score': prediction_result['risk_score'],
                 'confidence': prediction_result['confidence'],
                 'explanation': prediction_result['explanation'],
                 'processing_time': prediction_result['processing_time'],
+                'cached': cache_hit,
                 'analysis_id': str(int(time.time()))
             })
         
@@ -83,58 +195,141 @@ def analyze_apk():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-        
-        logger.info(f"Analyzing APK: {filename}")
+        model_version, classifier = serving_model()
+        if classifier is None:
+            return model_unavailable()
         
-        # Extract features from APK
-        static_features = static_analyzer.extract_features(file_path)
+        # The upload was hashed while it was parsed; small APKs are analysed from memory
+        filename = secure_filename(file.filename)
+        upload = file.stream if isinstance(file.stream, SpooledUpload) else spool_upload(
+            file.stream, app.config['UPLOAD_FOLDER'], app.config['UPLOAD_MEMORY_LIMIT'])
+        sha256 = upload.sha256
+        force_rescan = request.values.get('force_rescan', '').lower() in ('1', 'true', 'yes')
         
-        # Convert to ML-compatible format
-        feature_vector = static_analyzer.features_to_vector(static_features)
+        # Identical uploads are analysed once per model version (unless a re-scan is forced);
+        # concurrent uploads of the same sample wait for the first analysis
+        with upload, analysis_store.lock(sha256):
+            stored = None if force_rescan else analysis_store.get(sha256)
+            # Records without features_extracted predate the check and may hold an all-zero verdict
+            if stored is not None and stored.get('model_version') == model_version and stored.get('features_extracted'):
+                logger.info(f"Returning stored analysis of {filename} ({sha256[:12]})")
+                return jsonify({
+                    **{key: stored[key] for key in ANALYSIS_RESPONSE_FIELDS},
+                    'success': True,
+                    'filename': filename,
+                    'sha256': sha256,
+                    'deduplicated': True,
+                    'analyzed_at': stored['timestamp'],
+                    'timestamp': datetime.now().isoformat(),
+                    'processing_time': round(time.time() - start_time, 2)
+                })
+            
+            logger.info(f"Analyzing APK: {filename} ({sha256[:12]}, {upload.size} bytes, "
+                        f"{'in memory' if upload.in_memory else 'spilled to disk'})")
+            
+            # Extract the model's features from the APK (only the columns it was trained on);
+            # an upload that is not a readable APK gets no verdict
+            try:
+                static_features = static_analyzer.extract_features(upload.source(), feature_names=classifier.feature_names)
+            except InvalidAPKError as e:
+                return jsonify({'error': f'Invalid APK: {str(e)}', 'filename': filename, 'sha256': sha256}), 422
+            
+            # Convert to ML-compatible format, in the model's column order
+            feature_vector = static_analyzer.features_to_vector(static_features, feature_schema=classifier.feature_schema)
+            
+            # Run ML classification (per-member probabilities feed the forensic report)
+            prediction_result, cache_hit = predict_cached(
+                model_version, classifier, feature_vector, include_member_probabilities=True
+            )
+            
+            # Generate forensic report
+            forensic_report = report_generator.generate_report(
+                apk_path=filename,
+                static_features=static_features,
+                prediction_result=prediction_result
+            )
+            
+            # Save to database
+            analysis_id = db_manager.save_analysis({
+                'filename': filename,
+                'sha256': sha256,
+                'analysis_timestamp': datetime.now().isoformat(),
+                'prediction_result': prediction_result,
+                'forensic_report': forensic_report,
+                'model_version': model_version
+            })
+            
+            response = {
+                'success': True,
+                'analysis_id': analysis_id,
+                'model_version': model_version,
+                'filename': filename,
+                'sha256': sha256,
+                'timestamp': datetime.now().isoformat(),
+                'prediction': prediction_result['prediction'],
+                'risk_score': prediction_result['risk_score'],
+                'confidence': prediction_result['confidence'],
+                'explanation': prediction_result['explanation'],
+                'forensic_report': forensic_report,
+                'cached': cache_hit,
+                'deduplicated': False,
+                'processing_time': round(time.time() - start_time, 2)
+            }
+            # Only verdicts on features actually extracted from this file are replayed for it
+            # (unreadable uploads returned 422 above)
+            if prediction_result['prediction'] != 'ERROR':
+                analysis_store.put(sha256, {
+                    **{key: response[key] for key in ANALYSIS_RESPONSE_FIELDS + ('timestamp',)},
+                    'features_extracted': True
+                })
         
-        # Run ML classification
-        prediction_result = classifier.predict_with_explanation(feature_vector)
+        return jsonify(response)
         
-        # Generate forensic report
-        forensic_report = report_generator.generate_report(
-            apk_path=file_path,
-            static_features=static_features,
-            prediction_result=prediction_result
-        )
+    except Exception as e:
+        logger.error(f"Analysis failed: {str(e)}")
+        return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
+
+@app.route('/api/explain', methods=['POST'])
+def explain_prediction():
+    """Per-feature contribution scores for one sample (computed on demand, cached per model)
+    
+    Accepts the same feature dict as /api/analyze, {"features": {...}} or
+    {"feature_vector": [...]}; ?top_k= sets how many contributions are listed.
+    """
+    try:
+        start_time = time.time()
         
-        # Save to database
-        analysis_id = db_manager.save_analysis({
-            'filename': filename,
-            'analysis_timestamp': datetime.now().isoformat(),
-            'prediction_result': prediction_result,
-            'forensic_report': forensic_report
-        })
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({'error': 'JSON body with features required'}), 400
+        if 'feature_vector' in payload:
+            features = payload['feature_vector']
+        elif isinstance(payload.get('features'), dict):
+            features = payload['features']
+        else:
+            features = payload
+        top_k = request.args.get('top_k', Config.EXPLANATION_TOP_K, type=int)
         
-        # Clean up temporary file
-        os.remove(file_path)
+        model_version, classifier = serving_model()
+        if classifier is None:
+            return model_unavailable()
         
-        processing_time = time.time() - start_time
+        try:
+            explanation = classifier.explain_contributions(features, top_k=top_k)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
             'success': True,
-            'analysis_id': analysis_id,
-            'filename': filename,
-            'timestamp': datetime.now().isoformat(),
-            'prediction': prediction_result['prediction'],
-            'risk_score': prediction_result['risk_score'],
-            'confidence': prediction_result['confidence'],
-            'explanation': prediction_result['explanation'],
-            'forensic_report': forensic_report,
-            'processing_time': round(processing_time, 2)
+            'model_version': model_version,
+            'cached': explanation.pop('cached'),
+            'explanation': explanation,
+            'processing_time': round(time.time() - start_time, 3)
         })
         
     except Exception as e:
-        logger.error(f"Analysis failed: {str(e)}")
-        return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
+        logger.error(f"Explanation failed: {str(e)}")
+        return jsonify({'error': f'Explanation failed: {str(e)}'}), 500
 
 @app.route('/api/demo-predict', methods=['POST'])
 def demo_predict():
@@ -235,32 +430,142 @@ def get_statistics():
 
 @app.route('/api/train-model', methods=['POST'])
 def train_model():
-    """Trigger model training (for demo purposes)"""
+    """Start model training as a background job
+
+    Returns a job id at once; progress is at /api/training-jobs/<job_id>.
+    The job trains in a separate process and publishes a new registry
+    version, which is then hot-swapped in once it is loaded and warm.
+    """
     try:
-        logger.info("Starting model training...")
-        
-        # Train model on your dataset
-        accuracy = classifier.train_on_dataset('data/datasets/fullset_train.csv')
-        
-        # Save trained model
-        classifier.save_model('data/trained_models/bankguard_model.joblib')
+        options = request.get_json(silent=True) or {}
+        job_id = training_jobs.submit(
+            Config.DATASET_PATH,
+            cross_validate=options.get('cross_validate', Config.CV_ENABLED),
+            cv_folds=Config.CV_FOLDS,
+            cv_jobs=Config.CV_N_JOBS
+        )
+        logger.info(f"Started model training job {job_id}")
         
         return jsonify({
             'success': True,
-            'message': 'Model training completed',
-            'accuracy': accuracy,
-            'training_samples': classifier.training_samples,
-            'features': len(classifier.feature_names),
+            'message': 'Model training started',
+            'job_id': job_id,
+            'status_url': f'/api/training-jobs/{job_id}',
             'timestamp': datetime.now().isoformat()
-        })
+        }), 202
         
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
     except Exception as e:
         logger.error(f"Training failed: {str(e)}")
         return jsonify({'error': f'Training failed: {str(e)}'}), 500
 
+@app.route('/api/training-jobs', methods=['GET'])
+def list_training_jobs():
+    """All training jobs, newest first"""
+    return jsonify({'jobs': training_jobs.list()})
+
+@app.route('/api/training-jobs/<job_id>', methods=['GET'])
+def get_training_job(job_id):
+    """Training job status: current phase, per-phase elapsed times and result"""
+    try:
+        return jsonify(training_jobs.get(job_id))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+
+@app.route('/api/training-jobs/<job_id>/cancel', methods=['POST'])
+def cancel_training_job(job_id):
+    """Cancel a running training job (its model is not published)"""
+    try:
+        return jsonify(training_jobs.cancel(job_id))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+
+@app.route('/api/update-model', methods=['POST'])
+def update_model():
+    """Fold newly labelled samples into the model (incremental update, no full retrain)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        samples, labels = data.get('samples'), data.get('labels')
+        if not samples or labels is None:
+            return jsonify({'error': 'Expected JSON with "samples" and "labels"'}), 400
+
+        # The serving model is memory-mapped and read-only; update a copy of the
+        # full artifact of the serving version and publish it as a new version
+        base_version, _ = serving_model()
+        if base_version is None:
+            return model_unavailable()
+        updater = new_classifier()
+        updater.load_model(model_registry.model_path(base_version))
+
+        report = updater.incremental_update(
+            samples, labels,
+            xgb_rounds=Config.INCREMENTAL_XGB_ROUNDS,
+            rf_refresh_trees=Config.INCREMENTAL_RF_REFRESH_TREES,
+            max_accuracy_drop=Config.INCREMENTAL_MAX_ACCURACY_DROP,
+            apply=data.get('apply', True)
+        )
+
+        version = None
+        if report['swapped']:
+            version = model_registry.publish(updater, parent_version=base_version)
+            model_manager.load_version(version)
+
+        return jsonify({
+            'success': True,
+            'swapped': report['swapped'],
+            'model_version': version,
+            'report': report,
+            'training_samples': updater.training_samples,
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Model update failed: {str(e)}")
+        return jsonify({'error': f'Model update failed: {str(e)}'}), 500
+
+@app.route('/api/models', methods=['GET'])
+def list_models():
+    """Registry versions with metadata, plus serving / pending status"""
+    return jsonify({
+        'versions': model_registry.list_versions(),
+        'status': model_manager.status()
+    })
+
+@app.route('/api/models/<version>/activate', methods=['POST'])
+def activate_model(version):
+    """Load, warm up and hot-swap a registry version (in the background)"""
+    try:
+        model_manager.load_version(version)
+        return jsonify({'success': True, 'loading': version, 'status': model_manager.status()}), 202
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+
+@app.route('/api/models/rollback', methods=['POST'])
+def rollback_model():
+    """Swap back to the previously active model version"""
+    try:
+        version = model_manager.rollback()
+        return jsonify({'success': True, 'model_version': version, 'status': model_manager.status()})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        logger.error(f"Rollback failed: {str(e)}")
+        return jsonify({'error': f'Rollback failed: {str(e)}'}), 500
+
+@app.route('/api/prediction-cache', methods=['GET'])
+def prediction_cache_stats():
+    """Prediction cache hit/miss counters and size"""
+    if prediction_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, 'model_version': model_manager.current_version(), **prediction_cache.stats()})
+
 if __name__ == '__main__':
     # Ensure directories exist
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    purge_scratch_dir(app.config['UPLOAD_FOLDER'])
     os.makedirs('data/trained_models', exist_ok=True)
     
     print("🚀 BankGuard AI Backend Starting...")
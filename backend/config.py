@@ -13,16 +13,83 @@ class Config:
     
     # File upload settings
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB
-    UPLOAD_FOLDER = 'data/temp/'
+    UPLOAD_FOLDER = 'data/temp/'  # scratch area for uploads too large to keep in memory
+    UPLOAD_MEMORY_LIMIT = 8 * 1024 * 1024  # uploads up to this size are analysed from memory
     ALLOWED_EXTENSIONS = {'apk'}
     
     # Model settings
-    MODEL_PATH = 'data/trained_models/bankguard_model.joblib'
+    MODEL_PATH = 'data/trained_models/bankguard_model.joblib'  # pre-registry artifact, imported on first start
+    MODEL_REGISTRY_DIR = 'data/trained_models'  # versions/<version>/ + registry.json
+    
+    # Startup never trains. 'background' starts loading the active model version as
+    # soon as the app is imported; 'lazy' waits for the first request that needs it.
+    # Requests wait up to MODEL_LOAD_WAIT_SECONDS for a loading model, then get a 503.
+    MODEL_LOADING = os.environ.get('BANKGUARD_MODEL_LOADING', 'background')
+    MODEL_LOAD_WAIT_SECONDS = 10
+    # Batch sizes of the throwaway predictions run before a model starts serving
+    WARMUP_BATCH_SIZES = (1, 32)
     DATASET_PATH = 'data/datasets/fullset_train.csv'
     VALIDATION_DATASET_PATH = 'data/datasets/data_set2.csv'
     
+    # SVM ensemble member: 'svc' (exact RBF SVC) or 'rbf_approx' (Nystroem + calibrated
+    # linear SVM, much faster to train and predict on 10k+ samples)
+    SVM_MEMBER = 'svc'
+    SVM_APPROX_COMPONENTS = 300
+    
+    # Training-time feature selection: drop columns set in fewer than FEATURE_MIN_FREQUENCY
+    # of the training rows (or in nearly all of them), then keep the FEATURE_BUDGET most
+    # important columns (None keeps every column that passes the frequency filter).
+    # Off by default; set e.g. 0.001 to drop columns that are almost never set
+    FEATURE_MIN_FREQUENCY = 0.0
+    FEATURE_BUDGET = None
+    
+    # Ensemble hyperparameters and voting weights found by scripts/tune_hyperparameters.py
+    # (successive halving on accuracy and latency); used for training when the file exists
+    TUNED_PARAMS_PATH = 'data/tuning/ensemble_params.json'
+    TUNING_CHECKPOINT_PATH = 'data/tuning/search_checkpoint.json'
+    TUNING_LATENCY_WEIGHT = 0.002  # accuracy given up per ms of single-sample latency
+    
+    # Serving precision: 'float64', or 'float32' (float32 scaler/trees/linear weights,
+    # verified against float64 with scripts/verify_reduced_precision.py)
+    INFERENCE_PRECISION = os.environ.get('BANKGUARD_INFERENCE_PRECISION', 'float64')
+    
+    # Prediction results cached per (model version, feature vector fingerprint); set
+    # BANKGUARD_PREDICTION_CACHE_DIR to share them between worker processes on disk
+    PREDICTION_CACHE_ENABLED = True
+    PREDICTION_CACHE_SIZE = 10000
+    PREDICTION_CACHE_TTL_SECONDS = 3600
+    PREDICTION_CACHE_DIR = os.environ.get('BANKGUARD_PREDICTION_CACHE_DIR')
+    
+    # Feature contributions listed per member by /api/explain (default for ?top_k=)
+    EXPLANATION_TOP_K = 10
+    
+    # Cross-validation refits the full ensemble per fold; it is a separate, optional step
+    # (scripts/cross_validate_model.py) with folds run in parallel worker processes
+    CV_ENABLED = False
+    CV_FOLDS = 5
+    CV_N_JOBS = -1
+    
+    # Cascade inference: LR decides samples outside this (lower, upper) malicious-probability
+    # band, the full ensemble scores the rest. None disables the cascade.
+    CASCADE_BAND = None  # e.g. (0.05, 0.95) - see scripts/benchmark_cascade.py
+    
+    # Incremental updates from newly labelled samples (scripts/update_model.py,
+    # /api/update-model): extra XGBoost rounds, RF trees regrown on the sliding
+    # window, and the largest holdout accuracy drop accepted before swapping
+    INCREMENTAL_XGB_ROUNDS = 20
+    INCREMENTAL_RF_REFRESH_TREES = 30
+    INCREMENTAL_MAX_ACCURACY_DROP = 0.005
+    
+    # Worker processes parsing the classes*.dex files of a multidex upload (-1: all CPUs)
+    DEX_PARSE_JOBS = -1
+    # Largest uncompressed classes*.dex spooled for parsing; bigger ones (zip bombs) are skipped
+    MAX_DEX_BYTES = 128 * 1024 * 1024
+    
     # Database settings
     DATABASE_PATH = 'data/analysis_results.json'
+    # Uploads are stored by SHA-256: a repeat upload returns the stored verdict and
+    # report unless the serving model version changed or force_rescan is set
+    ANALYSIS_STORE_DIR = 'data/analyses'
     
     # API settings
     API_RATE_LIMIT = '100 per minute'
@@ -0,0 +1,64 @@
+# 📄 backend/database/analysis_store.py - Content-Addressed Analysis Results
+# ================================================================================
+
+import os
+import json
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisStore:
+    """APK analysis results stored by the SHA-256 of the uploaded file
+
+    One JSON file per sample under root_dir/<sha256[:2]>/<sha256>.json, holding
+    the latest verdict and forensic report and the model version that produced
+    them. Identical uploads are analysed once per model version, whatever their
+    filenames.
+
+    lock(sha256) serializes the analysis of one sample within the process, so
+    concurrent uploads of the same file wait for the first analysis and reuse
+    it; different samples only share a lock by stripe collision.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, root_dir='data/analyses'):
+        self.root_dir = root_dir
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def path(self, sha256):
+        return os.path.join(self.root_dir, sha256[:2], f'{sha256}.json')
+
+    def lock(self, sha256):
+        """Lock held while a sample is looked up, analysed and stored"""
+        return self._locks[int(sha256[:8], 16) % self.LOCK_STRIPES]
+
+    def get(self, sha256):
+        """Stored record of a sample, or None"""
+        try:
+            with open(self.path(sha256)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Unreadable stored analysis for {sha256}: {str(e)}")
+            return None
+
+    def put(self, sha256, record):
+        """Store (or replace) a sample's record; written through a temporary file and rename"""
+        path = self.path(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(dict(record, sha256=sha256), f, indent=2, default=_json_default)
+        os.replace(temp_path, path)
+        return path
+
+
+def _json_default(value):
+    """NumPy scalars in analysis results"""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
@@ -1,29 +1,126 @@
 # 📄 backend/models/banking_classifier.py - ML Model for DroidRL Dataset
 # ================================================================================
 
+import os
 import numpy as np
-import pandas as pd
 import joblib
 from sklearn.ensemble import RandomForestClassifier, VotingClassifier
 from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.svm import SVC, LinearSVC
+from sklearn.kernel_approximation import Nystroem
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.base import clone
+from sklearn.utils import Bunch
 import xgboost as xgb
+import copy
+import hashlib
+import shutil
+import tempfile
+import threading
 import time
 import logging
+from collections import OrderedDict
+from datetime import datetime
+from joblib import Parallel, delayed
+
+from models.feature_schema import FeatureSchema, feature_schema_hash
+from models.feature_selection import select_features
+from models.portable_model import (LinearModel, ScalerArrays, member_to_portable, load_portable_members,
+                                   read_portable, write_portable)
+from models.tree_engine import CompiledTreeEnsemble
+from models.tree_explainer import TreePathExplainer, linear_contributions
+from utils.dataset_cache import DatasetCache, read_droidrl_csv
+from utils.feature_packing import PackedFeatures, to_dense_features
 
 logger = logging.getLogger(__name__)
 
 class BankingAPKClassifier:
-    def __init__(self):
-        """Initialize the banking APK classifier for DroidRL dataset"""
+    # Inference engines selectable in load_model / set_inference_engine
+    INFERENCE_ENGINES = ('sklearn', 'compiled')
+    
+    # Above this batch size the threaded sklearn/XGBoost predictors beat the
+    # compiled NumPy traversal, so compiled members are only used up to it
+    COMPILED_MAX_BATCH = 512
+    
+    # Cheap member that scores every sample first in cascade mode
+    CASCADE_FIRST_STAGE = 'lr'
+    
+    # 'svc': exact RBF SVC with Platt scaling; 'rbf_approx': Nystroem RBF feature
+    # map + calibrated linear SVM (scales to large training sets)
+    SVM_MEMBERS = ('svc', 'rbf_approx')
+    
+    # 'float32' serves from float32 scaler statistics, float32 compiled trees
+    # (fixed-point RF leaves) and float32 linear weights (see set_precision)
+    PRECISIONS = ('float64', 'float32')
+    
+    # Incremental updates train on a sliding window of labelled samples (seeded
+    # from the training split) and are gated on a fixed reference holdout
+    UPDATE_WINDOW_SIZE = 5000
+    REFERENCE_HOLDOUT_SIZE = 1000
+    
+    # Per-model cache of feature contribution explanations (see explain_contributions)
+    EXPLANATION_CACHE_SIZE = 256
+    
+    def __init__(self, svm_member='svc', svm_approx_components=300, precision='float64',
+                 min_feature_frequency=0.0, feature_budget=None, ensemble_params=None):
+        """Initialize the banking APK classifier for DroidRL dataset
+        
+        min_feature_frequency and feature_budget configure the feature-selection
+        stage of train_on_dataset (see models/feature_selection.py); the
+        defaults keep every dataset column. ensemble_params overrides member
+        hyperparameters and voting weights in VotingClassifier.set_params form,
+        e.g. the output of scripts/tune_hyperparameters.py.
+        """
+        if svm_member not in self.SVM_MEMBERS:
+            raise ValueError(f"Unknown SVM member '{svm_member}', expected one of {self.SVM_MEMBERS}")
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {self.PRECISIONS}")
+        self.svm_member = svm_member
+        self.svm_approx_components = svm_approx_components
+        self.min_feature_frequency = min_feature_frequency
+        self.feature_budget = feature_budget
+        self.ensemble_params = ensemble_params
         self.scaler = StandardScaler()
         self.model = None
         self.feature_names = None
+        self.feature_schema = None
         self.is_trained = False
+        
+        # Set when training selected a subset of the dataset columns: the full
+        # dataset feature names and the columns of them the model is fitted on
+        self.source_feature_names = None
+        self.selected_columns = None
+        self.feature_selection = None
         self.training_samples = 0
+        self.inference_engine = 'sklearn'
+        self.compiled_members = {}
+        self.cascade_band = None
+        self.precision = precision
+        self.reduced_members = None
+        self.reduced_scaler = None
+        self.cv_metrics = None
+        self.training_metrics = None
+        self.dataset_cache = DatasetCache()
+        
+        # Incremental learning state (see incremental_update)
+        self.update_window = None
+        self.reference_holdout = None
+        self.update_history = []
+        
+        # Set when loaded from a serving artifact (see load_serving_model)
+        self.serving_members = None
+        self.serving_weights = None
+        self.serving_classes = None
+        
+        # Built on the first explain_contributions call for the current model
+        self._tree_explainers = None
+        self._explanation_cache = OrderedDict()
+        self._explanation_lock = threading.Lock()
         
         # Banking-specific permission weights (DroidRL feature naming)
         self.critical_features = {
@@ -66,13 +163,7 @@ class BankingAPKClassifier:
         )
         
         # SVM with RBF kernel
-        svm_model = SVC(
-            kernel='rbf',
-            C=1.0,
-            gamma='scale',
-            probability=True,
-            random_state=42
-        )
+        svm_model = self._build_svm_member()
         
         # Logistic Regression for interpretability
         lr_model = LogisticRegression(
@@ -93,62 +184,106 @@ class BankingAPKClassifier:
             voting='soft',
             weights=[0.35, 0.30, 0.20, 0.15]  # RF gets highest weight
         )
+        if self.ensemble_params:
+            self.model.set_params(**self.ensemble_params)
+        
+        logger.info(f"✅ Ensemble model created: RF + XGBoost + SVM ({self.svm_member}) + LogisticRegression")
+    
+    def _build_svm_member(self):
+        """RBF SVM member: exact SVC or kernel approximation + calibrated linear model"""
+        if self.svm_member == 'svc':
+            return SVC(
+                kernel='rbf',
+                C=1.0,
+                gamma='scale',
+                probability=True,
+                random_state=42
+            )
         
-        logger.info("✅ Ensemble model created: RF + XGBoost + SVM + LogisticRegression")
+        # Nystroem maps inputs into an approximate RBF feature space (gamma defaults
+        # to 1/n_features, i.e. gamma='scale' on standardized inputs) so a linear SVM
+        # can be used; sigmoid calibration replaces SVC's internal Platt scaling and a
+        # single calibrated model (ensemble=False) keeps per-row inference cheap.
+        return Pipeline([
+            ('feature_map', Nystroem(
+                kernel='rbf',
+                n_components=self.svm_approx_components,
+                random_state=42
+            )),
+            ('linear_svm', CalibratedClassifierCV(
+                LinearSVC(C=1.0, dual=False, max_iter=5000),
+                method='sigmoid',
+                cv=3,
+                ensemble=False
+            ))
+        ])
     
-    def train_on_dataset(self, dataset_path='data/datasets/fullset_train.csv'):
-        """Train model on DroidRL dataset"""
+    def train_on_dataset(self, dataset_path='data/datasets/fullset_train.csv',
+                         cross_validate=False, cv_folds=5, cv_jobs=-1, progress_callback=None):
+        """Train model on DroidRL dataset
+        
+        Cross-validation refits the whole ensemble once per fold, so it is off by
+        default; pass cross_validate=True (or call run_cross_validation later) to
+        run the folds in parallel worker processes.
+        
+        When min_feature_frequency or feature_budget is set, a feature-selection
+        stage fitted on the training split keeps only the informative columns;
+        the model, its feature_names and the stored update window then cover the
+        retained columns only (see _select_features).
+        
+        progress_callback, if given, is called with the name of each phase as it
+        starts: loading, selecting_features, scaling, fitting_<member>,
+        evaluating, cross_validating.
+        """
+        report_phase = progress_callback or (lambda phase: None)
         try:
+            start_time = time.time()
+            report_phase('loading')
             logger.info(f"📊 Loading DroidRL dataset from: {dataset_path}")
             
-            # Load the DroidRL dataset
-            df = pd.read_csv(dataset_path)
-            logger.info(f"Dataset loaded: {df.shape[0]} samples, {df.shape[1]} features")
-            
-            # Prepare features and labels
-            # DroidRL dataset has 'class' column: 0=benign, 1=malware
-            if 'class' in df.columns:
-                X = df.drop(['class'], axis=1).values
-                y = df['class'].values
-                self.feature_names = df.drop(['class'], axis=1).columns.tolist()
-            elif 'label' in df.columns:
-                X = df.drop(['label'], axis=1).values
-                y = df['label'].values
-                self.feature_names = df.drop(['label'], axis=1).columns.tolist()
-            else:
-                # Assume last column is label
-                X = df.iloc[:, :-1].values
-                y = df.iloc[:, -1].values
-                self.feature_names = df.columns[:-1].tolist()
+            # Load the DroidRL dataset as compact uint8 features
+            X, y, feature_names = self._load_training_data(dataset_path)
+            logger.info(f"Dataset loaded: {X.shape[0]} samples, {X.shape[1]} features")
+            
+            # Split for training and testing
+            train_idx, test_idx = train_test_split(
+                np.arange(len(y)), test_size=0.2, random_state=42, stratify=y
+            )
+            y_train, y_test = y[train_idx], y[test_idx]
+            
+            X = self._select_features(X, y, train_idx, feature_names, report_phase)
+            self._build_feature_schema()
+            
+            # Binary features are held bit-packed; only the split being scaled is unpacked
+            X = PackedFeatures.from_dense(X) if np.max(X, initial=0) <= 1 else X
             
             self.training_samples = X.shape[0]
             logger.info(f"Features: {len(self.feature_names)}")
             logger.info(f"Benign samples: {np.sum(y == 0)}")
             logger.info(f"Malware samples: {np.sum(y == 1)}")
             
-            # Split for training and testing
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
-            )
-            
+            report_phase('scaling')
             logger.info("🔄 Scaling features...")
+            X_train = self._take_rows(X, train_idx)
             X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            X_test_scaled = self.scaler.transform(self._take_rows(X, test_idx))
             
             logger.info("🤖 Training ensemble model...")
             # Train ensemble model
-            self.model.fit(X_train_scaled, y_train)
+            self._fit_ensemble(X_train_scaled, y_train, report_phase)
             
             # Evaluate model
+            report_phase('evaluating')
             y_pred = self.model.predict(X_test_scaled)
             accuracy = accuracy_score(y_test, y_pred)
             
             logger.info(f"✅ Model training completed!")
             logger.info(f"📈 Test Accuracy: {accuracy:.3f}")
             
-            # Cross-validation for robustness
-            cv_scores = cross_val_score(self.model, X_train_scaled, y_train, cv=5)
-            logger.info(f"📊 Cross-validation accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std() * 2:.3f})")
+            # Optional cross-validation for robustness (parallel folds)
+            if cross_validate:
+                report_phase('cross_validating')
+                self._cross_validate_matrix(X_train, y_train, cv_folds, cv_jobs)
             
             print("\n" + "="*50)
             print("🎯 DETAILED CLASSIFICATION REPORT:")
@@ -158,79 +293,710 @@ class BankingAPKClassifier:
             print(confusion_matrix(y_test, y_pred))
             print("="*50)
             
+            self._seed_update_window(X, y, train_idx, test_idx)
+            self.update_history = []
+            self.training_metrics = {
+                'source': 'train_on_dataset',
+                'accuracy': float(accuracy),
+                'holdout_samples': int(len(y_test)),
+                'training_seconds': round(time.time() - start_time, 2),
+                'trained_at': datetime.now().isoformat()
+            }
+            
             self.is_trained = True
+            self.serving_members = self.serving_weights = self.serving_classes = None
+            if self.inference_engine == 'compiled':
+                self.compile_trees()
+            self._reset_explanations()
+            self._apply_precision()
             return accuracy
             
         except Exception as e:
             logger.error(f"❌ Training failed: {str(e)}")
             raise
     
-    def predict_with_explanation(self, features):
-        """Predict with detailed explanation"""
+    def _select_features(self, X, y, train_idx, feature_names, report_phase):
+        """Run the feature-selection stage and return X restricted to the retained columns
+        
+        Selection only looks at the training rows, so the holdout accuracy is
+        not biased by it. Critical features are always retained.
+        """
+        self.source_feature_names = self.selected_columns = self.feature_selection = None
+        if not self.min_feature_frequency and self.feature_budget is None:
+            self.feature_names = feature_names
+            return X
+        
+        report_phase('selecting_features')
+        logger.info(f"🔎 Selecting features (min frequency {self.min_feature_frequency}, "
+                    f"budget {self.feature_budget})...")
+        retained, report = select_features(
+            X[train_idx], y[train_idx], feature_names,
+            min_frequency=self.min_feature_frequency,
+            budget=self.feature_budget,
+            keep=self.critical_features
+        )
+        
+        self.source_feature_names = list(feature_names)
+        self.selected_columns = retained
+        self.feature_selection = report
+        self.feature_names = [feature_names[i] for i in retained]
+        logger.info(f"🔎 Retained {report['retained_features']} of {report['source_features']} features "
+                    f"({report['dropped_by_frequency']} rare/constant, "
+                    f"{report['dropped_by_importance']} below the importance cut)")
+        return np.ascontiguousarray(X[:, retained])
+    
+    def select_model_columns(self, X, feature_names):
+        """Restrict a dataset matrix with the given column names to the model's feature columns
+        
+        Accepts matrices in the model's own column layout or, for a model
+        trained with feature selection, in the full dataset layout.
+        """
+        if feature_names == self.feature_names:
+            return X
+        if self.source_feature_names is not None and feature_names == self.source_feature_names:
+            return X[:, self.selected_columns]
+        raise ValueError("Dataset columns do not match the model's feature names")
+    
+    def _fit_ensemble(self, X, y, report_phase):
+        """Fit the VotingClassifier one member at a time
+        
+        Same result as VotingClassifier.fit (members are fitted on label-encoded
+        targets and exposed through estimators_ / named_estimators_), but each
+        member's fit is reported as its own phase.
+        """
+        label_encoder = LabelEncoder().fit(y)
+        y_encoded = label_encoder.transform(y)
+        
+        fitted = Bunch()
+        for name, estimator in self.model.estimators:
+            if estimator == 'drop':
+                fitted[name] = estimator
+                continue
+            report_phase(f'fitting_{name}')
+            logger.info(f"🤖 Fitting {name}...")
+            fitted[name] = clone(estimator).fit(X, y_encoded)
+        
+        self.model.le_ = label_encoder
+        self.model.classes_ = label_encoder.classes_
+        self.model.estimators_ = [estimator for estimator in fitted.values() if estimator != 'drop']
+        self.model.named_estimators_ = fitted
+        return self.model
+    
+    def run_cross_validation(self, dataset_path='data/datasets/fullset_train.csv', cv_folds=5, cv_jobs=-1):
+        """Cross-validate the ensemble configuration as a separate step
+        
+        Rebuilds the training split used by train_on_dataset and runs the folds
+        in parallel; the fold metrics are stored in cv_metrics and saved with the
+        model artifact.
+        """
+        X, y, feature_names = self._load_training_data(dataset_path)
+        if self.feature_names is not None:
+            X = self.select_model_columns(X, feature_names)
+        
+        train_idx, _ = train_test_split(
+            np.arange(len(y)), test_size=0.2, random_state=42, stratify=y
+        )
+        return self._cross_validate_matrix(X[train_idx], y[train_idx], cv_folds, cv_jobs)
+    
+    def _cross_validate_matrix(self, X, y, cv_folds, cv_jobs):
+        """Run stratified CV folds in worker processes over a shared memory-mapped matrix"""
+        logger.info(f"📊 Cross-validating ensemble: {cv_folds} folds, n_jobs={cv_jobs}")
+        start_time = time.time()
+        
+        # Workers each fit a full ensemble; keep the members single-threaded to
+        # avoid oversubscribing the CPU with fold-level parallelism
+        fold_model = clone(self.model).set_params(rf__n_jobs=1, xgb__n_jobs=1)
+        folds = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=42).split(X, y)
+        
+        mmap_dir = tempfile.mkdtemp(prefix='bankguard_cv_')
+        try:
+            # The compact uint8 matrix is written once and memory-mapped read-only
+            # by every worker instead of being pickled into each process
+            mmap_path = os.path.join(mmap_dir, 'X_train.mmap')
+            joblib.dump(np.ascontiguousarray(X), mmap_path)
+            X_shared = joblib.load(mmap_path, mmap_mode='r')
+            
+            fold_results = Parallel(n_jobs=cv_jobs)(
+                delayed(_fit_and_score_fold)(fold_model, X_shared, y, train_idx, test_idx)
+                for train_idx, test_idx in folds
+            )
+        finally:
+            shutil.rmtree(mmap_dir, ignore_errors=True)
+        
+        metric_names = ['accuracy', 'precision', 'recall', 'f1']
+        self.cv_metrics = {
+            'n_folds': cv_folds,
+            'folds': fold_results,
+            'mean': {name: float(np.mean([fold[name] for fold in fold_results])) for name in metric_names},
+            'std': {name: float(np.std([fold[name] for fold in fold_results])) for name in metric_names},
+            'elapsed_seconds': round(time.time() - start_time, 2),
+            'completed_at': datetime.now().isoformat()
+        }
+        
+        logger.info(f"📊 Cross-validation accuracy: {self.cv_metrics['mean']['accuracy']:.3f} "
+                    f"(+/- {self.cv_metrics['std']['accuracy'] * 2:.3f}) in {self.cv_metrics['elapsed_seconds']}s")
+        return self.cv_metrics
+    
+    def _load_training_data(self, dataset_path):
+        """Read a DroidRL CSV into a uint8 feature matrix, label vector and feature names
+        
+        Goes through the binary dataset cache (memory-mapped .npy arrays keyed by
+        the CSV's hash) unless dataset_cache is set to None.
+        """
+        if self.dataset_cache is not None:
+            return self.dataset_cache.load(dataset_path)
+        
+        X, y, feature_names, _ = read_droidrl_csv(dataset_path)
+        return X, y, feature_names
+    
+    def _take_rows(self, X, rows):
+        """Dense rows of a packed or dense training matrix"""
+        if isinstance(X, PackedFeatures):
+            return X.take(rows).toarray()
+        return X[rows]
+    
+    def _seed_update_window(self, X, y, train_idx, test_idx):
+        """Keep a sample of the training split and holdout for later incremental updates"""
+        rng = np.random.RandomState(42)
+        window_idx = np.sort(rng.permutation(train_idx)[:self.UPDATE_WINDOW_SIZE])
+        reference_idx = np.sort(rng.permutation(test_idx)[:self.REFERENCE_HOLDOUT_SIZE])
+        
+        self.update_window = (self._take_rows(X, window_idx).astype(np.uint8), y[window_idx])
+        self.reference_holdout = (self._take_rows(X, reference_idx).astype(np.uint8), y[reference_idx])
+    
+    def incremental_update(self, features, labels, holdout_size=0.2, xgb_rounds=20,
+                           rf_refresh_trees=30, max_accuracy_drop=0.005, apply=True):
+        """Fold newly labelled samples into the fitted ensemble without a full retrain
+        
+        The new samples join a sliding window of recent labelled data (seeded
+        from the training split, capped at UPDATE_WINDOW_SIZE rows) and a
+        candidate ensemble is built from the current one:
+        
+        - xgb: xgb_rounds more boosting rounds on the window, starting from the
+          current booster
+        - rf:  the rf_refresh_trees oldest trees are replaced by trees grown on
+          the window
+        - lr:  refit on the window (liblinear has no partial fit; the fit takes
+          milliseconds)
+        - svm: kept as is; it is refreshed by full retraining only
+        
+        The scaler is not refitted, so the untouched members stay valid. Part
+        of the new samples (holdout_size) is held out; current and candidate
+        ensembles are scored on it and on the reference holdout kept from
+        training, and the candidate is swapped in only if apply is set and its
+        combined holdout accuracy is within max_accuracy_drop of the current
+        model's. Returns the update report.
+        """
         start_time = time.time()
         
         try:
             if not self.is_trained:
                 raise ValueError("Model not trained. Call train_on_dataset() first.")
+            if self.serving_members is not None:
+                raise ValueError("Serving artifacts cannot be updated; load the full model with load_model()")
             
-            # Handle different input formats
-            if isinstance(features, dict):
-                feature_vector = self._dict_to_vector(features)
-            elif isinstance(features, list):
-                feature_vector = np.array(features).reshape(1, -1)
-            else:
-                feature_vector = np.array(features).reshape(1, -1)
-            
-            # Ensure correct number of features
-            if feature_vector.shape[1] != len(self.feature_names):
-                logger.warning(f"Feature mismatch: got {feature_vector.shape[1]}, expected {len(self.feature_names)}")
-                # Pad or truncate as needed
-                if feature_vector.shape[1] < len(self.feature_names):
-                    padding = np.zeros((1, len(self.feature_names) - feature_vector.shape[1]))
-                    feature_vector = np.concatenate([feature_vector, padding], axis=1)
-                else:
-                    feature_vector = feature_vector[:, :len(self.feature_names)]
+            X_new = self._to_matrix(features)
+            y_new = np.asarray(labels).ravel()
+            if X_new.shape[0] != len(y_new):
+                raise ValueError(f"Got {X_new.shape[0]} samples but {len(y_new)} labels")
+            if not np.isin(y_new, self._classes()).all():
+                raise ValueError(f"Labels must be in {list(self._classes())}")
+            if len(y_new) < 2:
+                raise ValueError("Need at least 2 labelled samples for an incremental update")
             
-            # Scale features
-            feature_vector_scaled = self.scaler.transform(feature_vector)
-            
-            # Make prediction
-            prediction = self.model.predict(feature_vector_scaled)[0]
-            prediction_proba = self.model.predict_proba(feature_vector_scaled)[0]
-            
-            # Calculate risk score (0-10 scale)
-            risk_score = prediction_proba[1] * 10
-            confidence = max(prediction_proba)
-            
-            # Generate explanation
-            explanation = self._generate_explanation(feature_vector[0], prediction, risk_score)
-            
-            processing_time = time.time() - start_time
-            
-            return {
-                'prediction': 'MALICIOUS' if prediction == 1 else 'LEGITIMATE',
-                'risk_score': round(risk_score, 2),
-                'confidence': round(confidence * 100, 1),
-                'explanation': explanation,
-                'processing_time': round(processing_time, 2),
-                'prediction_probabilities': {
-                    'legitimate': round(prediction_proba[0] * 100, 1),
-                    'malicious': round(prediction_proba[1] * 100, 1)
+            X_new_compact = X_new.astype(np.uint8)
+            if not np.array_equal(X_new_compact, X_new):
+                raise ValueError("Feature values must be integers in 0-255")
+            
+            # Hold out part of the new samples (stratified when both classes allow it)
+            label_values, label_counts = np.unique(y_new, return_counts=True)
+            stratify = y_new if len(label_values) > 1 and label_counts.min() >= 2 else None
+            train_rows, holdout_rows = train_test_split(
+                np.arange(len(y_new)), test_size=holdout_size, random_state=42, stratify=stratify
+            )
+            
+            window_X, window_y = self.update_window if self.update_window is not None else \
+                (np.empty((0, X_new.shape[1]), dtype=np.uint8), np.empty(0, dtype=y_new.dtype))
+            window_X = np.concatenate([window_X, X_new_compact[train_rows]])[-self.UPDATE_WINDOW_SIZE:]
+            window_y = np.concatenate([window_y, y_new[train_rows]])[-self.UPDATE_WINDOW_SIZE:]
+            if len(np.unique(window_y)) < len(self._classes()):
+                raise ValueError("Update window must contain samples of every class")
+            
+            logger.info(f"🔄 Incremental update: {len(y_new)} new samples, window {len(window_y)} samples")
+            candidate = self._build_updated_ensemble(
+                self.scaler.transform(window_X), window_y, xgb_rounds, rf_refresh_trees
+            )
+            
+            # Score current and candidate ensembles on the holdouts before swapping
+            holdouts = {'new_samples': (X_new_compact[holdout_rows], y_new[holdout_rows])}
+            if self.reference_holdout is not None and len(self.reference_holdout[1]) > 0:
+                holdouts['reference'] = self.reference_holdout
+            X_holdout_scaled = self.scaler.transform(np.concatenate([X for X, _ in holdouts.values()]))
+            y_holdout = np.concatenate([y for _, y in holdouts.values()])
+            
+            predictions = self._compare_ensembles(candidate, X_holdout_scaled)
+            subsets = {'combined': slice(None)}
+            offset = 0
+            for name, (_, y_subset) in holdouts.items():
+                subsets[name] = slice(offset, offset + len(y_subset))
+                offset += len(y_subset)
+            
+            metrics = {'current': {}, 'candidate': {}}
+            for model_name, y_pred in predictions.items():
+                for name, rows in subsets.items():
+                    metrics[model_name][name] = _classification_metrics(y_holdout[rows], y_pred[rows])
+                    metrics[model_name][name]['samples'] = int(len(y_holdout[rows]))
+            
+            accuracy_change = metrics['candidate']['combined']['accuracy'] - metrics['current']['combined']['accuracy']
+            accepted = accuracy_change >= -max_accuracy_drop
+            swapped = bool(apply and accepted)
+            
+            if swapped:
+                self.model = candidate
+                # Held-out rows were only needed for the decision; keep them for the next update
+                self.update_window = (
+                    np.concatenate([window_X, X_new_compact[holdout_rows]])[-self.UPDATE_WINDOW_SIZE:],
+                    np.concatenate([window_y, y_new[holdout_rows]])[-self.UPDATE_WINDOW_SIZE:]
+                )
+                self.training_samples += len(y_new)
+                self.training_metrics = {
+                    'source': 'incremental_update',
+                    'accuracy': metrics['candidate']['combined']['accuracy'],
+                    'holdout_samples': metrics['candidate']['combined']['samples'],
+                    'training_seconds': round(time.time() - start_time, 2),
+                    'trained_at': datetime.now().isoformat()
                 }
+                if self.inference_engine == 'compiled':
+                    self.compile_trees()
+                self._reset_explanations()
+                self._apply_precision()
+            
+            report = {
+                'new_samples': int(len(y_new)),
+                'holdout_samples': int(len(holdout_rows)),
+                'window_samples': int(len(window_y)),
+                'members_updated': {
+                    'xgb': f'+{xgb_rounds} boosting rounds',
+                    'rf': f'{rf_refresh_trees} trees refreshed',
+                    'lr': 'refit on window'
+                },
+                'metrics': metrics,
+                'accuracy_change': float(accuracy_change),
+                'accepted': bool(accepted),
+                'swapped': swapped,
+                'elapsed_seconds': round(time.time() - start_time, 2),
+                'completed_at': datetime.now().isoformat()
             }
+            if swapped:
+                self.update_history.append({key: value for key, value in report.items() if key != 'members_updated'})
+            
+            logger.info(f"{'✅' if swapped else '⚠️'} Incremental update {'applied' if swapped else 'not applied'}: "
+                        f"holdout accuracy {metrics['current']['combined']['accuracy']:.3f} -> "
+                        f"{metrics['candidate']['combined']['accuracy']:.3f} in {report['elapsed_seconds']}s")
+            return report
+            
+        except Exception as e:
+            logger.error(f"❌ Incremental update failed: {str(e)}")
+            raise
+    
+    def _compare_ensembles(self, candidate, X_scaled):
+        """Soft-voting predictions of the current and candidate ensembles
+        
+        Each member is evaluated once; members the candidate shares with the
+        current model (the SVM) are not evaluated twice.
+        """
+        weights = self._member_weights()
+        current_probabilities = {
+            name: member.predict_proba(X_scaled) for name, member in self.model.named_estimators_.items()
+        }
+        candidate_probabilities = {
+            name: current_probabilities[name] if member is self.model.named_estimators_[name]
+            else member.predict_proba(X_scaled)
+            for name, member in candidate.named_estimators_.items()
+        }
+        return {
+            'current': self._classes()[np.argmax(self._soft_vote(current_probabilities, weights), axis=1)],
+            'candidate': self._classes()[np.argmax(self._soft_vote(candidate_probabilities, weights), axis=1)]
+        }
+    
+    def _build_updated_ensemble(self, X_window_scaled, y_window, xgb_rounds, rf_refresh_trees):
+        """Copy of the fitted VotingClassifier with the RF, XGBoost and LR members updated on the window"""
+        members = dict(self.model.named_estimators_)
+        seed = 42 + len(self.update_history) + 1
+        
+        if xgb_rounds > 0:
+            # Continued boosting: xgboost copies the given booster, the current one is left untouched
+            current_xgb = members['xgb']
+            updated_xgb = xgb.XGBClassifier(**{**current_xgb.get_params(), 'n_estimators': xgb_rounds})
+            updated_xgb.fit(X_window_scaled, y_window, xgb_model=current_xgb.get_booster())
+            members['xgb'] = updated_xgb.set_params(n_estimators=current_xgb.n_estimators + xgb_rounds)
+        
+        if rf_refresh_trees > 0:
+            # Trees are kept oldest-first, so each refresh replaces the oldest ones
+            current_rf = members['rf']
+            rf_refresh_trees = min(rf_refresh_trees, len(current_rf.estimators_))
+            fresh_rf = clone(current_rf).set_params(n_estimators=rf_refresh_trees, random_state=seed)
+            fresh_rf.fit(X_window_scaled, y_window)
+            updated_rf = copy.copy(current_rf)
+            updated_rf.estimators_ = current_rf.estimators_[rf_refresh_trees:] + fresh_rf.estimators_
+            members['rf'] = updated_rf
+        
+        members['lr'] = clone(members['lr']).fit(X_window_scaled, y_window)
+        
+        candidate = copy.copy(self.model)
+        candidate.estimators_ = [members[name] for name in self.model.named_estimators_]
+        candidate.named_estimators_ = Bunch(**members)
+        return candidate
+    
+    def predict_with_explanation(self, features, include_member_probabilities=False):
+        """Predict with detailed explanation"""
+        start_time = time.time()
+        
+        try:
+            if not self.is_trained:
+                raise ValueError("Model not trained. Call train_on_dataset() first.")
+            
+            feature_vector = self.prepare_features(features)
+            
+            # Scale features
+            feature_vector_scaled = self._scale(feature_vector)
+            
+            # Make prediction (each ensemble member is evaluated once)
+            predictions, prediction_proba, member_probabilities, decision_stages = \
+                self._ensemble_predict(feature_vector_scaled)
+            
+            result = self._build_result(feature_vector[0], predictions[0], prediction_proba[0],
+                                        time.time() - start_time)
+            if self.cascade_band is not None:
+                result['decision_stage'] = str(decision_stages[0])
+            if include_member_probabilities:
+                result['member_probabilities'] = self._format_member_probabilities(member_probabilities, 0)
+            
+            return result
             
         except Exception as e:
             logger.error(f"Prediction failed: {str(e)}")
-            return {
-                'prediction': 'ERROR',
-                'risk_score': 0,
-                'confidence': 0,
-                'explanation': {'summary': f'Analysis failed: {str(e)}'},
-                'processing_time': 0
+            return self._error_result(e)
+    
+    def prepare_features(self, features):
+        """(1, n_features) vector of one sample in the model's column layout"""
+        # Rows built by a FeatureSchema (PackedFeatures) name the layout they were built for
+        schema_hash = getattr(features, 'schema_hash', None)
+        
+        # Handle different input formats
+        if isinstance(features, dict):
+            feature_vector = self._dict_to_vector(features)
+        elif isinstance(features, list):
+            feature_vector = np.array(features).reshape(1, -1)
+        else:
+            feature_vector = to_dense_features(features).reshape(1, -1)
+        
+        # Ensure correct feature layout
+        return self._align_features(feature_vector, schema_hash)
+    
+    def predict_batch(self, features, include_member_probabilities=False):
+        """Predict a batch of samples with one pass of each ensemble member
+        
+        Accepts an (N, n_features) array-like or a list of feature dicts and
+        returns N result records with the same schema as predict_with_explanation.
+        """
+        start_time = time.time()
+        
+        try:
+            if not self.is_trained:
+                raise ValueError("Model not trained. Call train_on_dataset() first.")
+            
+            feature_matrix = self._to_matrix(features)
+            if feature_matrix.shape[0] == 0:
+                return []
+            
+            # Scale once and run each ensemble member once over the whole matrix
+            feature_matrix_scaled = self._scale(feature_matrix)
+            predictions, prediction_proba, member_probabilities, decision_stages = \
+                self._ensemble_predict(feature_matrix_scaled)
+            
+            # Processing time is amortized over the batch
+            processing_time = (time.time() - start_time) / feature_matrix.shape[0]
+            
+            critical_hits = self._schema().critical_hits(feature_matrix)
+            
+            results = []
+            for i in range(feature_matrix.shape[0]):
+                result = self._build_result(feature_matrix[i], predictions[i], prediction_proba[i], processing_time,
+                                            critical_hits[i])
+                if self.cascade_band is not None:
+                    result['decision_stage'] = str(decision_stages[i])
+                if include_member_probabilities:
+                    result['member_probabilities'] = self._format_member_probabilities(member_probabilities, i)
+                results.append(result)
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {str(e)}")
+            return [self._error_result(e) for _ in range(self._batch_length(features))]
+    
+    def _ensemble_predict(self, feature_matrix_scaled):
+        """Single-pass soft voting over the fitted ensemble members
+        
+        VotingClassifier.predict and predict_proba each evaluate every member, so
+        calling both doubles the work. Here each member's predict_proba runs once,
+        the weighted average gives the ensemble probabilities and the label is
+        taken from their argmax (identical to soft-voting predict). With the
+        compiled inference engine the RF and XGBoost members are evaluated from
+        their flattened node arrays for batches up to COMPILED_MAX_BATCH rows.
+        
+        In cascade mode (see set_cascade) the first-stage member scores every
+        row and only rows whose malicious probability falls inside the
+        uncertainty band are escalated to the full ensemble.
+        
+        Returns (predictions, probabilities, member_probabilities, decision_stages)
+        where member_probabilities maps member name to its (N, 2) probability
+        matrix (NaN rows for members a cascade did not run) and decision_stages
+        holds, per row, the name of the stage that decided it.
+        """
+        n_samples = feature_matrix_scaled.shape[0]
+        members = self._inference_members(n_samples)
+        weights = self._member_weights()
+        
+        if self.cascade_band is None:
+            escalate = np.ones(n_samples, dtype=bool)
+            member_probabilities = {}
+        else:
+            lower, upper = self.cascade_band
+            first_stage = members[self.CASCADE_FIRST_STAGE].predict_proba(feature_matrix_scaled)
+            escalate = (first_stage[:, 1] > lower) & (first_stage[:, 1] < upper)
+            member_probabilities = {name: np.full((n_samples, 2), np.nan) for name in members}
+            member_probabilities[self.CASCADE_FIRST_STAGE] = first_stage
+        
+        prediction_proba = member_probabilities.get(self.CASCADE_FIRST_STAGE, np.empty((n_samples, 2))).copy()
+        
+        if escalate.all():
+            # Full ensemble over every row (the NaN placeholders of a cascade are all
+            # replaced; only a first stage that already ran is skipped)
+            for name, member in members.items():
+                if self.cascade_band is None or name != self.CASCADE_FIRST_STAGE:
+                    member_probabilities[name] = member.predict_proba(feature_matrix_scaled)
+            prediction_proba = self._soft_vote(member_probabilities, weights)
+        elif escalate.any():
+            escalated_rows = feature_matrix_scaled[escalate]
+            for name, member in members.items():
+                if name != self.CASCADE_FIRST_STAGE:
+                    member_probabilities[name][escalate] = member.predict_proba(escalated_rows)
+            escalated = {name: proba[escalate] for name, proba in member_probabilities.items()}
+            prediction_proba[escalate] = self._soft_vote(escalated, weights)
+        
+        predictions = self._classes()[np.argmax(prediction_proba, axis=1)]
+        decision_stages = np.where(escalate, 'ensemble', self.CASCADE_FIRST_STAGE)
+        
+        return predictions, prediction_proba, member_probabilities, decision_stages
+    
+    def _inference_members(self, n_samples):
+        """Member name -> predictor (compiled or fitted estimator) used for this batch size"""
+        if self.reduced_members is not None:
+            return dict(self.reduced_members)
+        compiled_members = self.compiled_members if n_samples <= self.COMPILED_MAX_BATCH else {}
+        return {
+            name: compiled_members.get(name, estimator)
+            for name, estimator in self._fitted_members().items()
+        }
+    
+    def _fitted_members(self):
+        """Member name -> fitted predictor, in voting order"""
+        if self.serving_members is not None:
+            return dict(self.serving_members)
+        return {
+            name: estimator for name, estimator in self.model.named_estimators_.items()
+            if estimator != 'drop'
+        }
+    
+    def _classes(self):
+        """Class labels in probability-column order"""
+        if self.serving_members is not None:
+            return self.serving_classes
+        return self.model.classes_
+    
+    def _member_weights(self):
+        """Voting weight per active member name (None for equal weights)"""
+        if self.serving_members is not None:
+            return self.serving_weights
+        if self.model.weights is None:
+            return None
+        return {
+            name: weight for (name, estimator), weight in zip(self.model.estimators, self.model.weights)
+            if estimator != 'drop'
+        }
+    
+    def _soft_vote(self, member_probabilities, weights):
+        """Weighted average of member probability matrices"""
+        names = list(member_probabilities)
+        return np.average(
+            np.stack([member_probabilities[name] for name in names]), axis=0,
+            weights=None if weights is None else [weights[name] for name in names]
+        )
+    
+    def set_cascade(self, lower=0.1, upper=0.9):
+        """Enable cascade inference with the given uncertainty band, or disable it with lower=None
+        
+        Rows whose first-stage (logistic regression) malicious probability is
+        <= lower or >= upper are decided by that stage alone; the rest are
+        escalated to the full ensemble.
+        """
+        if lower is None:
+            self.cascade_band = None
+            logger.info("🔀 Cascade inference disabled")
+            return
+        
+        if not 0.0 <= lower < upper <= 1.0:
+            raise ValueError(f"Invalid cascade band ({lower}, {upper}); expected 0 <= lower < upper <= 1")
+        
+        self.cascade_band = (lower, upper)
+        logger.info(f"🔀 Cascade inference enabled: {self.CASCADE_FIRST_STAGE} first, escalating {lower} < p < {upper}")
+    
+    def set_precision(self, precision):
+        """Serve from 'float64' (fitted/compiled members as trained) or reduced 'float32' members
+        
+        float32 keeps the scaler statistics, tree thresholds and linear weights
+        in float32 and scales inputs in float32. Trees reach exactly the same
+        leaves (see CompiledTreeEnsemble.to_float32) and are always evaluated
+        compiled; RF leaf probabilities are fixed point, XGBoost leaf margins
+        float32. The RBF SVM member is unchanged (libsvm computes in float64).
+        scripts/verify_reduced_precision.py measures agreement with float64.
+        """
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {self.PRECISIONS}")
+        self.precision = precision
+        self._apply_precision()
+    
+    def _apply_precision(self):
+        """(Re)build the reduced-precision members for the current model, or drop them"""
+        if self.precision == 'float64' or not self.is_trained:
+            self.reduced_members = self.reduced_scaler = None
+            return
+        
+        compiled = self.compiled_members or self._compile_tree_members()
+        members = {}
+        for name, member in self._fitted_members().items():
+            if name in compiled:
+                members[name] = compiled[name].to_float32()
+            elif isinstance(member, (LogisticRegression, LinearModel)):
+                members[name] = LinearModel(member.coef_, member.intercept_, dtype=np.float32)
+            else:
+                members[name] = member
+        
+        self.reduced_members = members
+        self.reduced_scaler = (
+            np.asarray(self.scaler.mean_, dtype=np.float32),
+            np.asarray(self.scaler.scale_, dtype=np.float32)
+        )
+        logger.info("🔬 Reduced-precision (float32) inference enabled")
+    
+    def _scale(self, feature_matrix):
+        """Standardize features for inference (in float32 when reduced precision is enabled)"""
+        if self.reduced_scaler is None:
+            return self.scaler.transform(feature_matrix)
+        mean, scale = self.reduced_scaler
+        return (np.asarray(feature_matrix, dtype=np.float32) - mean) / scale
+    
+    def _format_member_probabilities(self, member_probabilities, row):
+        """Per-member probabilities of one sample, formatted like prediction_probabilities"""
+        return {
+            name: {
+                'legitimate': round(proba[row][0] * 100, 1),
+                'malicious': round(proba[row][1] * 100, 1)
             }
+            for name, proba in member_probabilities.items()
+            if not np.isnan(proba[row][0])
+        }
     
-    def _generate_explanation(self, feature_vector, prediction, risk_score):
-        """Generate human-readable explanation"""
+    def _to_matrix(self, features):
+        """Convert a batch (array-like, packed, sparse or list of feature dicts) to a 2-D feature matrix"""
+        if isinstance(features, dict):
+            return self._dict_to_vector(features)
+        
+        if isinstance(features, (list, tuple)) and len(features) > 0 and isinstance(features[0], dict):
+            return self._schema().dicts_to_matrix(features)
+        
+        schema_hash = getattr(features, 'schema_hash', None)
+        feature_matrix = to_dense_features(features)
+        if feature_matrix.ndim == 1:
+            feature_matrix = feature_matrix.reshape(1, -1)
+        elif feature_matrix.ndim != 2:
+            raise ValueError(f"Expected a 2-D feature matrix, got shape {feature_matrix.shape}")
+        
+        return self._align_features(feature_matrix, schema_hash)
+    
+    def _align_features(self, feature_matrix, schema_hash=None):
+        """Check that feature columns are in the model's layout
+        
+        Full-width vectors of a model trained with feature selection are
+        reduced to the retained columns. Rows tagged with another schema hash,
+        or of any other width, raise ValueError: they are never padded or
+        truncated into place.
+        """
+        schema = self._schema()
+        n_features = schema.n_features
+        is_source_layout = self.source_feature_names is not None and \
+            feature_matrix.shape[1] == len(self.source_feature_names)
+        if schema_hash is not None and schema_hash != schema.schema_hash:
+            if is_source_layout and schema_hash == feature_schema_hash(self.source_feature_names):
+                return feature_matrix[:, self.selected_columns]
+            schema.check(schema_hash)
+        if is_source_layout and feature_matrix.shape[1] != n_features:
+            return feature_matrix[:, self.selected_columns]
+        if feature_matrix.shape[1] != n_features:
+            raise ValueError(f"Feature vector has {feature_matrix.shape[1]} columns, model expects {n_features} "
+                             f"(feature schema {schema.schema_hash[:12]})")
+        return feature_matrix
+    
+    def _batch_length(self, features):
+        """Number of samples in a batch input (used to size error records)"""
+        if isinstance(features, dict):
+            return 1
+        if isinstance(features, (list, tuple)) and len(features) > 0 and isinstance(features[0], dict):
+            return len(features)
+        try:
+            return np.atleast_2d(np.asarray(features, dtype=object)).shape[0]
+        except Exception:
+            return 1
+    
+    def _build_result(self, feature_vector, prediction, prediction_proba, processing_time, critical_hits=None):
+        """Build a prediction result record for one sample"""
+        # Calculate risk score (0-10 scale)
+        risk_score = prediction_proba[1] * 10
+        confidence = max(prediction_proba)
+        
+        # Generate explanation
+        explanation = self._generate_explanation(feature_vector, prediction, risk_score, critical_hits)
+        
+        return {
+            'prediction': 'MALICIOUS' if prediction == 1 else 'LEGITIMATE',
+            'risk_score': round(risk_score, 2),
+            'confidence': round(confidence * 100, 1),
+            'explanation': explanation,
+            'processing_time': round(processing_time, 2),
+            'prediction_probabilities': {
+                'legitimate': round(prediction_proba[0] * 100, 1),
+                'malicious': round(prediction_proba[1] * 100, 1)
+            }
+        }
+    
+    def _error_result(self, error):
+        """Build the result record returned when prediction fails"""
+        return {
+            'prediction': 'ERROR',
+            'risk_score': 0,
+            'confidence': 0,
+            'explanation': {'summary': f'Analysis failed: {str(error)}'},
+            'processing_time': 0
+        }
+    
+    def _generate_explanation(self, feature_vector, prediction, risk_score, critical_hits=None):
+        """Generate human-readable explanation
+        
+        critical_hits is the sample's row of FeatureSchema.critical_hits; batch
+        callers compute it for all rows at once.
+        """
         explanation = {
             'summary': '',
             'key_indicators': [],
@@ -238,19 +1004,19 @@ class BankingAPKClassifier:
             'recommendation': ''
         }
         
-        # Analyze critical features
-        critical_features_detected = []
-        for i, feature_name in enumerate(self.feature_names):
-            if i < len(feature_vector) and feature_vector[i] == 1:
-                if feature_name in self.critical_features:
-                    critical_features_detected.append({
-                        'feature': feature_name,
-                        'risk_weight': self.critical_features[feature_name],
-                        'explanation': self._get_feature_explanation(feature_name)
-                    })
-        
-        # Sort by risk weight
-        critical_features_detected.sort(key=lambda x: x['risk_weight'], reverse=True)
+        # Analyze critical features (schema columns are already in descending risk weight order)
+        schema = self._schema()
+        if critical_hits is None:
+            critical_hits = schema.critical_hits(feature_vector)[0]
+        detected_names = [schema.critical_names[k] for k in np.flatnonzero(critical_hits)]
+        critical_features_detected = [
+            {
+                'feature': feature_name,
+                'risk_weight': self.critical_features[feature_name],
+                'explanation': self._get_feature_explanation(feature_name)
+            }
+            for feature_name in detected_names
+        ]
         
         # Generate summary
         if prediction == 1:  # Malicious
@@ -281,49 +1047,418 @@ class BankingAPKClassifier:
         
         return explanations.get(feature_name, f'Feature {feature_name} detected')
     
+    def explain_contributions(self, features, top_k=10):
+        """Per-feature contributions of the ensemble members to one prediction
+        
+        The RF and XGBoost members are decomposed with exact path-dependent
+        TreeSHAP over their compiled trees (RF in probability space, XGBoost in
+        log-odds), the logistic regression member into its linear terms
+        (log-odds); the SVM member is not decomposed. Each member's
+        base_value + sum of all contributions equals its output, and the top_k
+        largest contributions are listed.
+        
+        This is much slower than predict_with_explanation, so it is only run
+        on request. Results are cached per model by a hash of the feature
+        vector; 'cached' tells whether this call was served from the cache.
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Call train_on_dataset() first.")
+        
+        feature_vector = self._to_matrix(features)
+        if feature_vector.shape[0] != 1:
+            raise ValueError("Contributions are explained for one sample at a time")
+        feature_vector = np.ascontiguousarray(feature_vector, dtype=np.float64)
+        
+        key = hashlib.sha256(feature_vector.tobytes()).hexdigest()
+        with self._explanation_lock:
+            contributions = self._explanation_cache.get(key)
+            if contributions is not None:
+                self._explanation_cache.move_to_end(key)
+        
+        cached = contributions is not None
+        if not cached:
+            contributions = self._compute_contributions(feature_vector)
+            with self._explanation_lock:
+                self._explanation_cache[key] = contributions
+                while len(self._explanation_cache) > self.EXPLANATION_CACHE_SIZE:
+                    self._explanation_cache.popitem(last=False)
+        
+        weights = self._member_weights() or {}
+        members = {}
+        for name, (output_space, base_value, phi) in contributions['members'].items():
+            top = [i for i in np.argsort(-np.abs(phi), kind='stable')[:top_k] if phi[i] != 0]
+            members[name] = {
+                'output_space': output_space,
+                'weight': weights.get(name),
+                'base_value': round(base_value, 6),
+                'output': round(base_value + float(phi.sum()), 6),
+                'contributions': [
+                    {
+                        'feature': self.feature_names[i],
+                        'value': float(feature_vector[0, i]),
+                        'contribution': round(float(phi[i]), 6)
+                    }
+                    for i in top
+                ]
+            }
+        
+        return {
+            'members': members,
+            'unexplained_members': contributions['unexplained_members'],
+            'cached': cached
+        }
+    
+    def _compute_contributions(self, feature_vector):
+        """Full contribution vectors per explainable member: name -> (output space, base value, contributions)"""
+        x_scaled = self.scaler.transform(feature_vector)[0]
+        tree_explainers = self._get_tree_explainers()
+        
+        members = {}
+        unexplained = []
+        for name, member in self._fitted_members().items():
+            if name in tree_explainers:
+                explainer = tree_explainers[name]
+                members[name] = (explainer.output_space, explainer.base_value, explainer.shap_values(x_scaled))
+            elif isinstance(member, (LogisticRegression, LinearModel)):
+                base_value, phi = linear_contributions(member, x_scaled)
+                members[name] = ('log_odds', base_value, phi)
+            else:
+                unexplained.append(name)
+        
+        return {'members': members, 'unexplained_members': unexplained}
+    
+    def _get_tree_explainers(self):
+        """TreePathExplainer per compiled tree member, built once per model"""
+        with self._explanation_lock:
+            if self._tree_explainers is None:
+                explainers = {}
+                for name, ensemble in (self.compiled_members or self._compile_tree_members()).items():
+                    if ensemble.cover is None:
+                        logger.warning(f"⚠️ No node cover stored for {name}; re-save the model to explain it")
+                        continue
+                    explainers[name] = TreePathExplainer(ensemble)
+                self._tree_explainers = explainers
+            return self._tree_explainers
+    
+    def _reset_explanations(self):
+        """Drop explainers and cached explanations of a replaced model"""
+        with self._explanation_lock:
+            self._tree_explainers = None
+            self._explanation_cache.clear()
+    
     def _dict_to_vector(self, features_dict):
         """Convert feature dictionary to vector"""
+        return self._schema().dicts_to_matrix([features_dict])
+    
+    def _build_feature_schema(self, expected_hash=None):
+        """Precompute the feature index map and critical feature columns for the current feature set
+        
+        expected_hash is the schema hash recorded in a loaded artifact (older
+        artifacts have none); a different layout means a corrupt artifact.
+        """
+        self.feature_schema = FeatureSchema(self.feature_names, self.critical_features)
+        if expected_hash is not None and expected_hash != self.feature_schema.schema_hash:
+            raise ValueError(f"Feature names do not match the artifact's feature schema {expected_hash[:12]}")
+    
+    def _schema(self):
+        """Feature schema of the trained feature set"""
         if self.feature_names is None:
             raise ValueError("Feature names not defined. Train model first.")
-        
-        feature_vector = []
-        for feature_name in self.feature_names:
-            feature_vector.append(features_dict.get(feature_name, 0))
-        
-        return np.array(feature_vector).reshape(1, -1)
+        if self.feature_schema is None:
+            self._build_feature_schema()
+        return self.feature_schema
     
     def save_model(self, model_path):
-        """Save trained model and components"""
+        """Save trained model and components
+        
+        Writes the full artifact (fitted sklearn/XGBoost ensemble, used for
+        retraining and load_model) plus a serving artifact and a portable
+        artifact next to it (see save_serving_model and export_portable).
+        """
         try:
-            os.makedirs(os.path.dirname(model_path), exist_ok=True)
+            if self.serving_members is not None:
+                raise ValueError("Model was loaded from a serving artifact and cannot be re-saved")
+            os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
             
             model_data = {
                 'model': self.model,
                 'scaler': self.scaler,
                 'feature_names': self.feature_names,
+                'feature_schema_hash': self._schema().schema_hash if self.feature_names is not None else None,
+                'source_feature_names': self.source_feature_names,
+                'selected_columns': self.selected_columns,
+                'feature_selection': self.feature_selection,
                 'is_trained': self.is_trained,
                 'training_samples': self.training_samples,
-                'critical_features': self.critical_features
+                'critical_features': self.critical_features,
+                'svm_member': self.svm_member,
+                'ensemble_params': self.ensemble_params,
+                'cv_metrics': self.cv_metrics,
+                'training_metrics': self.training_metrics,
+                'update_window': self.update_window,
+                'reference_holdout': self.reference_holdout,
+                'update_history': self.update_history
             }
             
             joblib.dump(model_data, model_path)
             logger.info(f"💾 Model saved to: {model_path}")
             
+            if self.is_trained:
+                self.save_serving_model(model_path)
+                self.export_portable(self.portable_artifact_path(model_path))
+            
         except Exception as e:
             logger.error(f"Failed to save model: {str(e)}")
             raise
     
-    def load_model(self, model_path):
+    @staticmethod
+    def serving_artifact_path(model_path):
+        """Path of the serving artifact that accompanies a full model artifact"""
+        base, ext = os.path.splitext(model_path)
+        return f"{base}.serving{ext or '.joblib'}"
+    
+    def save_serving_model(self, model_path):
+        """Save the inference-only artifact used by load_serving_model
+        
+        Trees are stored as compiled node arrays instead of sklearn/XGBoost
+        objects, and the file is written uncompressed so every large array can be
+        memory-mapped. Worker processes that load it share one physical copy of
+        those arrays through the page cache.
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Call train_on_dataset() first.")
+        
+        compiled_trees = self.compiled_members or self._compile_tree_members()
+        members = self._fitted_members()
+        serving_path = self.serving_artifact_path(model_path)
+        
+        serving_data = {
+            'format': 'bankguard-serving',
+            'format_version': 1,
+            'scaler': self.scaler,
+            'feature_names': self.feature_names,
+            'feature_schema_hash': self._schema().schema_hash,
+            'source_feature_names': self.source_feature_names,
+            'selected_columns': self.selected_columns,
+            'feature_selection': self.feature_selection,
+            'training_samples': self.training_samples,
+            'critical_features': self.critical_features,
+            'svm_member': self.svm_member,
+            'cv_metrics': self.cv_metrics,
+            'training_metrics': self.training_metrics,
+            'classes': np.asarray(self._classes()),
+            'weights': self._member_weights(),
+            'member_order': list(members),
+            'compiled_trees': {name: member.to_arrays() for name, member in compiled_trees.items()},
+            'estimators': {name: member for name, member in members.items() if name not in compiled_trees}
+        }
+        
+        joblib.dump(serving_data, serving_path)
+        logger.info(f"💾 Serving artifact saved to: {serving_path}")
+        return serving_path
+    
+    def load_serving_model(self, model_path, mmap_mode='c'):
+        """Load the inference-only artifact with its arrays memory-mapped
+        
+        Cold start only unpickles the small objects; node arrays, support
+        vectors and scaler statistics stay in the page cache and are shared by
+        every process on the host. mmap_mode='c' (copy-on-write) is used because
+        libsvm rejects read-only buffers; nothing writes to them, so pages are
+        never copied.
+        """
+        try:
+            serving_path = model_path if model_path.endswith('.serving.joblib') else \
+                self.serving_artifact_path(model_path)
+            serving_data = joblib.load(serving_path, mmap_mode=mmap_mode)
+            if serving_data.get('format') != 'bankguard-serving':
+                raise ValueError(f"{serving_path} is not a BankGuard serving artifact")
+            
+            members = {}
+            for name in serving_data['member_order']:
+                if name in serving_data['compiled_trees']:
+                    members[name] = CompiledTreeEnsemble.from_arrays(serving_data['compiled_trees'][name])
+                else:
+                    members[name] = serving_data['estimators'][name]
+            
+            self._set_serving_state(members, serving_data['scaler'], serving_data)
+            
+            logger.info(f"📂 Serving model loaded from: {serving_path} (mmap_mode={mmap_mode})")
+            logger.info(f"Features: {len(self.feature_names)}")
+            
+        except Exception as e:
+            logger.error(f"Failed to load serving model: {str(e)}")
+            raise
+    
+    def _set_serving_state(self, members, scaler, serving_data):
+        """Install inference-only members and metadata from a serving or portable artifact"""
+        self.serving_members = members
+        self.serving_weights = serving_data['weights']
+        self.serving_classes = np.asarray(serving_data['classes'])
+        self.scaler = scaler
+        self.feature_names = list(serving_data['feature_names'])
+        self.source_feature_names = serving_data.get('source_feature_names')
+        self.selected_columns = serving_data.get('selected_columns')
+        self.feature_selection = serving_data.get('feature_selection')
+        self.training_samples = serving_data.get('training_samples', 0)
+        self.critical_features = serving_data.get('critical_features', {})
+        self._build_feature_schema(serving_data.get('feature_schema_hash'))
+        self.svm_member = serving_data.get('svm_member', 'svc')
+        self.cv_metrics = serving_data.get('cv_metrics')
+        self.training_metrics = serving_data.get('training_metrics')
+        self.inference_engine = 'compiled'
+        self.compiled_members = {}
+        self.is_trained = True
+        self._reset_explanations()
+        self._apply_precision()
+    
+    @staticmethod
+    def portable_artifact_path(model_path):
+        """Path of the portable artifact that accompanies a full model artifact"""
+        base, _ = os.path.splitext(model_path)
+        return f"{base}.portable.bgm"
+    
+    def export_portable(self, path):
+        """Write the model as one pickle-free portable file (see models.portable_model)
+        
+        The file holds the scaler statistics, tree node arrays, linear and SVM
+        coefficients, voting weights and feature schema as raw arrays behind a
+        JSON header, so it can be read without unpickling anything and scored
+        with NumPy alone (PortableModel).
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Call train_on_dataset() first.")
+        
+        compiled_trees = self.compiled_members or self._compile_tree_members()
+        members = {name: compiled_trees.get(name, member) for name, member in self._fitted_members().items()}
+        
+        header = {
+            'feature_names': list(self.feature_names),
+            'feature_schema_hash': self._schema().schema_hash,
+            'source_feature_names': self.source_feature_names,
+            'feature_selection': self.feature_selection,
+            'training_samples': self.training_samples,
+            'critical_features': self.critical_features,
+            'svm_member': self.svm_member,
+            'cv_metrics': self.cv_metrics,
+            'training_metrics': self.training_metrics,
+            'classes': np.asarray(self._classes()).tolist(),
+            'weights': self._member_weights(),
+            'member_order': list(members),
+            'members': {}
+        }
+        arrays = {
+            'scaler/mean': np.asarray(self.scaler.mean_, dtype=np.float64),
+            'scaler/scale': np.asarray(self.scaler.scale_, dtype=np.float64)
+        }
+        if self.selected_columns is not None:
+            arrays['selected_columns'] = np.asarray(self.selected_columns, dtype=np.int64)
+        
+        for name, member in members.items():
+            kind, params, member_arrays = member_to_portable(member)
+            header['members'][name] = {'kind': kind, 'params': params, 'arrays': list(member_arrays)}
+            arrays.update({f'members/{name}/{key}': value for key, value in member_arrays.items()})
+        
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        write_portable(path, header, arrays)
+        logger.info(f"💾 Portable model saved to: {path}")
+        return path
+    
+    def load_portable(self, path):
+        """Load a portable file written by export_portable (arrays memory-mapped read-only)"""
+        try:
+            header, arrays = read_portable(path)
+            members = load_portable_members(header, arrays)
+            scaler = ScalerArrays(arrays['scaler/mean'], arrays['scaler/scale'])
+            if 'selected_columns' in arrays:
+                header['selected_columns'] = np.asarray(arrays['selected_columns'], dtype=np.intp)
+            
+            self._set_serving_state(members, scaler, header)
+            
+            logger.info(f"📂 Portable model loaded from: {path}")
+            logger.info(f"Features: {len(self.feature_names)}")
+            
+        except Exception as e:
+            logger.error(f"Failed to load portable model: {str(e)}")
+            raise
+    
+    def compile_trees(self):
+        """Flatten the fitted RF and XGBoost members into NumPy node arrays for inference"""
+        if not self.is_trained:
+            raise ValueError("Model not trained. Call train_on_dataset() first.")
+        
+        self.compiled_members = self._compile_tree_members()
+        logger.info("⚙️ Compiled tree members: " + ", ".join(
+            f"{name}={member.n_trees} trees/{member.n_nodes} nodes" for name, member in self.compiled_members.items()
+        ))
+        return self.compiled_members
+    
+    def _compile_tree_members(self):
+        """Compiled copies of the fitted RF and XGBoost members"""
+        if self.serving_members is not None:
+            return {name: member for name, member in self.serving_members.items()
+                    if isinstance(member, CompiledTreeEnsemble)}
+        return {
+            'rf': CompiledTreeEnsemble.from_random_forest(self.model.named_estimators_['rf']),
+            'xgb': CompiledTreeEnsemble.from_xgboost(self.model.named_estimators_['xgb'])
+        }
+    
+    def set_inference_engine(self, engine):
+        """Select 'sklearn' (fitted estimators) or 'compiled' (flat tree arrays) inference"""
+        if engine not in self.INFERENCE_ENGINES:
+            raise ValueError(f"Unknown inference engine '{engine}', expected one of {self.INFERENCE_ENGINES}")
+        
+        if self.serving_members is not None:
+            if engine != 'compiled':
+                raise ValueError("Serving artifacts only support the compiled inference engine")
+            return
+        
+        self.inference_engine = engine
+        if engine == 'compiled' and self.is_trained:
+            self.compile_trees()
+        else:
+            self.compiled_members = {}
+    
+    def export_tree_arrays(self, output_dir):
+        """Export the fitted tree members as flat node arrays (<member>.npz per member)"""
+        if not self.is_trained:
+            raise ValueError("Model not trained. Call train_on_dataset() first.")
+        members = self.compiled_members or self._compile_tree_members()
+        os.makedirs(output_dir, exist_ok=True)
+        
+        paths = {}
+        for name, member in members.items():
+            paths[name] = os.path.join(output_dir, f'{name}.npz')
+            member.save(paths[name])
+        
+        logger.info(f"💾 Tree arrays exported to: {output_dir}")
+        return paths
+    
+    def load_model(self, model_path, inference_engine='sklearn'):
         """Load pre-trained model"""
         try:
             model_data = joblib.load(model_path)
             
             self.model = model_data['model']
+            self.serving_members = self.serving_weights = self.serving_classes = None
             self.scaler = model_data['scaler']
             self.feature_names = model_data['feature_names']
+            self.source_feature_names = model_data.get('source_feature_names')
+            self.selected_columns = model_data.get('selected_columns')
+            self.feature_selection = model_data.get('feature_selection')
             self.is_trained = model_data['is_trained']
             self.training_samples = model_data.get('training_samples', 0)
             self.critical_features = model_data.get('critical_features', {})
+            self._build_feature_schema(model_data.get('feature_schema_hash'))
+            self.svm_member = model_data.get('svm_member', 'svc')
+            self.ensemble_params = model_data.get('ensemble_params')
+            self.cv_metrics = model_data.get('cv_metrics')
+            self.training_metrics = model_data.get('training_metrics')
+            self.update_window = model_data.get('update_window')
+            self.reference_holdout = model_data.get('reference_holdout')
+            self.update_history = model_data.get('update_history', [])
+            self.set_inference_engine(inference_engine)
+            self._reset_explanations()
+            self._apply_precision()
             
             logger.info(f"📂 Model loaded from: {model_path}")
             logger.info(f"Features: {len(self.feature_names)}")
@@ -332,3 +1467,28 @@ class BankingAPKClassifier:
         except Exception as e:
             logger.error(f"Failed to load model: {str(e)}")
             raise
+
+
+def _fit_and_score_fold(model, X, y, train_idx, test_idx):
+    """Fit scaler + ensemble on one CV fold and score it (runs in a worker process)"""
+    start_time = time.time()
+    
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train_idx])
+    X_test = scaler.transform(X[test_idx])
+    
+    model = clone(model).fit(X_train, y[train_idx])
+    fold_metrics = _classification_metrics(y[test_idx], model.predict(X_test))
+    fold_metrics['fit_seconds'] = round(time.time() - start_time, 2)
+    fold_metrics['test_samples'] = int(len(test_idx))
+    return fold_metrics
+
+
+def _classification_metrics(y_true, y_pred):
+    """Accuracy, precision, recall and F1 (malware is the positive class)"""
+    return {
+        'accuracy': float(accuracy_score(y_true, y_pred)),
+        'precision': float(precision_score(y_true, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_true, y_pred, zero_division=0)),
+        'f1': float(f1_score(y_true, y_pred, zero_division=0))
+    }
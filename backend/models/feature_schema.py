@@ -0,0 +1,127 @@
+# 📄 backend/models/feature_schema.py - Precomputed Feature Schema
+# ================================================================================
+
+import hashlib
+import numpy as np
+
+from utils.feature_packing import PackedFeatures
+
+# Instruction-share columns (analyzers.dex_parser) hold fractions; every other column is 0/1
+CONTINUOUS_FEATURE_PREFIXES = ('opcode_',)
+
+
+def feature_schema_hash(feature_names):
+    """SHA-256 of the ordered feature names a model expects"""
+    return hashlib.sha256('\n'.join(feature_names).encode('utf-8')).hexdigest()
+
+
+class FeatureSchema:
+    """Column lookups for a trained feature set, built once at train/load time
+
+    Holds the feature name -> column index map used to turn feature dicts into
+    vectors, and the columns of the critical (banking risk) features with their
+    weights, ordered by descending weight (ties keep column order) so that an
+    explanation's risk factors come out already sorted.
+
+    The same schema is used by StaticAnalyzer to write extracted features into
+    rows and by BankingAPKClassifier to check them: schema_hash identifies the
+    column layout, so a row built for another layout is rejected, not padded.
+    """
+
+    def __init__(self, feature_names, critical_features=None):
+        self.feature_names = list(feature_names)
+        self.index = {name: i for i, name in enumerate(self.feature_names)}
+        self.schema_hash = feature_schema_hash(self.feature_names)
+        self.binary = not any(name.startswith(CONTINUOUS_FEATURE_PREFIXES) for name in self.feature_names)
+        self.dtype = np.dtype(np.uint8 if self.binary else np.float64)
+        critical_features = critical_features or {}
+
+        critical = [(self.index[name], weight) for name, weight in critical_features.items() if name in self.index]
+        critical.sort(key=lambda item: item[0])
+        columns = np.array([column for column, _ in critical], dtype=np.intp)
+        weights = np.array([weight for _, weight in critical], dtype=np.float64)
+        order = np.argsort(-weights, kind='stable')
+
+        self.critical_indices = columns[order]
+        self.critical_weights = weights[order]
+        self.critical_names = [self.feature_names[column] for column in self.critical_indices]
+
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+
+    def encode(self, features_dict, out=None):
+        """One sample as a row in this schema's column order (uint8, or float64 with opcode_ columns)
+
+        Only the features present in the dict are looked up, one dict probe
+        each; unknown names are ignored. out, a preallocated row such as one
+        row of a batch matrix, is cleared and written in place.
+        """
+        if out is None:
+            row = np.zeros(self.n_features, dtype=self.dtype)
+        else:
+            if out.shape != (self.n_features,):
+                raise ValueError(f"Row has shape {out.shape}, schema has {self.n_features} features")
+            row = out
+            row[:] = 0
+
+        index = self.index
+        for name, value in features_dict.items():
+            if value:
+                column = index.get(name)
+                if column is not None:
+                    row[column] = value
+        return row
+
+    def encode_packed(self, features_dict):
+        """One sample as a bit-packed row, tagged with this schema's hash (binary schemas only)
+
+        Bits are set in the packed buffer directly (np.packbits order), without
+        a dense intermediate row.
+        """
+        if not self.binary:
+            raise ValueError("Schema has continuous columns and cannot be bit-packed")
+        packed = np.zeros((1, (self.n_features + 7) // 8), dtype=np.uint8)
+        index = self.index
+        for name, value in features_dict.items():
+            if value:
+                column = index.get(name)
+                if column is not None:
+                    packed[0, column >> 3] |= 0x80 >> (column & 7)
+        return PackedFeatures(packed, self.n_features, schema_hash=self.schema_hash)
+
+    def check(self, schema_hash):
+        """Raise ValueError when features tagged with schema_hash were built for another layout"""
+        if schema_hash is not None and schema_hash != self.schema_hash:
+            raise ValueError(f"Features were built for feature schema {schema_hash[:12]}, "
+                             f"model expects {self.schema_hash[:12]}")
+
+    def dicts_to_matrix(self, feature_dicts, dtype=np.float64):
+        """Convert feature dicts to an (N, n_features) matrix; unknown names are ignored
+
+        Only the keys present in each dict are looked up, and all values are
+        written with a single scatter assignment.
+        """
+        rows, columns, values = [], [], []
+        index = self.index
+        for row, features_dict in enumerate(feature_dicts):
+            for name, value in features_dict.items():
+                column = index.get(name)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(value)
+
+        matrix = np.zeros((len(feature_dicts), self.n_features), dtype=dtype)
+        matrix[rows, columns] = values
+        return matrix
+
+    def critical_hits(self, feature_matrix):
+        """Boolean (N, n_critical) mask of the critical features set in each row
+
+        Columns follow critical_indices, i.e. descending risk weight.
+        """
+        feature_matrix = np.asarray(feature_matrix)
+        if feature_matrix.ndim == 1:
+            feature_matrix = feature_matrix.reshape(1, -1)
+        return feature_matrix[:, self.critical_indices] == 1
@@ -0,0 +1,247 @@
+# 📄 backend/models/hyperparameter_search.py - Ensemble Hyperparameter Search
+# ================================================================================
+
+import os
+import json
+import math
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import numpy as np
+import joblib
+from sklearn.model_selection import train_test_split
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FORMAT_VERSION = 1
+
+# Ensemble parameters in VotingClassifier.set_params form; candidates draw one value per key
+SEARCH_SPACE = {
+    'rf__n_estimators': [50, 100, 200, 300],
+    'rf__max_depth': [8, 12, 16, 20, None],
+    'rf__min_samples_leaf': [1, 2, 4],
+    'xgb__n_estimators': [50, 100, 200],
+    'xgb__max_depth': [3, 6, 10, 15],
+    'xgb__learning_rate': [0.05, 0.1, 0.3],
+    'lr__C': [0.1, 1.0, 10.0],
+    'weights': [
+        [0.35, 0.30, 0.20, 0.15],
+        [0.25, 0.25, 0.25, 0.25],
+        [0.40, 0.40, 0.10, 0.10],
+        [0.30, 0.50, 0.10, 0.10],
+        [0.50, 0.30, 0.10, 0.10]
+    ]
+}
+
+# The hard-coded ensemble of BankingAPKClassifier._build_ensemble_model, always candidate 0
+BASELINE_PARAMS = {
+    'rf__n_estimators': 300,
+    'rf__max_depth': 20,
+    'rf__min_samples_leaf': 2,
+    'xgb__n_estimators': 200,
+    'xgb__max_depth': 15,
+    'xgb__learning_rate': 0.1,
+    'lr__C': 1.0,
+    'weights': [0.35, 0.30, 0.20, 0.15]
+}
+
+
+def load_tuned_params(path):
+    """Ensemble parameters saved by scripts/tune_hyperparameters.py, or None if there are none"""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)['ensemble_params']
+
+
+class SuccessiveHalvingSearch:
+    """Successive-halving search over ensemble member hyperparameters and voting weights
+
+    n_candidates configurations (the current defaults plus random draws from
+    SEARCH_SPACE) are fitted on a small fraction of the training rows; the best
+    1/eta of them by objective move on to eta times as many rows, until the
+    survivors are fitted on all of them. Each rung's fits run in a process
+    pool over a memory-mapped copy of the data.
+
+    The objective is validation accuracy minus latency_weight times the median
+    single-sample prediction latency in milliseconds (compiled tree engine, as
+    served). Latency is measured inside the pool workers, so with several
+    workers it includes some contention; it is still comparable across the
+    candidates of a rung.
+
+    Every finished fit is written to checkpoint_path, and a search started
+    again with the same settings skips the fits already recorded there.
+    """
+
+    def __init__(self, checkpoint_path, n_candidates=27, eta=3, min_fraction=None,
+                 latency_weight=0.002, latency_samples=100, n_jobs=-1, seed=42,
+                 classifier_kwargs=None):
+        self.checkpoint_path = checkpoint_path
+        self.n_candidates = n_candidates
+        self.eta = eta
+        # Rungs until about eta candidates remain for the final, full-size fits
+        self.n_rungs = 1
+        while eta ** self.n_rungs < n_candidates:
+            self.n_rungs += 1
+        self.min_fraction = min_fraction or 1.0 / eta ** (self.n_rungs - 1)
+        self.latency_weight = latency_weight
+        self.latency_samples = latency_samples
+        self.n_jobs = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+        self.seed = seed
+        self.classifier_kwargs = classifier_kwargs or {}
+
+    def settings(self):
+        """Search settings a checkpoint must match to be resumed"""
+        return {
+            'n_candidates': self.n_candidates,
+            'eta': self.eta,
+            'min_fraction': self.min_fraction,
+            'latency_weight': self.latency_weight,
+            'latency_samples': self.latency_samples,
+            'seed': self.seed,
+            'classifier_kwargs': self.classifier_kwargs
+        }
+
+    def candidates(self):
+        """The current defaults followed by distinct random draws from SEARCH_SPACE"""
+        rng = np.random.RandomState(self.seed)
+        candidates = [dict(BASELINE_PARAMS)]
+        n_possible = int(np.prod([len(values) for values in SEARCH_SPACE.values()]))
+        while len(candidates) < min(self.n_candidates, n_possible):
+            params = {name: values[rng.randint(len(values))] for name, values in SEARCH_SPACE.items()}
+            if params not in candidates:
+                candidates.append(params)
+        return candidates
+
+    def run(self, X, y, feature_names, dataset_label=None, progress=print):
+        """Run (or resume) the search on a training matrix; returns the checkpoint state
+
+        X and y are the training split only; a stratified quarter of it is held
+        out for validation and rung budgets are nested prefixes of the rest.
+        """
+        state = self._load_checkpoint(dataset_label)
+        fit_idx, val_idx = train_test_split(
+            np.arange(len(y)), test_size=0.25, random_state=self.seed, stratify=y
+        )
+
+        work_dir = tempfile.mkdtemp(prefix='bankguard_tune_')
+        try:
+            # Written once and memory-mapped read-only by every worker (as in cross-validation)
+            data_path = os.path.join(work_dir, 'X.mmap')
+            joblib.dump(np.ascontiguousarray(X), data_path)
+
+            survivors = list(range(len(state['candidates'])))
+            for rung in range(self.n_rungs):
+                fraction = min(1.0, self.min_fraction * self.eta ** rung)
+                n_rows = max(int(fraction * len(fit_idx)), min(len(fit_idx), 50))
+                results = state['rungs'][rung]['results']
+                pending = [c for c in survivors if str(c) not in results]
+
+                progress(f"🔬 Rung {rung + 1}/{self.n_rungs}: {len(survivors)} candidates on {n_rows} rows "
+                         f"({len(survivors) - len(pending)} already done)")
+                self._evaluate(state, rung, pending, data_path, y, feature_names,
+                               fit_idx[:n_rows], val_idx, progress)
+
+                ranked = sorted(survivors, key=lambda c: results[str(c)]['score'], reverse=True)
+                survivors = ranked[:max(1, math.ceil(len(ranked) / self.eta))]
+
+            best = survivors[0]
+            state['best'] = {
+                'candidate': best,
+                'params': state['candidates'][best],
+                **state['rungs'][self.n_rungs - 1]['results'][str(best)]
+            }
+            state['completed_at'] = datetime.now().isoformat()
+            self._save_checkpoint(state)
+            return state
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _evaluate(self, state, rung, pending, data_path, y, feature_names, fit_rows, val_rows, progress):
+        """Fit the pending candidates of a rung in the process pool, checkpointing each result"""
+        if not pending:
+            return
+        results = state['rungs'][rung]['results']
+        with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(pending))) as pool:
+            futures = {
+                pool.submit(_evaluate_candidate, data_path, y, feature_names, fit_rows, val_rows,
+                            state['candidates'][c], self.classifier_kwargs, self.latency_samples): c
+                for c in pending
+            }
+            for future in as_completed(futures):
+                candidate = futures[future]
+                result = future.result()
+                result['score'] = result['accuracy'] - self.latency_weight * result['latency_ms']
+                results[str(candidate)] = result
+                self._save_checkpoint(state)
+                progress(f"   #{candidate:<3} accuracy {result['accuracy']:.4f}, "
+                         f"latency {result['latency_ms']:.2f}ms, score {result['score']:.4f} "
+                         f"({result['fit_seconds']}s)")
+
+    def _load_checkpoint(self, dataset_label):
+        """Checkpoint state to resume, or a fresh one; settings must match to resume"""
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                state = json.load(f)
+            if state.get('settings') != self.settings() or state.get('dataset') != dataset_label:
+                raise ValueError(f"Checkpoint {self.checkpoint_path} was written with different settings; "
+                                 f"remove it or choose another checkpoint to start a new search")
+            logger.info(f"🔁 Resuming search from: {self.checkpoint_path}")
+            return state
+
+        return {
+            'format_version': SEARCH_FORMAT_VERSION,
+            'settings': self.settings(),
+            'dataset': dataset_label,
+            'created': datetime.now().isoformat(),
+            'candidates': self.candidates(),
+            'rungs': [{'results': {}} for _ in range(self.n_rungs)],
+            'best': None
+        }
+
+    def _save_checkpoint(self, state):
+        """Write through a temporary file and rename, so a crash never leaves a partial checkpoint"""
+        os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        temp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_path, self.checkpoint_path)
+
+
+def _evaluate_candidate(data_path, y, feature_names, fit_rows, val_rows, params, classifier_kwargs,
+                        latency_samples):
+    """Fit one candidate ensemble (in a pool worker) and measure validation accuracy and latency"""
+    from models.banking_classifier import BankingAPKClassifier
+
+    X = joblib.load(data_path, mmap_mode='r')
+    classifier = BankingAPKClassifier(**classifier_kwargs, ensemble_params=params)
+    # Pool workers run side by side; keep the members single-threaded
+    classifier.model.set_params(rf__n_jobs=1, xgb__n_jobs=1)
+    classifier.feature_names = list(feature_names)
+
+    start = time.time()
+    X_fit_scaled = classifier.scaler.fit_transform(X[fit_rows])
+    classifier._fit_ensemble(X_fit_scaled, y[fit_rows], lambda phase: None)
+    fit_seconds = round(time.time() - start, 2)
+    classifier.is_trained = True
+    classifier.set_inference_engine('compiled')
+
+    X_val = np.asarray(X[val_rows])
+    predictions, _, _, _ = classifier._ensemble_predict(classifier._scale(X_val))
+    accuracy = float(np.mean(np.asarray(predictions) == y[val_rows]))
+
+    latencies = []
+    for row in X_val[:latency_samples]:
+        start = time.perf_counter()
+        classifier.predict_with_explanation(row)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        'accuracy': accuracy,
+        'latency_ms': float(np.median(latencies) * 1000),
+        'fit_rows': int(len(fit_rows)),
+        'fit_seconds': fit_seconds
+    }
@@ -0,0 +1,501 @@
+# 📄 backend/models/model_registry.py - Versioned Model Registry
+# ================================================================================
+
+import os
+import re
+import json
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import logging
+
+from models.banking_classifier import BankingAPKClassifier
+from models.feature_schema import feature_schema_hash
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_FORMAT_VERSION = 1
+VERSION_PATTERN = re.compile(r'^v(\d+)$')
+
+
+def _process_alive(pid):
+    """Whether a local process id is running (always assumed on Windows, where os.kill terminates)"""
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ModelRegistry:
+    """Versioned model artifacts with metadata under one root directory
+
+    Versions are immutable once published; activating a version or rolling
+    back only rewrites registry.json, so a rollback never touches artifacts.
+
+    Layout (root_dir defaults to data/trained_models):
+        <root_dir>/registry.json              active version + activation history
+        <root_dir>/versions/<version>/
+            model.joblib                      full artifact (retraining, updates)
+            model.serving.joblib              memory-mapped serving artifact
+            model.portable.bgm                pickle-free portable artifact (loaded first)
+            metadata.json                     accuracy, feature schema hash, training time, ...
+    """
+
+    MODEL_FILENAME = 'model.joblib'
+    STAGING_PREFIX = '.staging-'  # .staging-<publisher pid>-<random>
+
+    def __init__(self, root_dir='data/trained_models'):
+        self.root_dir = root_dir
+        self.versions_dir = os.path.join(root_dir, 'versions')
+        self.state_path = os.path.join(root_dir, 'registry.json')
+        self._lock = threading.Lock()
+
+    def publish(self, classifier, activate=False, **extra_metadata):
+        """Save a trained classifier as a new version and return its version id"""
+        if not classifier.is_trained:
+            raise ValueError("Model not trained. Call train_on_dataset() first.")
+
+        os.makedirs(self.versions_dir, exist_ok=True)
+        self._sweep_staging()
+        staging_dir = tempfile.mkdtemp(prefix=f'{self.STAGING_PREFIX}{os.getpid()}-', dir=self.versions_dir)
+        try:
+            os.chmod(staging_dir, 0o755)
+            classifier.save_model(os.path.join(staging_dir, self.MODEL_FILENAME))
+
+            training_metrics = classifier.training_metrics or {}
+            metadata = {
+                'format_version': REGISTRY_FORMAT_VERSION,
+                'created': datetime.now().isoformat(),
+                'source': training_metrics.get('source'),
+                'accuracy': training_metrics.get('accuracy'),
+                'training_seconds': training_metrics.get('training_seconds'),
+                'trained_at': training_metrics.get('trained_at'),
+                'feature_schema_hash': feature_schema_hash(classifier.feature_names),
+                'n_features': len(classifier.feature_names),
+                'feature_selection': classifier.feature_selection,
+                'training_samples': int(classifier.training_samples),
+                'svm_member': classifier.svm_member,
+                'cv_accuracy': (classifier.cv_metrics or {}).get('mean', {}).get('accuracy')
+            }
+            metadata.update(extra_metadata)
+
+            # Version ids are claimed by renaming the staged directory into place;
+            # a concurrent publisher that took the same id makes the rename fail
+            with self._lock:
+                while True:
+                    version = self._next_version()
+                    metadata['version'] = version
+                    self._write_json(os.path.join(staging_dir, 'metadata.json'), metadata)
+                    try:
+                        os.rename(staging_dir, self.version_dir(version))
+                        break
+                    except OSError:
+                        if not os.path.exists(self.version_dir(version)):
+                            raise
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        logger.info(f"📦 Model version {version} published (accuracy: {metadata['accuracy']})")
+        if activate:
+            self.activate(version)
+        return version
+
+    def import_artifact(self, model_path, activate=False, **extra_metadata):
+        """Publish an existing full model artifact (e.g. a pre-registry model) as a new version"""
+        classifier = BankingAPKClassifier()
+        classifier.load_model(model_path)
+        return self.publish(classifier, activate=activate, imported_from=os.path.abspath(model_path),
+                            **extra_metadata)
+
+    def activate(self, version):
+        """Make a version the active one, remembering the previous one for rollback"""
+        self.get_metadata(version)
+
+        with self._lock:
+            state = self._read_state()
+            if state['active'] == version:
+                return version
+            if state['active'] is not None:
+                state['history'].append(state['active'])
+            state['active'] = version
+            state['activated_at'] = datetime.now().isoformat()
+            self._write_state(state)
+
+        logger.info(f"🔁 Model version {version} activated")
+        return version
+
+    def rollback(self):
+        """Re-activate the previously active version and return its id"""
+        with self._lock:
+            state = self._read_state()
+            if not state['history']:
+                raise ValueError("No previous model version to roll back to")
+            version = state['history'].pop()
+            state['active'] = version
+            state['activated_at'] = datetime.now().isoformat()
+            self._write_state(state)
+
+        logger.info(f"⏪ Rolled back to model version {version}")
+        return version
+
+    def active_version(self):
+        """Id of the active version, or None if nothing has been activated"""
+        return self._read_state()['active']
+
+    def previous_version(self):
+        """Version rollback() would re-activate, or None"""
+        history = self._read_state()['history']
+        return history[-1] if history else None
+
+    def active_model_path(self, default=None):
+        """Full artifact path of the active version, or default if there is none"""
+        version = self.active_version()
+        return self.model_path(version) if version else default
+
+    def list_versions(self):
+        """Metadata of every published version, oldest first"""
+        if not os.path.isdir(self.versions_dir):
+            return []
+
+        active = self.active_version()
+        versions = []
+        for name in sorted(os.listdir(self.versions_dir), key=self._version_number):
+            if VERSION_PATTERN.match(name) and os.path.exists(os.path.join(self.versions_dir, name, 'metadata.json')):
+                metadata = self.get_metadata(name)
+                metadata['active'] = name == active
+                versions.append(metadata)
+        return versions
+
+    def get_metadata(self, version):
+        """Metadata of one version (ValueError if it does not exist)"""
+        metadata_path = os.path.join(self.version_dir(version), 'metadata.json')
+        if not os.path.exists(metadata_path):
+            raise ValueError(f"Unknown model version '{version}'")
+        with open(metadata_path, 'r') as f:
+            return json.load(f)
+
+    def update_metadata(self, version, **fields):
+        """Add fields (e.g. later cross-validation results) to a version's metadata"""
+        with self._lock:
+            metadata = self.get_metadata(version)
+            metadata.update(fields)
+            self._write_json(os.path.join(self.version_dir(version), 'metadata.json'), metadata)
+        return metadata
+
+    def version_dir(self, version):
+        if not VERSION_PATTERN.match(str(version)):
+            raise ValueError(f"Invalid model version '{version}'")
+        return os.path.join(self.versions_dir, version)
+
+    def model_path(self, version):
+        return os.path.join(self.version_dir(version), self.MODEL_FILENAME)
+
+    def _sweep_staging(self):
+        """Remove staging directories left by publishers that died mid-save (e.g. a killed training job)"""
+        for name in os.listdir(self.versions_dir):
+            if not name.startswith(self.STAGING_PREFIX):
+                continue
+            pid = name[len(self.STAGING_PREFIX):].split('-', 1)[0]
+            if pid.isdigit() and _process_alive(int(pid)):
+                continue
+            logger.info(f"🧹 Removing stale staging directory {name}")
+            shutil.rmtree(os.path.join(self.versions_dir, name), ignore_errors=True)
+
+    def _next_version(self):
+        existing = os.listdir(self.versions_dir) if os.path.isdir(self.versions_dir) else []
+        numbers = [self._version_number(name) for name in existing if VERSION_PATTERN.match(name)]
+        return f"v{max(numbers, default=0) + 1:04d}"
+
+    def _version_number(self, name):
+        match = VERSION_PATTERN.match(name)
+        return int(match.group(1)) if match else -1
+
+    def _read_state(self):
+        if not os.path.exists(self.state_path):
+            return {'format_version': REGISTRY_FORMAT_VERSION, 'active': None, 'history': []}
+        with open(self.state_path, 'r') as f:
+            return json.load(f)
+
+    def _write_state(self, state):
+        os.makedirs(self.root_dir, exist_ok=True)
+        self._write_json(self.state_path, state)
+
+    def _write_json(self, path, data):
+        """Write through a temporary file and rename, so readers never see a partial file"""
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, path)
+
+
+class ModelManager:
+    """Serve the registry's active version and hot-swap new versions without downtime
+
+    Request handlers take a reference with current() once and use it for the
+    whole request. A swap only replaces that reference, so in-flight requests
+    finish on the version they started with and the old model is released
+    once the last of them drops it. New versions are loaded and warmed up
+    before the swap, in a background thread unless wait=True.
+
+    start() brings up the first model without blocking the caller and never
+    trains: when the registry is empty it imports import_path if that
+    artifact exists, and otherwise reports 'no_model' until a version is
+    published and loaded.
+    
+    on_swap, if given, is called with the new version after every swap
+    (e.g. to invalidate caches of the previous model's results).
+    """
+
+    # Batch sizes predicted during warm-up (single-sample and small-batch paths)
+    WARMUP_BATCH_SIZES = (1, 32)
+
+    def __init__(self, registry, classifier_factory=BankingAPKClassifier,
+                 warmup_batch_sizes=None, import_path=None, on_swap=None):
+        self.registry = registry
+        self.classifier_factory = classifier_factory
+        self.warmup_batch_sizes = tuple(warmup_batch_sizes or self.WARMUP_BATCH_SIZES)
+        self.import_path = import_path
+        self.on_swap = on_swap
+        self._active = None      # (version, classifier)
+        self._previous = None    # kept in memory so rollback is immediate
+        self._pending = None     # status of the current background load
+        self._last_load = None   # timings of the last successful load
+        self._ready = threading.Event()
+        self._startup = None
+        self._swap_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._startup_lock = threading.Lock()
+
+    def current(self):
+        """Classifier serving new requests (None before the first load)"""
+        active = self._active
+        return active[1] if active else None
+
+    def current_version(self):
+        active = self._active
+        return active[0] if active else None
+
+    def snapshot(self):
+        """(version, classifier) serving new requests, read as one consistent pair"""
+        return self._active or (None, None)
+
+    def status(self):
+        """Serving, previous and pending versions"""
+        return {
+            'active_version': self.current_version(),
+            'previous_version': self._previous[0] if self._previous else None,
+            'registry_active_version': self.registry.active_version(),
+            'pending': dict(self._pending) if self._pending else None,
+            'last_load': self._last_load
+        }
+
+    def is_ready(self):
+        """True once a model is loaded, warmed up and serving"""
+        return self._ready.is_set()
+
+    def readiness(self):
+        """Readiness details for health checks"""
+        pending = self._pending or {}
+        if self.is_ready():
+            state = 'ready'
+        elif pending:
+            state = pending['state']
+        else:
+            state = 'starting' if self._startup is not None and self._startup.is_alive() else 'not_started'
+        return {
+            'ready': self.is_ready(),
+            'state': state,
+            'model_version': self.current_version(),
+            'loading_version': pending.get('version'),
+            'error': pending.get('error'),
+            'last_load': self._last_load
+        }
+
+    def start(self, wait=False):
+        """Bring up the first model in the background (no-op once serving or while starting)
+
+        Returns the startup thread, or None if nothing had to be started. With
+        wait=True the model is loaded in the calling thread and errors raise.
+        """
+        with self._startup_lock:
+            if self.is_ready() or (self._startup is not None and self._startup.is_alive()):
+                return None
+            if wait:
+                self._startup = None
+            else:
+                self._startup = threading.Thread(target=self._start_serving, args=(False,),
+                                                 name='model-startup', daemon=True)
+                self._startup.start()
+                return self._startup
+        self._start_serving(True)
+        return None
+
+    def wait_until_ready(self, timeout=None):
+        """Block up to timeout seconds for a serving model; returns snapshot()
+
+        Returns early when no load is in progress (e.g. the registry is empty).
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while not self._ready.wait(0.05):
+            if not self._is_loading() or (deadline is not None and time.time() >= deadline):
+                break
+        return self.snapshot()
+
+    def _is_loading(self):
+        pending = self._pending
+        if pending and pending['state'] in ('importing', 'loading', 'warming_up'):
+            return True
+        return self._startup is not None and self._startup.is_alive()
+
+    def load_active(self, wait=True):
+        """Load the registry's active version"""
+        version = self.registry.active_version()
+        if version is None:
+            return None
+        return self.load_version(version, wait=wait, activate=False)
+
+    def _start_serving(self, raise_errors):
+        """Load the active version, importing import_path into an empty registry first"""
+        try:
+            if self.registry.active_version() is None and self.import_path and os.path.exists(self.import_path):
+                self._pending = {'version': None, 'state': 'importing', 'started_at': datetime.now().isoformat()}
+                logger.info(f"📦 Importing {self.import_path} into the model registry")
+                self.registry.import_artifact(self.import_path, activate=True)
+
+            version = self.registry.active_version()
+            if version is None:
+                self._pending = {
+                    'version': None,
+                    'state': 'no_model',
+                    'error': 'No trained model available; start a training job with POST /api/train-model'
+                }
+                logger.warning("⚠️ No trained model in the registry; serving without a model")
+                return None
+        except Exception as e:
+            logger.error(f"❌ Model startup failed: {str(e)}")
+            self._pending = {'version': None, 'state': 'failed', 'error': str(e)}
+            if raise_errors:
+                raise
+            return None
+
+        return self._load_and_swap(version, False, raise_errors)
+
+    def load_version(self, version, wait=False, activate=True):
+        """Load, warm up and swap in a registry version
+
+        Runs in a background thread (returned) unless wait=True, in which case
+        load errors are raised. With activate=True the version also becomes the
+        registry's active version once it is serving.
+        """
+        self.registry.get_metadata(version)
+        if not wait:
+            thread = threading.Thread(
+                target=self._load_and_swap, args=(version, activate, False),
+                name=f'model-load-{version}', daemon=True
+            )
+            thread.start()
+            return thread
+        return self._load_and_swap(version, activate, True)
+
+    def rollback(self):
+        """Swap back to the previously active version in a single call"""
+        version = self.registry.previous_version()
+        if version is None:
+            raise ValueError("No previous model version to roll back to")
+
+        with self._swap_lock:
+            in_memory = bool(self._previous) and self._previous[0] == version
+            if in_memory:
+                self.registry.rollback()
+                self._active, self._previous = self._previous, self._active
+                logger.info(f"⏪ Serving model version {version} (kept in memory)")
+        if in_memory:
+            self._notify_swap(version)
+            return version
+
+        # Previous version not in memory (e.g. after a restart): load it from disk
+        # first, so a failed load leaves both the registry and serving untouched
+        self.load_version(version, wait=True, activate=False)
+        self.registry.rollback()
+        return version
+
+    def _load_and_swap(self, version, activate, raise_errors):
+        with self._load_lock:
+            self._pending = {'version': version, 'state': 'loading', 'started_at': datetime.now().isoformat()}
+            try:
+                start_time = time.time()
+                classifier = self._load(version)
+                load_seconds = time.time() - start_time
+                self._pending['state'] = 'warming_up'
+                self._warm_up(classifier)
+
+                if activate:
+                    self.registry.activate(version)
+                with self._swap_lock:
+                    self._previous, self._active = self._active, (version, classifier)
+                self._notify_swap(version)
+                self._ready.set()
+                self._pending = None
+                self._last_load = {
+                    'version': version,
+                    'load_seconds': round(load_seconds, 3),
+                    'warmup_seconds': round(time.time() - start_time - load_seconds, 3),
+                    'warmup_batch_sizes': list(self.warmup_batch_sizes),
+                    'loaded_at': datetime.now().isoformat()
+                }
+                logger.info(f"✅ Serving model version {version} (load {load_seconds:.2f}s, "
+                            f"warm-up {self._last_load['warmup_seconds']:.2f}s)")
+                return version
+
+            except Exception as e:
+                logger.error(f"❌ Failed to load model version {version}: {str(e)}")
+                self._pending.update({'state': 'failed', 'error': str(e)})
+                if raise_errors:
+                    raise
+                return None
+
+    def _notify_swap(self, version):
+        """Run the on_swap callback; its failures never undo a swap"""
+        if self.on_swap is None:
+            return
+        try:
+            self.on_swap(version)
+        except Exception as e:
+            logger.error(f"on_swap callback failed for version {version}: {str(e)}")
+    
+    def _load(self, version):
+        """Fresh classifier for a version, from its portable or serving artifact when present"""
+        metadata = self.registry.get_metadata(version)
+        model_path = self.registry.model_path(version)
+
+        classifier = self.classifier_factory()
+        if os.path.exists(BankingAPKClassifier.portable_artifact_path(model_path)):
+            classifier.load_portable(BankingAPKClassifier.portable_artifact_path(model_path))
+        elif os.path.exists(BankingAPKClassifier.serving_artifact_path(model_path)):
+            classifier.load_serving_model(model_path)
+        else:
+            classifier.load_model(model_path)
+
+        if feature_schema_hash(classifier.feature_names) != metadata['feature_schema_hash']:
+            raise ValueError(f"Feature schema of version {version} does not match its metadata")
+        return classifier
+
+    def _warm_up(self, classifier):
+        """Run throwaway predictions so the first real request does not pay for page faults and lazy setup"""
+        n_features = len(classifier.feature_names)
+        for batch_size in self.warmup_batch_sizes:
+            features = np.zeros((batch_size, n_features), dtype=np.uint8)
+            if batch_size == 1:
+                results = [classifier.predict_with_explanation(features[0])]
+            else:
+                results = classifier.predict_batch(features)
+            if any(result['prediction'] == 'ERROR' for result in results):
+                raise RuntimeError(f"Warm-up prediction failed: {results[0]['explanation']['summary']}")
@@ -0,0 +1,293 @@
+# 📄 backend/models/portable_model.py - Pickle-Free Portable Model Format
+# ================================================================================
+
+import json
+import struct
+import numpy as np
+
+from models.tree_engine import CompiledTreeEnsemble
+
+# This module only depends on NumPy: a portable model loads and predicts
+# without importing scikit-learn or XGBoost.
+
+PORTABLE_FORMAT = 'bankguard-portable'
+PORTABLE_FORMAT_VERSION = 1
+
+# File layout: MAGIC, then <format version: uint32><header length: uint64>
+# (little-endian), the UTF-8 JSON header, and the raw C-order array data, each
+# array starting at a 64-byte aligned offset recorded in the header.
+MAGIC = b'BGPORTBL'
+PREAMBLE = struct.Struct('<8sIQ')
+ALIGNMENT = 64
+
+
+def write_portable(path, header, arrays):
+    """Write a JSON header and named NumPy arrays as one portable file"""
+    header = dict(header, format=PORTABLE_FORMAT, format_version=PORTABLE_FORMAT_VERSION, arrays={})
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    # Offsets depend on the header length, which depends on the offsets: lay the
+    # data out after a header sized with placeholder offsets, then pad to match
+    offset = 0
+    for name, array in arrays.items():
+        if array.dtype.hasobject:
+            raise ValueError(f"Array '{name}' has dtype object; portable files only hold numeric arrays")
+        header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header_bytes = json.dumps(header, default=_json_default).encode('utf-8')
+    data_start = -(-(PREAMBLE.size + len(header_bytes) + 32) // ALIGNMENT) * ALIGNMENT
+    header_bytes = header_bytes.ljust(data_start - PREAMBLE.size, b' ')
+
+    with open(path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, PORTABLE_FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header['arrays'][name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+
+
+def read_portable(path, mmap=True):
+    """(header, arrays) of a portable file; arrays are read-only memory maps unless mmap=False"""
+    with open(path, 'rb') as f:
+        preamble = f.read(PREAMBLE.size)
+        if len(preamble) < PREAMBLE.size:
+            raise ValueError(f"{path} is not a BankGuard portable model")
+        magic, format_version, header_length = PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a BankGuard portable model")
+        if format_version > PORTABLE_FORMAT_VERSION:
+            raise ValueError(f"{path} uses portable format version {format_version}; "
+                             f"this version reads up to {PORTABLE_FORMAT_VERSION}")
+        header = json.loads(f.read(header_length).decode('utf-8'))
+
+        data_start = PREAMBLE.size + header_length
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype, shape = np.dtype(spec['dtype']), tuple(spec['shape'])
+            if mmap and int(np.prod(shape)) > 0:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=data_start + spec['offset'], shape=shape)
+            else:
+                f.seek(data_start + spec['offset'])
+                count = int(np.prod(shape))
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+    return header, arrays
+
+
+def _json_default(value):
+    """NumPy scalars and arrays in header metadata"""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class ScalerArrays:
+    """Standardization with stored statistics (transform only, same result as StandardScaler)"""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class LinearModel:
+    """Binary logistic model: P(class 1) = sigmoid(X @ coef + intercept), computed in dtype"""
+
+    def __init__(self, coef, intercept, dtype=np.float64):
+        self.coef_ = np.asarray(coef, dtype=dtype).reshape(1, -1)
+        self.intercept_ = np.asarray(intercept, dtype=dtype).reshape(1)
+
+    def predict_proba(self, X):
+        margin = np.asarray(X, dtype=self.coef_.dtype) @ self.coef_[0] + self.intercept_[0]
+        positive = 1.0 / (1.0 + np.exp(-margin))
+        return np.column_stack([1.0 - positive, positive])
+
+
+class RBFSVCModel:
+    """RBF-kernel SVC with libsvm's Platt-scaled probabilities (binary)
+
+    Reproduces SVC.predict_proba: the decision value is mapped through the
+    fitted sigmoid (probA, probB) and then through libsvm's iterative pairwise
+    coupling, which for two classes stops at a tolerance rather than
+    returning the sigmoid output itself.
+    """
+
+    def __init__(self, support_vectors, dual_coef, intercept, gamma, prob_a, prob_b):
+        self.support_vectors = support_vectors
+        self.dual_coef = dual_coef
+        self.intercept = float(intercept)
+        self.gamma = float(gamma)
+        self.prob_a = float(prob_a)
+        self.prob_b = float(prob_b)
+        self._sv_norms = np.einsum('ij,ij->i', support_vectors, support_vectors)
+
+    def decision_function(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        kernel = _rbf_kernel(X, self.support_vectors, self.gamma, self._sv_norms)
+        return kernel @ self.dual_coef + self.intercept
+
+    def predict_proba(self, X):
+        decision = self.decision_function(X)
+        # libsvm's decision value has the opposite sign; r is P(class 0) from one pairwise model
+        r = np.clip(1.0 / (1.0 + np.exp(-decision * self.prob_a + self.prob_b)), 1e-7, 1 - 1e-7)
+        return _pairwise_coupling(r)
+
+
+class NystroemSVMModel:
+    """Nystroem RBF feature map + linear SVM + sigmoid calibration (the 'rbf_approx' member)"""
+
+    def __init__(self, components, normalization, gamma, coef, intercept, calibration_a, calibration_b):
+        self.components = components
+        self.normalization = normalization
+        self.gamma = float(gamma)
+        self.linear_coef = coef
+        self.linear_intercept = float(intercept)
+        self.calibration_a = float(calibration_a)
+        self.calibration_b = float(calibration_b)
+        self._component_norms = np.einsum('ij,ij->i', components, components)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        embedded = _rbf_kernel(X, self.components, self.gamma, self._component_norms) @ self.normalization.T
+        decision = embedded @ self.linear_coef + self.linear_intercept
+        positive = 1.0 / (1.0 + np.exp(self.calibration_a * decision + self.calibration_b))
+        return np.column_stack([1.0 - positive, positive])
+
+
+def _rbf_kernel(X, Y, gamma, y_norms):
+    """exp(-gamma * ||x - y||^2) for all row pairs"""
+    distances = np.einsum('ij,ij->i', X, X)[:, None] + y_norms[None, :] - 2.0 * (X @ Y.T)
+    return np.exp(-gamma * np.maximum(distances, 0.0))
+
+
+def _pairwise_coupling(r):
+    """libsvm multiclass_probability for two classes, vectorized over samples"""
+    r10 = 1.0 - r
+    Q = np.array([[r10 * r10, -r10 * r], [-r10 * r, r * r]])
+    p = np.full((2, len(r)), 0.5)
+    active = np.ones(len(r), dtype=bool)
+    for _ in range(100):
+        Qp = np.einsum('tjn,jn->tn', Q, p)
+        pQp = (p * Qp).sum(axis=0)
+        active &= np.abs(Qp - pQp).max(axis=0) >= 0.005 / 2
+        if not active.any():
+            break
+        for t in range(2):
+            diff = np.where(active, (pQp - Qp[t]) / Q[t, t], 0.0)
+            p[t] += diff
+            pQp = (pQp + diff * (diff * Q[t, t] + 2 * Qp[t])) / (1 + diff) / (1 + diff)
+            Qp = (Qp + diff * Q[t]) / (1 + diff)
+            p = p / (1 + diff)
+    return p.T
+
+
+def member_to_portable(member):
+    """(kind, params, arrays) of a fitted ensemble member, identified by its fitted attributes"""
+    if isinstance(member, CompiledTreeEnsemble):
+        params, arrays = {}, {}
+        for name, value in member.to_arrays().items():
+            if np.ndim(value) == 0:
+                params[name] = np.asarray(value).item()
+            else:
+                arrays[name] = value
+        return 'trees', params, arrays
+
+    if hasattr(member, 'support_vectors_'):
+        if member.kernel != 'rbf' or len(member.classes_) != 2 or not getattr(member, 'probability', False):
+            raise ValueError("Only binary RBF SVC members with probability=True can be exported")
+        return 'rbf_svc', {
+            'intercept': float(member.intercept_[0]),
+            'gamma': float(member._gamma),
+            'prob_a': float(member.probA_[0]),
+            'prob_b': float(member.probB_[0])
+        }, {
+            'support_vectors': np.asarray(member.support_vectors_, dtype=np.float64),
+            'dual_coef': np.asarray(member.dual_coef_[0], dtype=np.float64)
+        }
+
+    if hasattr(member, 'named_steps') and 'feature_map' in member.named_steps:
+        feature_map = member.named_steps['feature_map']
+        calibrated = member.named_steps['linear_svm'].calibrated_classifiers_
+        if len(calibrated) != 1:
+            raise ValueError("Only single calibrated models (ensemble=False) can be exported")
+        linear_svm, calibrator = calibrated[0].estimator, calibrated[0].calibrators[0]
+        n_features = feature_map.components_.shape[1]
+        return 'nystroem_svm', {
+            'gamma': float(feature_map.gamma if feature_map.gamma is not None else 1.0 / n_features),
+            'intercept': float(linear_svm.intercept_[0]),
+            'calibration_a': float(calibrator.a_),
+            'calibration_b': float(calibrator.b_)
+        }, {
+            'components': np.asarray(feature_map.components_, dtype=np.float64),
+            'normalization': np.asarray(feature_map.normalization_, dtype=np.float64),
+            'coef': np.asarray(linear_svm.coef_[0], dtype=np.float64)
+        }
+
+    if hasattr(member, 'coef_'):
+        return 'linear', {}, {
+            'coef': np.asarray(member.coef_, dtype=np.float64).ravel(),
+            'intercept': np.asarray(member.intercept_, dtype=np.float64).ravel()
+        }
+
+    raise ValueError(f"Cannot export ensemble member of type {type(member).__name__}")
+
+
+def member_from_portable(kind, params, arrays):
+    """Inverse of member_to_portable: a NumPy-only predictor with predict_proba"""
+    if kind == 'trees':
+        return CompiledTreeEnsemble.from_arrays({**params, **arrays})
+    if kind == 'rbf_svc':
+        return RBFSVCModel(arrays['support_vectors'], arrays['dual_coef'], **params)
+    if kind == 'nystroem_svm':
+        return NystroemSVMModel(arrays['components'], arrays['normalization'], params['gamma'], arrays['coef'],
+                                params['intercept'], params['calibration_a'], params['calibration_b'])
+    if kind == 'linear':
+        return LinearModel(arrays['coef'], arrays['intercept'])
+    raise ValueError(f"Unknown portable member kind '{kind}'")
+
+
+def load_portable_members(header, arrays):
+    """Member name -> predictor, in voting order"""
+    return {
+        name: member_from_portable(
+            header['members'][name]['kind'],
+            header['members'][name]['params'],
+            {key: arrays[f'members/{name}/{key}'] for key in header['members'][name]['arrays']}
+        )
+        for name in header['member_order']
+    }
+
+
+class PortableModel:
+    """Scores samples straight from a portable file, with NumPy only
+
+    For lightweight scoring processes that only need probabilities; the API
+    server loads the same file into BankingAPKClassifier.load_portable.
+    """
+
+    def __init__(self, header, arrays):
+        self.header = header
+        self.feature_names = header['feature_names']
+        self.classes = np.asarray(header['classes'])
+        self.weights = header['weights']
+        self.scaler = ScalerArrays(arrays['scaler/mean'], arrays['scaler/scale'])
+        self.members = load_portable_members(header, arrays)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        return cls(*read_portable(path, mmap=mmap))
+
+    def predict_proba(self, X):
+        """Soft-voted class probabilities for an (N, n_features) matrix in the model's column order"""
+        X_scaled = self.scaler.transform(np.atleast_2d(X))
+        names = list(self.members)
+        return np.average(
+            np.stack([self.members[name].predict_proba(X_scaled) for name in names]), axis=0,
+            weights=None if self.weights is None else [self.weights[name] for name in names]
+        )
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,178 @@
+# 📄 backend/models/prediction_cache.py - Prediction Result Cache
+# ================================================================================
+
+import os
+import copy
+import json
+import hashlib
+import shutil
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCache:
+    """LRU + TTL cache of prediction results, keyed by model version and feature fingerprint
+
+    Re-uploads and repackaged APKs often produce the exact feature vector of an
+    earlier analysis; their ensemble prediction is returned from the cache
+    instead of being recomputed. The key is the model version plus a SHA-256
+    fingerprint of the model-aligned feature vector (bit-packed when binary),
+    so a result is only reused for the same input to the same model.
+
+    Entries expire ttl_seconds after they were stored and the least recently
+    used entry is evicted beyond max_entries. With disk_dir set, results are
+    also written as JSON files under disk_dir/<model version>/ so worker
+    processes on the host share them; on a miss in memory the disk copy is
+    used if it has not expired. invalidate() (called on every model swap)
+    drops the in-memory entries and the disk entries of other versions;
+    entries a request still in flight on the old version adds afterwards are
+    never hit and age out.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600, disk_dir=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(('hits', 'disk_hits', 'misses', 'evictions', 'expirations'), 0)
+
+    @staticmethod
+    def fingerprint(feature_vector):
+        """SHA-256 of a feature vector: its packed bits when binary, its float64 bytes otherwise"""
+        feature_vector = np.asarray(feature_vector).ravel()
+        if np.isin(feature_vector, (0, 1)).all():
+            payload = b'bits:' + np.packbits(feature_vector != 0).tobytes()
+        else:
+            payload = b'float64:' + np.ascontiguousarray(feature_vector, dtype=np.float64).tobytes()
+        return hashlib.sha256(payload + str(len(feature_vector)).encode('ascii')).hexdigest()
+
+    def predict(self, classifier, model_version, features, include_member_probabilities=False):
+        """(result, cache_hit) for one sample, running the classifier only on a miss
+
+        Error results are never cached. The returned result is a copy the
+        caller may modify.
+        """
+        try:
+            feature_vector = classifier.prepare_features(features)
+        except Exception:
+            # Unusable input: let the classifier build its error result
+            return classifier.predict_with_explanation(features, include_member_probabilities), False
+        key = (str(model_version), self.fingerprint(feature_vector), bool(include_member_probabilities))
+
+        result = self.get(key)
+        if result is not None:
+            return result, True
+
+        result = classifier.predict_with_explanation(
+            feature_vector, include_member_probabilities=include_member_probabilities
+        )
+        if result['prediction'] != 'ERROR':
+            self.put(key, result)
+        return copy.deepcopy(result), False
+
+    def get(self, key):
+        """Cached result (a copy) or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return copy.deepcopy(entry[1])
+                del self._entries[key]
+                self._counters['expirations'] += 1
+
+        result = self._read_disk(key, now)
+        with self._lock:
+            if result is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+            self._store(key, result, now + self.ttl_seconds)
+        return copy.deepcopy(result)
+
+    def put(self, key, result):
+        """Store a result in memory (and on disk when shared)"""
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._store(key, result, time.time() + self.ttl_seconds)
+        self._write_disk(key, result)
+
+    def invalidate(self, model_version=None):
+        """Drop all in-memory entries, and disk entries of versions other than model_version"""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name != str(model_version):
+                    shutil.rmtree(os.path.join(self.disk_dir, name), ignore_errors=True)
+        logger.info(f"🧹 Prediction cache invalidated (serving version {model_version})")
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        lookups = counters['hits'] + counters['disk_hits'] + counters['misses']
+        return {
+            **counters,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hit_rate': round((counters['hits'] + counters['disk_hits']) / lookups, 4) if lookups else None,
+            'shared_dir': self.disk_dir
+        }
+
+    def _store(self, key, result, expires_at):
+        """Insert under the lock, evicting least recently used entries beyond max_entries"""
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def _disk_path(self, key):
+        model_version, fingerprint, with_members = key
+        suffix = '-members' if with_members else ''
+        return os.path.join(self.disk_dir, model_version, fingerprint[:2], f'{fingerprint}{suffix}.json')
+
+    def _read_disk(self, key, now):
+        """Unexpired result from the shared directory, or None"""
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl_seconds <= now:
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, result):
+        """Write through a temporary file and rename, so readers never see a partial file"""
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, 'w') as f:
+                json.dump(result, f, default=_json_default)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write prediction cache entry: {str(e)}")
+
+
+def _json_default(value):
+    """NumPy scalars in prediction results"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
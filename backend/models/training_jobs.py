@@ -0,0 +1,283 @@
+# 📄 backend/models/training_jobs.py - Background Training Jobs
+# ================================================================================
+
+import os
+import sys
+import json
+import uuid
+import signal
+import subprocess
+import threading
+import time
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Job states: queued -> running -> succeeded | failed | cancelled
+FINAL_JOB_STATES = ('succeeded', 'failed', 'cancelled')
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TrainingJobCancelled(BaseException):
+    """Raised inside a training process when its job is cancelled
+
+    A BaseException (like KeyboardInterrupt) so that generic exception
+    handlers in the training code do not swallow it.
+    """
+
+
+class TrainingJobManager:
+    """Run train_on_dataset in separate processes and track their progress
+
+    Each job trains in its own Python process (python -m models.training_jobs,
+    so nothing from the server's main module is re-imported), which keeps
+    the ensemble fit off the server workers. The job reports its phases to a
+    JSON state file under jobs_dir that the server (or any other process)
+    reads for progress, and logs to <job id>.log next to it. A
+    finished job publishes its model as a new registry version; on_published
+    is then called with the version id from a monitor thread in the server.
+
+    Only one job runs at a time; training already uses every core.
+    """
+
+    # Seconds a cancelled job gets to exit cleanly before it is killed
+    CANCEL_GRACE_SECONDS = 10
+
+    def __init__(self, registry, jobs_dir=None, classifier_kwargs=None, on_published=None):
+        self.registry = registry
+        self.jobs_dir = jobs_dir or os.path.join(registry.root_dir, 'jobs')
+        self.classifier_kwargs = classifier_kwargs or {}
+        self.on_published = on_published
+        self._processes = {}
+        self._cancel_requested = set()
+        self._lock = threading.Lock()
+
+    def submit(self, dataset_path, activate=False, cross_validate=False, cv_folds=5, cv_jobs=-1):
+        """Start a training job and return its id (RuntimeError if one is already running)"""
+        with self._lock:
+            running = [job_id for job_id, process in self._processes.items() if process.poll() is None]
+            if running:
+                raise RuntimeError(f"Training job {running[0]} is already running")
+
+            job_id = uuid.uuid4().hex[:12]
+            state = {
+                'job_id': job_id,
+                'status': 'queued',
+                'config': {
+                    'dataset_path': os.path.abspath(dataset_path),
+                    'registry_root': os.path.abspath(self.registry.root_dir),
+                    'classifier_kwargs': self.classifier_kwargs,
+                    'activate': activate,
+                    'cross_validate': cross_validate,
+                    'cv_folds': cv_folds,
+                    'cv_jobs': cv_jobs
+                },
+                'submitted_at': datetime.now().isoformat(),
+                'phase': None,
+                'phases': [],
+                'result': None,
+                'error': None
+            }
+            os.makedirs(self.jobs_dir, exist_ok=True)
+            _write_state(self._state_path(job_id), state)
+
+            with open(os.path.join(self.jobs_dir, f'{job_id}.log'), 'ab') as log_file:
+                process = subprocess.Popen(
+                    [sys.executable, '-m', 'models.training_jobs', os.path.abspath(self._state_path(job_id))],
+                    cwd=BACKEND_DIR, stdout=log_file, stderr=subprocess.STDOUT
+                )
+            self._processes[job_id] = process
+
+        threading.Thread(target=self._monitor, args=(job_id, process), name=f'training-monitor-{job_id}',
+                         daemon=True).start()
+        logger.info(f"🚀 Training job {job_id} started (pid {process.pid})")
+        return job_id
+
+    def get(self, job_id):
+        """Job state with elapsed times (ValueError for unknown ids)"""
+        state = self._read_state(job_id)
+
+        # A job still marked active that this server did not start died with a previous server
+        if state['status'] not in FINAL_JOB_STATES and job_id not in self._processes:
+            state['status'] = 'failed'
+            state['error'] = 'Training process is no longer running'
+
+        if job_id in self._cancel_requested:
+            state['cancel_requested'] = True
+
+        now = time.time()
+        if state.get('started_ts'):
+            state['elapsed_seconds'] = round((state.get('finished_ts') or now) - state['started_ts'], 2)
+        for phase in state['phases']:
+            if phase.get('elapsed_seconds') is None:
+                phase['elapsed_seconds'] = round(now - phase['started_ts'], 2)
+        return state
+
+    def list(self):
+        """States of all known jobs, newest first"""
+        if not os.path.isdir(self.jobs_dir):
+            return []
+        job_ids = [name[:-len('.json')] for name in os.listdir(self.jobs_dir) if name.endswith('.json')]
+        jobs = [self.get(job_id) for job_id in job_ids]
+        return sorted(jobs, key=lambda job: job['submitted_at'], reverse=True)
+
+    def cancel(self, job_id):
+        """Ask a queued or running job to stop; a cancelled job's model is never published
+        
+        Returns right after signalling the job process: the monitor thread
+        records the final state once it exits. A job already in its publishing
+        phase ignores cancellation and finishes (its version is published).
+        """
+        state = self._read_state(job_id)
+        process = self._processes.get(job_id)
+        if state['status'] in FINAL_JOB_STATES or process is None or process.poll() is not None:
+            return self.get(job_id)
+        if state['phase'] == 'publishing':
+            logger.info(f"⚠️ Training job {job_id} is already publishing and cannot be cancelled")
+            return self.get(job_id)
+
+        self._cancel_requested.add(job_id)
+        # SIGTERM raises TrainingJobCancelled in the job process; fits running in
+        # native code only see it when they return, hence the kill fallback
+        process.terminate()
+        threading.Thread(target=self._kill_after_grace, args=(job_id, process), name=f'training-cancel-{job_id}',
+                         daemon=True).start()
+        logger.info(f"🛑 Training job {job_id} cancellation requested")
+        return self.get(job_id)
+
+    def _kill_after_grace(self, job_id, process):
+        """Kill a cancelled job that has not exited after CANCEL_GRACE_SECONDS (unless it reached publishing)"""
+        try:
+            process.wait(self.CANCEL_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            if self._read_state(job_id)['phase'] != 'publishing':
+                process.kill()
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job's process exits and return its final state"""
+        process = self._processes.get(job_id)
+        if process is not None:
+            process.wait(timeout)
+        return self.get(job_id)
+
+    def _monitor(self, job_id, process):
+        """Wait for the job process, record crashes and hand published versions to on_published"""
+        process.wait()
+        state = self._read_state(job_id)
+
+        if state['status'] not in FINAL_JOB_STATES:
+            if job_id in self._cancel_requested:
+                _finish(state, 'cancelled')
+            else:
+                _finish(state, 'failed', error=f'Training process exited with code {process.returncode}')
+            _write_state(self._state_path(job_id), state)
+
+        if state['status'] == 'succeeded' and self.on_published is not None:
+            try:
+                self.on_published(state['result']['version'])
+            except Exception as e:
+                logger.error(f"❌ Could not hand over model version from job {job_id}: {str(e)}")
+
+    def _state_path(self, job_id):
+        if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+            raise ValueError(f"Invalid training job id '{job_id}'")
+        return os.path.join(self.jobs_dir, f'{job_id}.json')
+
+    def _read_state(self, job_id):
+        state_path = self._state_path(job_id)
+        if not os.path.exists(state_path):
+            raise ValueError(f"Unknown training job '{job_id}'")
+        with open(state_path, 'r') as f:
+            return json.load(f)
+
+
+def _run_training_job(state_path):
+    """Training process entry point: train, report phases, publish to the registry"""
+    from models.banking_classifier import BankingAPKClassifier
+    from models.model_registry import ModelRegistry
+
+    logging.basicConfig(level=logging.INFO)
+    with open(state_path, 'r') as f:
+        state = json.load(f)
+    config = state['config']
+
+    def cancel_handler(signum, frame):
+        raise TrainingJobCancelled()
+
+    def report_phase(phase):
+        now = time.time()
+        if state['phases']:
+            previous = state['phases'][-1]
+            previous['elapsed_seconds'] = round(now - previous['started_ts'], 2)
+        state['phase'] = phase
+        state['phases'].append({
+            'name': phase,
+            'started_at': datetime.now().isoformat(),
+            'started_ts': now,
+            'elapsed_seconds': None
+        })
+        _write_state(state_path, state)
+
+    signal.signal(signal.SIGTERM, cancel_handler)
+    state.update({
+        'status': 'running',
+        'pid': os.getpid(),
+        'started_at': datetime.now().isoformat(),
+        'started_ts': time.time()
+    })
+    _write_state(state_path, state)
+
+    try:
+        classifier = BankingAPKClassifier(**config['classifier_kwargs'])
+        accuracy = classifier.train_on_dataset(
+            config['dataset_path'], cross_validate=config['cross_validate'],
+            cv_folds=config['cv_folds'], cv_jobs=config['cv_jobs'], progress_callback=report_phase
+        )
+
+        # Past this point the job finishes: a cancel must not leave a half-published version
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        report_phase('publishing')
+        version = ModelRegistry(config['registry_root']).publish(
+            classifier, activate=config['activate'], training_job=state['job_id']
+        )
+        state['result'] = {
+            'version': version,
+            'accuracy': float(accuracy),
+            'training_samples': int(classifier.training_samples),
+            'cv_accuracy': (classifier.cv_metrics or {}).get('mean', {}).get('accuracy')
+        }
+        _finish(state, 'succeeded')
+
+    except TrainingJobCancelled:
+        _finish(state, 'cancelled')
+    except Exception as e:
+        logger.error(f"❌ Training job {state['job_id']} failed: {str(e)}")
+        _finish(state, 'failed', error=str(e))
+    finally:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        _write_state(state_path, state)
+
+
+def _finish(state, status, error=None):
+    """Mark a job state final and close its last phase"""
+    now = time.time()
+    if state['phases'] and state['phases'][-1].get('elapsed_seconds') is None:
+        state['phases'][-1]['elapsed_seconds'] = round(now - state['phases'][-1]['started_ts'], 2)
+    state['status'] = status
+    state['error'] = error
+    state['finished_at'] = datetime.now().isoformat()
+    state['finished_ts'] = now
+
+
+def _write_state(path, state):
+    """Write through a temporary file and rename, so readers never see a partial file"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, path)
+
+
+if __name__ == "__main__":
+    _run_training_job(sys.argv[1])
@@ -0,0 +1,269 @@
+# 📄 backend/models/tree_engine.py - Compiled Tree-Ensemble Inference
+# ================================================================================
+
+import json
+import numpy as np
+
+# Node arrays that make up a compiled ensemble (see CompiledTreeEnsemble.to_arrays)
+NODE_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+
+class CompiledTreeEnsemble:
+    """Fitted tree ensemble flattened into NumPy node arrays
+
+    All trees share one set of node arrays; `roots` holds the index of each
+    tree's root node. Leaves point to themselves (left == right == node), and
+    every (sample, tree) pair is walked to its leaf by one vectorized step per
+    tree level, without any per-tree Python dispatch.
+
+    kind='rf'  : sklearn RandomForestClassifier; `value` is the leaf P(class 1),
+                 split rule is float32(x) <= threshold, output is the tree mean.
+    kind='xgb' : XGBoost binary:logistic booster; `value` is the leaf margin,
+                 split rule is float32(x) < threshold, output is
+                 sigmoid(base_margin + sum of leaf margins).
+
+    `cover` (optional, used by models.tree_explainer) is the training weight
+    that reached each node: weighted sample counts for RF, hessian sums for XGB.
+
+    precision='float32' (see to_float32) stores float32 thresholds and float32
+    leaf values, or uint16 fixed-point leaf codes decoded with leaf_scale.
+    """
+
+    def __init__(self, kind, feature, threshold, left, right, value, roots, base_margin=0.0, cover=None,
+                 precision='float64', leaf_scale=None):
+        if kind not in ('rf', 'xgb'):
+            raise ValueError(f"Unknown tree ensemble kind: {kind}")
+        if precision not in ('float64', 'float32'):
+            raise ValueError(f"Unknown precision: {precision}")
+
+        self.kind = kind
+        self.precision = precision
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float32 if precision == 'float32' else np.float64)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        if precision == 'float64':
+            self.value = np.asarray(value, dtype=np.float64)
+        else:
+            self.value = np.asarray(value, dtype=np.float32 if leaf_scale is None else np.uint16)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.base_margin = float(base_margin)
+        self.cover = None if cover is None else np.asarray(cover, dtype=np.float64)
+        self.leaf_scale = None if leaf_scale is None else float(leaf_scale)
+        self.max_depth = self._compute_max_depth()
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in NODE_ARRAYS) + \
+            (0 if self.cover is None else self.cover.nbytes)
+
+    @classmethod
+    def from_random_forest(cls, forest):
+        """Compile a fitted sklearn RandomForestClassifier (binary)"""
+        if len(forest.classes_) != 2:
+            raise ValueError("Only binary forests can be compiled")
+
+        builder = _NodeArrayBuilder()
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1)
+            totals[totals == 0] = 1
+            builder.add_tree(
+                feature=tree.feature,
+                threshold=tree.threshold,
+                left=tree.children_left,
+                right=tree.children_right,
+                value=counts[:, 1] / totals,
+                cover=tree.weighted_n_node_samples
+            )
+
+        return cls('rf', *builder.build(), cover=builder.build_cover())
+
+    @classmethod
+    def from_xgboost(cls, model):
+        """Compile a fitted XGBClassifier / Booster with a binary:logistic objective"""
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        config = json.loads(bytes(booster.save_raw('json')))
+        learner = config['learner']
+
+        objective = learner['objective']['name']
+        if objective != 'binary:logistic':
+            raise ValueError(f"Unsupported XGBoost objective: {objective}")
+
+        base_score = float(learner['learner_model_param']['base_score'])
+        base_margin = np.log(base_score / (1.0 - base_score))
+
+        builder = _NodeArrayBuilder()
+        for tree in learner['gradient_booster']['model']['trees']:
+            left = np.asarray(tree['left_children'])
+            conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+            # Leaves store their weight in split_conditions
+            builder.add_tree(
+                feature=np.where(left == -1, 0, tree['split_indices']),
+                threshold=conditions,
+                left=left,
+                right=np.asarray(tree['right_children']),
+                value=np.where(left == -1, conditions, 0.0),
+                cover=tree['sum_hessian']
+            )
+
+        return cls('xgb', *builder.build(), base_margin=base_margin, cover=builder.build_cover())
+
+    def apply(self, X):
+        """Leaf node index reached by every sample in every tree, shape (n_samples, n_trees)"""
+        X = np.asarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+
+        # One entry per (sample, tree) pair; only pairs not yet at a leaf are advanced
+        node = np.tile(self.roots, n_samples)
+        row_offset = np.repeat(np.arange(n_samples, dtype=np.int64) * n_features, self.n_trees)
+        active = np.flatnonzero(self.left[node] != node)
+
+        while active.size:
+            current = node[active]
+            x = flat_X[row_offset[active] + self.feature[current]]
+            if self.kind == 'rf':
+                go_left = x <= self.threshold[current]
+            else:
+                go_left = x < self.threshold[current]
+            node[active] = np.where(go_left, self.left[current], self.right[current])
+            active = active[self.left[node[active]] != node[active]]
+
+        return node.reshape(n_samples, self.n_trees)
+
+    def predict_proba(self, X, batch_size=2048):
+        """Class probabilities, shape (n_samples, 2), matching the source model's predict_proba"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        # Reduced-precision leaves are accumulated in float64
+        positive = np.empty(X.shape[0])
+        for start in range(0, X.shape[0], batch_size):
+            leaf_values = self.value[self.apply(X[start:start + batch_size])]
+            if self.kind == 'rf':
+                positive[start:start + batch_size] = leaf_values.mean(axis=1, dtype=np.float64)
+            else:
+                margin = self.base_margin + leaf_values.sum(axis=1, dtype=np.float64)
+                positive[start:start + batch_size] = 1.0 / (1.0 + np.exp(-margin))
+        if self.leaf_scale is not None:
+            positive *= self.leaf_scale  # RF fixed-point leaf codes
+
+        return np.column_stack([1.0 - positive, positive])
+
+    def to_float32(self, quantize_leaves=True):
+        """Copy with float32 thresholds and reduced-precision leaf values
+
+        Every sample reaches the same leaves as before: inputs are compared
+        as float32 anyway, and RF thresholds are rounded down to the nearest
+        float32, so float32(x) <= t32 holds exactly when float32(x) <= t did
+        (XGBoost thresholds are float32 already). XGBoost leaf margins are
+        stored as float32. RF leaf probabilities are stored as uint16 fixed
+        point when quantize_leaves is set (absolute error <= 2^-17 per leaf,
+        so also on the forest mean), otherwise as float32.
+        """
+        if self.precision == 'float32':
+            return self
+
+        threshold = self.threshold.astype(np.float32)
+        if self.kind == 'rf':
+            rounded_up = threshold.astype(np.float64) > self.threshold
+            threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+
+        leaf_scale = None
+        if self.kind == 'rf' and quantize_leaves:
+            levels = np.iinfo(np.uint16).max
+            value = np.round(self.value * levels).astype(np.uint16)
+            leaf_scale = 1.0 / levels
+        else:
+            value = self.value.astype(np.float32)
+
+        return CompiledTreeEnsemble(self.kind, self.feature, threshold, self.left, self.right, value, self.roots,
+                                    base_margin=self.base_margin, cover=self.cover, precision='float32',
+                                    leaf_scale=leaf_scale)
+
+    def to_arrays(self):
+        """Node arrays plus scalar metadata, suitable for np.savez"""
+        arrays = {name: getattr(self, name) for name in NODE_ARRAYS}
+        arrays['kind'] = np.array(self.kind)
+        arrays['base_margin'] = np.array(self.base_margin)
+        if self.cover is not None:
+            arrays['cover'] = self.cover
+        if self.precision != 'float64':
+            arrays['precision'] = np.array(self.precision)
+        if self.leaf_scale is not None:
+            arrays['leaf_scale'] = np.array(self.leaf_scale)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild from the output of to_arrays (or an np.load of it)"""
+        return cls(
+            str(arrays['kind']),
+            *(arrays[name] for name in NODE_ARRAYS),
+            base_margin=float(arrays['base_margin']),
+            cover=arrays['cover'] if 'cover' in arrays else None,  # absent in older exports
+            precision=str(arrays['precision']) if 'precision' in arrays else 'float64',
+            leaf_scale=float(arrays['leaf_scale']) if 'leaf_scale' in arrays else None
+        )
+
+    def save(self, path):
+        """Write the node arrays to an .npz file"""
+        np.savez(path, **self.to_arrays())
+
+    @classmethod
+    def load(cls, path):
+        """Load a compiled ensemble written by save"""
+        with np.load(path) as arrays:
+            return cls.from_arrays(arrays)
+
+    def _compute_max_depth(self):
+        """Longest root-to-leaf path, i.e. the number of traversal steps needed"""
+        depth = 0
+        frontier = self.roots
+        while True:
+            internal = frontier[self.left[frontier] != frontier]
+            if len(internal) == 0:
+                return depth
+            frontier = np.concatenate([self.left[internal], self.right[internal]])
+            depth += 1
+
+
+class _NodeArrayBuilder:
+    """Concatenate per-tree node arrays into one flat, self-looping-leaf layout"""
+
+    def __init__(self):
+        self.parts = {name: [] for name in NODE_ARRAYS[:-1] + ('cover',)}
+        self.roots = []
+        self.offset = 0
+
+    def add_tree(self, feature, threshold, left, right, value, cover):
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        nodes = np.arange(len(left))
+        is_leaf = left == -1
+
+        self.parts['feature'].append(np.where(is_leaf, 0, feature))
+        self.parts['threshold'].append(np.where(is_leaf, 0.0, threshold))
+        self.parts['left'].append(np.where(is_leaf, nodes, left) + self.offset)
+        self.parts['right'].append(np.where(is_leaf, nodes, right) + self.offset)
+        self.parts['value'].append(np.where(is_leaf, value, 0.0))
+        self.parts['cover'].append(np.asarray(cover, dtype=np.float64))
+        self.roots.append(self.offset)
+        self.offset += len(left)
+
+    def build(self):
+        return [np.concatenate(self.parts[name]) for name in NODE_ARRAYS[:-1]] + [np.array(self.roots)]
+
+    def build_cover(self):
+        return np.concatenate(self.parts['cover'])
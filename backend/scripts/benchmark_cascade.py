@@ -0,0 +1,101 @@
+# 📄 backend/scripts/benchmark_cascade.py - Cascade Inference Benchmark
+# ================================================================================
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+import numpy as np
+from sklearn.model_selection import train_test_split
+from models.banking_classifier import BankingAPKClassifier
+from models.model_registry import ModelRegistry
+from config import Config
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+
+# (lower, upper) bands to compare; None is the full ensemble for every sample
+DEFAULT_BANDS = [None, (0.02, 0.98), (0.05, 0.95), (0.1, 0.9), (0.2, 0.8), (0.3, 0.7)]
+
+
+def load_holdout(classifier, dataset_path):
+    """Rebuild the 20% holdout split used by train_on_dataset"""
+    X, y, feature_names = classifier._load_training_data(dataset_path)
+    X = classifier.select_model_columns(X, feature_names)
+
+    _, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42, stratify=y)
+    return X[test_idx], y[test_idx]
+
+
+def measure(classifier, X, y, band, single_samples):
+    """Accuracy, escalation rate and latency for one cascade band"""
+    classifier.set_cascade(*(band or (None,)))
+
+    start = time.perf_counter()
+    results = classifier.predict_batch(X)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in X[:single_samples]:
+        classifier.predict_with_explanation(row)
+    single_time = (time.perf_counter() - start) / max(single_samples, 1)
+
+    predictions = np.array([1 if r['prediction'] == 'MALICIOUS' else 0 for r in results])
+    escalated = np.mean([r.get('decision_stage', 'ensemble') == 'ensemble' for r in results])
+
+    return {
+        'band': 'full ensemble' if band is None else f'{band[0]:.2f} < p < {band[1]:.2f}',
+        'accuracy': np.mean(predictions == y),
+        'escalated': escalated,
+        'batch_ms_per_sample': batch_time / len(X) * 1000,
+        'single_ms': single_time * 1000
+    }
+
+
+def benchmark_cascade(model_path, dataset_path, bands=DEFAULT_BANDS, single_samples=200, engine='sklearn'):
+    """Compare cascade bands against the full ensemble on the holdout split"""
+    print("🚀 BankGuard AI Cascade Inference Benchmark")
+    print("="*60)
+
+    classifier = BankingAPKClassifier()
+    if os.path.exists(model_path):
+        classifier.load_model(model_path, inference_engine=engine)
+        print(f"📂 Model: {model_path}")
+    else:
+        print(f"⚠️  No model at {model_path}, training on {dataset_path}")
+        classifier.train_on_dataset(dataset_path)
+        classifier.set_inference_engine(engine)
+
+    X, y = load_holdout(classifier, dataset_path)
+    print(f"📊 Holdout samples: {len(y)} ({engine} engine)")
+
+    rows = [measure(classifier, X, y, band, single_samples) for band in bands]
+    baseline = rows[0]
+
+    print("\n" + "="*60)
+    print(f"{'Band':<22}{'Accuracy':>10}{'Escalated':>11}{'Batch ms':>10}{'Single ms':>11}")
+    print("-"*64)
+    for row in rows:
+        print(f"{row['band']:<22}{row['accuracy']:>10.4f}{row['escalated']:>10.1%}"
+              f"{row['batch_ms_per_sample']:>10.3f}{row['single_ms']:>11.2f}")
+    print("="*60)
+
+    for row in rows[1:]:
+        speedup = baseline['single_ms'] / row['single_ms'] if row['single_ms'] else float('inf')
+        print(f"   {row['band']}: {speedup:.1f}x single-sample speedup, "
+              f"accuracy change {row['accuracy'] - baseline['accuracy']:+.4f}")
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cascade inference bands")
+    parser.add_argument('--model', default=ModelRegistry(Config.MODEL_REGISTRY_DIR).active_model_path(Config.MODEL_PATH))
+    parser.add_argument('--dataset', default='data/datasets/fullset_train.csv')
+    parser.add_argument('--single-samples', type=int, default=200)
+    parser.add_argument('--engine', default='sklearn', choices=BankingAPKClassifier.INFERENCE_ENGINES)
+    args = parser.parse_args()
+
+    benchmark_cascade(args.model, args.dataset, single_samples=args.single_samples, engine=args.engine)
@@ -0,0 +1,118 @@
+# 📄 backend/scripts/benchmark_model_memory.py - Per-Worker Model Memory Benchmark
+# ================================================================================
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import multiprocessing
+import time
+
+
+def read_memory_kb():
+    """RSS / PSS / private memory of this process in kB (Linux smaps_rollup)"""
+    fields = {}
+    try:
+        with open('/proc/self/smaps_rollup', 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        import resource
+        return {'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'pss': None, 'private': None}
+
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    }
+
+
+def _worker(mode, model_path, n_predict, ready, measure, results):
+    """Load the model the given way, run predictions, then report memory once all workers are up"""
+    import numpy as np
+    from models.banking_classifier import BankingAPKClassifier
+
+    baseline = read_memory_kb()
+    start = time.perf_counter()
+    classifier = BankingAPKClassifier()
+    if mode == 'joblib':
+        classifier.load_model(model_path)
+    else:
+        classifier.load_serving_model(model_path)
+    load_time = time.perf_counter() - start
+
+    X = (np.random.RandomState(os.getpid()).rand(n_predict, len(classifier.feature_names)) < 0.1).astype(np.uint8)
+    classifier.predict_batch(X)
+
+    ready.put(os.getpid())
+    measure.wait()
+    memory = read_memory_kb()
+    results.put({
+        'mode': mode,
+        'load_seconds': load_time,
+        'baseline': baseline,
+        'memory': memory
+    })
+
+
+def run_workers(mode, model_path, n_workers, n_predict):
+    """Start n_workers processes concurrently and collect their memory reports"""
+    context = multiprocessing.get_context('spawn')
+    ready, results, measure = context.Queue(), context.Queue(), context.Event()
+    workers = [
+        context.Process(target=_worker, args=(mode, model_path, n_predict, ready, measure, results))
+        for _ in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        ready.get()
+
+    measure.set()
+    reports = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return reports
+
+
+def benchmark_model_memory(model_path, n_workers=4, n_predict=32):
+    """Compare per-worker memory of pickled vs memory-mapped serving artifacts"""
+    print("🚀 BankGuard AI Model Memory Benchmark")
+    print("="*60)
+    print(f"📂 Model: {model_path} ({n_workers} concurrent workers)")
+
+    summary = {}
+    for mode in ('joblib', 'serving'):
+        reports = run_workers(mode, model_path, n_workers, n_predict)
+        summary[mode] = reports
+
+        print(f"\n📊 {mode} artifact")
+        print(f"{'Worker':<8}{'Load s':>8}{'RSS MB':>9}{'PSS MB':>9}{'Private MB':>12}{'Model MB*':>11}")
+        for i, report in enumerate(reports, 1):
+            memory, baseline = report['memory'], report['baseline']
+            pss = f"{memory['pss'] / 1024:>9.1f}" if memory['pss'] is not None else f"{'n/a':>9}"
+            private = f"{memory['private'] / 1024:>12.1f}" if memory['private'] is not None else f"{'n/a':>12}"
+            print(f"{i:<8}{report['load_seconds']:>8.2f}{memory['rss'] / 1024:>9.1f}{pss}{private}"
+                  f"{(memory['rss'] - baseline['rss']) / 1024:>11.1f}")
+
+    print("\n* RSS growth after importing libraries (model load + first predictions)")
+    print("   Mapped arrays count toward every worker's RSS but only once toward PSS,")
+    print("   so PSS and private memory show the physical cost per worker.")
+    return summary
+
+
+if __name__ == "__main__":
+    # Imported here, not at module level, so spawned workers only pay for their own imports
+    from config import Config
+    from models.model_registry import ModelRegistry
+
+    parser = argparse.ArgumentParser(description="Measure per-worker memory for each model artifact format")
+    parser.add_argument('--model', default=ModelRegistry(Config.MODEL_REGISTRY_DIR).active_model_path(Config.MODEL_PATH))
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--predict', type=int, default=32)
+    args = parser.parse_args()
+
+    benchmark_model_memory(args.model, args.workers, args.predict)
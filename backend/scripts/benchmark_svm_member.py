@@ -0,0 +1,95 @@
+# 📄 backend/scripts/benchmark_svm_member.py - SVM Member Benchmark
+# ================================================================================
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import accuracy_score, log_loss
+from models.banking_classifier import BankingAPKClassifier
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+
+
+def benchmark_member(svm_member, X_train, y_train, X_test, y_test, components, single_samples):
+    """Fit one SVM member variant and time training and inference"""
+    member = BankingAPKClassifier(svm_member=svm_member, svm_approx_components=components)._build_svm_member()
+
+    start = time.perf_counter()
+    member.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    proba = member.predict_proba(X_test)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in X_test[:single_samples]:
+        member.predict_proba(row.reshape(1, -1))
+    single_time = (time.perf_counter() - start) / max(single_samples, 1)
+
+    return {
+        'member': svm_member,
+        'fit_s': fit_time,
+        'batch_ms_per_sample': batch_time / len(X_test) * 1000,
+        'single_ms': single_time * 1000,
+        'accuracy': accuracy_score(y_test, np.argmax(proba, axis=1)),
+        'log_loss': log_loss(y_test, proba),
+        'support_vectors': len(getattr(member, 'support_vectors_', []))
+    }
+
+
+def benchmark_svm_members(dataset_path, components=300, single_samples=200, max_samples=None):
+    """Compare the exact RBF SVC with the kernel-approximation member"""
+    print("🚀 BankGuard AI SVM Member Benchmark")
+    print("="*60)
+
+    classifier = BankingAPKClassifier()
+    X, y, _ = classifier._load_training_data(dataset_path)
+    if max_samples and len(y) > max_samples:
+        keep, _ = train_test_split(np.arange(len(y)), train_size=max_samples, random_state=42, stratify=y)
+        X, y = X[keep], y[keep]
+
+    # Same split and scaling as train_on_dataset
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+    X_test = scaler.transform(X_test)
+    print(f"📊 Train: {len(y_train)} samples, holdout: {len(y_test)} samples, {X.shape[1]} features")
+
+    rows = [
+        benchmark_member(member, X_train, y_train, X_test, y_test, components, single_samples)
+        for member in BankingAPKClassifier.SVM_MEMBERS
+    ]
+
+    print("\n" + "="*60)
+    print(f"{'Member':<12}{'Fit s':>9}{'Batch ms':>10}{'Single ms':>11}{'Accuracy':>10}{'LogLoss':>9}")
+    print("-"*61)
+    for row in rows:
+        print(f"{row['member']:<12}{row['fit_s']:>9.2f}{row['batch_ms_per_sample']:>10.3f}"
+              f"{row['single_ms']:>11.2f}{row['accuracy']:>10.4f}{row['log_loss']:>9.4f}")
+    print("="*60)
+
+    svc, approx = rows
+    print(f"   SVC support vectors: {svc['support_vectors']}, Nystroem components: {components}")
+    print(f"   Training speedup: {svc['fit_s'] / approx['fit_s']:.1f}x, "
+          f"batch inference speedup: {svc['batch_ms_per_sample'] / approx['batch_ms_per_sample']:.1f}x")
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SVC vs kernel-approximation SVM member")
+    parser.add_argument('--dataset', default='data/datasets/fullset_train.csv')
+    parser.add_argument('--components', type=int, default=300)
+    parser.add_argument('--single-samples', type=int, default=200)
+    parser.add_argument('--max-samples', type=int, default=None)
+    args = parser.parse_args()
+
+    benchmark_svm_members(args.dataset, args.components, args.single_samples, args.max_samples)
@@ -0,0 +1,66 @@
+# 📄 backend/scripts/cross_validate_model.py - Scheduled Cross-Validation
+# ================================================================================
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from config import Config
+from models.banking_classifier import BankingAPKClassifier
+from models.model_registry import ModelRegistry
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def cross_validate_model(model_path, dataset_path, cv_folds, cv_jobs):
+    """Cross-validate a trained model's ensemble and store the fold metrics with it
+
+    Without model_path the registry's active version is used; its artifacts
+    are immutable, so the metrics go into the version metadata instead.
+    """
+    print("🚀 BankGuard AI Cross-Validation")
+    print("="*60)
+
+    registry = ModelRegistry(Config.MODEL_REGISTRY_DIR)
+    version = None if model_path else registry.active_version()
+    if model_path is None:
+        if version is None:
+            raise ValueError(f"No active model version in {Config.MODEL_REGISTRY_DIR}; pass --model")
+        model_path = registry.model_path(version)
+
+    classifier = BankingAPKClassifier()
+    classifier.load_model(model_path)
+    print(f"📂 Model: {model_path}")
+    print(f"📊 Dataset: {dataset_path} ({cv_folds} folds, n_jobs={cv_jobs})")
+
+    cv_metrics = classifier.run_cross_validation(dataset_path, cv_folds=cv_folds, cv_jobs=cv_jobs)
+
+    print("\n" + "="*60)
+    for i, fold in enumerate(cv_metrics['folds'], 1):
+        print(f"   Fold {i}: accuracy {fold['accuracy']:.4f}, f1 {fold['f1']:.4f} ({fold['fit_seconds']}s)")
+    print("-"*60)
+    for name, mean in cv_metrics['mean'].items():
+        print(f"   {name:<10} {mean:.4f} (+/- {cv_metrics['std'][name] * 2:.4f})")
+    print("="*60)
+
+    if version:
+        registry.update_metadata(version, cv_accuracy=cv_metrics['mean']['accuracy'], cv_metrics=cv_metrics)
+        print(f"💾 Fold metrics saved in metadata of version {version}")
+    else:
+        classifier.save_model(model_path)
+        print(f"💾 Fold metrics saved with model: {model_path}")
+    return cv_metrics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validate the trained BankGuard ensemble")
+    parser.add_argument('--model', default=None, help='Model artifact (default: active registry version)')
+    parser.add_argument('--dataset', default=Config.DATASET_PATH)
+    parser.add_argument('--folds', type=int, default=Config.CV_FOLDS)
+    parser.add_argument('--jobs', type=int, default=Config.CV_N_JOBS)
+    args = parser.parse_args()
+
+    cross_validate_model(args.model, args.dataset, args.folds, args.jobs)
@@ -5,10 +5,12 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import pandas as pd
 import numpy as np
+from config import Config
 from models.banking_classifier import BankingAPKClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from models.hyperparameter_search import load_tuned_params
+from models.model_registry import ModelRegistry
+from utils.dataset_cache import DatasetCache
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -22,7 +24,13 @@ def train_bankguard_model():
         print("="*60)
         
         # Initialize classifier
-        classifier = BankingAPKClassifier()
+        classifier = BankingAPKClassifier(
+            svm_member=Config.SVM_MEMBER,
+            svm_approx_components=Config.SVM_APPROX_COMPONENTS,
+            min_feature_frequency=Config.FEATURE_MIN_FREQUENCY,
+            feature_budget=Config.FEATURE_BUDGET,
+            ensemble_params=load_tuned_params(Config.TUNED_PARAMS_PATH)
+        )
         
         # Check if dataset exists
         dataset_path = 'data/datasets/fullset_train.csv'
@@ -33,43 +41,49 @@ def train_bankguard_model():
         
         print(f"📂 Loading dataset: {dataset_path}")
         
-        # Load and examine dataset
-        df = pd.read_csv(dataset_path)
+        # Load and examine dataset (parsed once into the binary dataset cache,
+        # which train_on_dataset below reuses)
+        X, y, feature_names = DatasetCache().load(dataset_path)
         print(f"✅ Dataset loaded successfully!")
-        print(f"   Shape: {df.shape}")
-        print(f"   Features: {df.shape[1] - 1}")
-        print(f"   Samples: {df.shape[0]}")
+        print(f"   Shape: {X.shape}")
+        print(f"   Features: {len(feature_names)}")
+        print(f"   Samples: {X.shape[0]}")
         
         # Check label distribution
-        if 'class' in df.columns:
-            label_col = 'class'
-        elif 'label' in df.columns:
-            label_col = 'label'
-        else:
-            label_col = df.columns[-1]
-            print(f"⚠️  Assuming last column '{label_col}' is the label")
-        
-        label_counts = df[label_col].value_counts()
+        labels, counts = np.unique(y, return_counts=True)
         print(f"📊 Label distribution:")
-        for label, count in label_counts.items():
-            print(f"   {label}: {count} samples ({count/len(df)*100:.1f}%)")
+        for label, count in zip(labels, counts):
+            print(f"   {label}: {count} samples ({count/len(y)*100:.1f}%)")
         
         print("\n🤖 Training ensemble model...")
-        print("   Models: Random Forest + XGBoost + SVM + Logistic Regression")
+        print(f"   Models: Random Forest + XGBoost + SVM ({classifier.svm_member}) + Logistic Regression")
+        if classifier.ensemble_params:
+            print(f"   Tuned hyperparameters: {Config.TUNED_PARAMS_PATH}")
         
         # Train the model
-        accuracy = classifier.train_on_dataset(dataset_path)
+        accuracy = classifier.train_on_dataset(
+            dataset_path,
+            cross_validate=Config.CV_ENABLED,
+            cv_folds=Config.CV_FOLDS,
+            cv_jobs=Config.CV_N_JOBS
+        )
         
         print(f"\n🎯 Training Results:")
         print(f"   Accuracy: {accuracy:.3f}")
         print(f"   Training samples: {classifier.training_samples}")
         print(f"   Features: {len(classifier.feature_names)}")
-        
-        # Save the trained model
-        model_save_path = 'data/trained_models/bankguard_model.joblib'
-        os.makedirs('data/trained_models', exist_ok=True)
-        classifier.save_model(model_save_path)
-        print(f"💾 Model saved: {model_save_path}")
+        if classifier.feature_selection:
+            print(f"   Feature selection: {classifier.feature_selection['retained_features']} of "
+                  f"{classifier.feature_selection['source_features']} columns retained")
+        if classifier.cv_metrics:
+            print(f"   CV accuracy: {classifier.cv_metrics['mean']['accuracy']:.3f} "
+                  f"({classifier.cv_metrics['n_folds']} folds)")
+        
+        # Publish the trained model as a new registry version and activate it
+        # (a running server picks it up via /api/models/<version>/activate or on restart)
+        registry = ModelRegistry(Config.MODEL_REGISTRY_DIR)
+        version = registry.publish(classifier, activate=True)
+        print(f"💾 Model saved: {registry.model_path(version)} (version {version}, active)")
         
         # Test prediction with sample data
         print("\n🧪 Testing prediction capability...")
@@ -0,0 +1,107 @@
+# 📄 backend/scripts/tune_hyperparameters.py - Ensemble Hyperparameter Tuning
+# ================================================================================
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+from datetime import datetime
+import numpy as np
+from sklearn.model_selection import train_test_split
+from config import Config
+from models.banking_classifier import BankingAPKClassifier
+from models.hyperparameter_search import SuccessiveHalvingSearch, BASELINE_PARAMS
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+
+
+def tune_hyperparameters(dataset_path, checkpoint_path, output_path, n_candidates=27, eta=3,
+                         latency_weight=Config.TUNING_LATENCY_WEIGHT, n_jobs=-1, seed=42):
+    """Search member hyperparameters and voting weights, resuming from checkpoint_path if present
+
+    Only the training split of train_on_dataset is searched (the holdout stays
+    untouched), after the same feature selection that training applies.
+    """
+    print("🚀 BankGuard AI Hyperparameter Search")
+    print("="*60)
+
+    classifier_kwargs = {'svm_member': Config.SVM_MEMBER, 'svm_approx_components': Config.SVM_APPROX_COMPONENTS}
+    classifier = BankingAPKClassifier(
+        min_feature_frequency=Config.FEATURE_MIN_FREQUENCY,
+        feature_budget=Config.FEATURE_BUDGET,
+        **classifier_kwargs
+    )
+    X, y, feature_names = classifier._load_training_data(dataset_path)
+    train_idx, _ = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42, stratify=y)
+    X = classifier._select_features(X, y, train_idx, feature_names, lambda phase: None)[train_idx]
+    y = y[train_idx]
+
+    search = SuccessiveHalvingSearch(
+        checkpoint_path,
+        n_candidates=n_candidates,
+        eta=eta,
+        latency_weight=latency_weight,
+        n_jobs=n_jobs,
+        seed=seed,
+        classifier_kwargs=classifier_kwargs
+    )
+    print(f"📊 Dataset: {dataset_path} ({len(y)} training rows, {X.shape[1]} features)")
+    print(f"🔬 {n_candidates} candidates, eta={eta}, {search.n_rungs} rungs, {search.n_jobs} workers")
+    print(f"💾 Checkpoint: {checkpoint_path}")
+
+    state = search.run(X, y, classifier.feature_names, dataset_label=os.path.abspath(dataset_path))
+    best = state['best']
+    final_results = state['rungs'][-1]['results']
+    baseline = final_results.get('0')
+
+    print("\n" + "="*60)
+    print(f"{'Candidate':<12}{'Accuracy':>10}{'Latency ms':>12}{'Score':>10}")
+    print("-"*44)
+    for candidate, result in sorted(final_results.items(), key=lambda item: -item[1]['score']):
+        label = f"#{candidate}" + (" (default)" if candidate == '0' else "")
+        print(f"{label:<12}{result['accuracy']:>10.4f}{result['latency_ms']:>12.2f}{result['score']:>10.4f}")
+    print("="*60)
+    for name, value in best['params'].items():
+        marker = "" if BASELINE_PARAMS.get(name) == value else f"  (default {BASELINE_PARAMS.get(name)})"
+        print(f"   {name:<22} {value}{marker}")
+
+    report = {
+        'ensemble_params': best['params'],
+        'accuracy': best['accuracy'],
+        'latency_ms': best['latency_ms'],
+        'score': best['score'],
+        'baseline': baseline,
+        'latency_weight': latency_weight,
+        'dataset': os.path.abspath(dataset_path),
+        'checkpoint': checkpoint_path,
+        'created': datetime.now().isoformat()
+    }
+    if baseline is None:
+        print("   The default ensemble was eliminated before the final rung")
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Best parameters saved to: {output_path} (used by the next training run)")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune ensemble hyperparameters with successive halving")
+    parser.add_argument('--dataset', default=Config.DATASET_PATH)
+    parser.add_argument('--checkpoint', default=Config.TUNING_CHECKPOINT_PATH,
+                        help='Search state; an existing checkpoint with the same settings is resumed')
+    parser.add_argument('--output', default=Config.TUNED_PARAMS_PATH)
+    parser.add_argument('--candidates', type=int, default=27)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--latency-weight', type=float, default=Config.TUNING_LATENCY_WEIGHT,
+                        help='Accuracy traded per ms of single-sample latency')
+    parser.add_argument('--jobs', type=int, default=-1)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    tune_hyperparameters(args.dataset, args.checkpoint, args.output, n_candidates=args.candidates,
+                         eta=args.eta, latency_weight=args.latency_weight, n_jobs=args.jobs, seed=args.seed)
@@ -0,0 +1,82 @@
+# 📄 backend/scripts/update_model.py - Incremental Model Update
+# ================================================================================
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from config import Config
+from models.banking_classifier import BankingAPKClassifier
+from models.model_registry import ModelRegistry
+from utils.dataset_cache import read_droidrl_csv
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def update_model(samples_path, model_path=None, apply=True):
+    """Fold a CSV of newly labelled samples (DroidRL columns + class) into a trained model
+
+    Without model_path the registry's active version is updated and the
+    result is published (and activated) as a new version; an explicit
+    model_path is updated in place.
+    """
+    print("🚀 BankGuard AI Incremental Update")
+    print("="*60)
+
+    registry = ModelRegistry(Config.MODEL_REGISTRY_DIR)
+    base_version = None if model_path else registry.active_version()
+    if model_path is None:
+        if base_version is None:
+            raise ValueError(f"No active model version in {Config.MODEL_REGISTRY_DIR}; pass --model")
+        model_path = registry.model_path(base_version)
+
+    classifier = BankingAPKClassifier()
+    classifier.load_model(model_path)
+    print(f"📂 Model: {model_path} ({classifier.training_samples} samples)")
+
+    X, y, feature_names, _ = read_droidrl_csv(samples_path)
+    X = classifier.select_model_columns(X, feature_names)
+    print(f"📊 New samples: {len(y)} from {samples_path}")
+
+    report = classifier.incremental_update(
+        X, y,
+        xgb_rounds=Config.INCREMENTAL_XGB_ROUNDS,
+        rf_refresh_trees=Config.INCREMENTAL_RF_REFRESH_TREES,
+        max_accuracy_drop=Config.INCREMENTAL_MAX_ACCURACY_DROP,
+        apply=apply
+    )
+
+    print("\n" + "="*60)
+    print(f"{'Holdout':<14}{'Samples':>9}{'Current':>10}{'Candidate':>11}{'F1 cur':>9}{'F1 cand':>9}")
+    print("-"*62)
+    for name, current in report['metrics']['current'].items():
+        candidate = report['metrics']['candidate'][name]
+        print(f"{name:<14}{current['samples']:>9}{current['accuracy']:>10.4f}{candidate['accuracy']:>11.4f}"
+              f"{current['f1']:>9.4f}{candidate['f1']:>9.4f}")
+    print("="*60)
+    print(f"   Accuracy change: {report['accuracy_change']:+.4f} ({report['elapsed_seconds']}s)")
+
+    if report['swapped'] and base_version:
+        version = registry.publish(classifier, activate=True, parent_version=base_version)
+        print(f"💾 Updated model published: version {version} (active)")
+    elif report['swapped']:
+        classifier.save_model(model_path)
+        print(f"💾 Updated model saved: {model_path}")
+    elif report['accepted']:
+        print("ℹ️  Dry run: candidate accepted but not saved")
+    else:
+        print(f"⚠️  Candidate rejected (max accuracy drop {Config.INCREMENTAL_MAX_ACCURACY_DROP}); model unchanged")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally update the BankGuard model with labelled samples")
+    parser.add_argument('samples', help='CSV of newly labelled samples in DroidRL format')
+    parser.add_argument('--model', default=None, help='Model artifact (default: active registry version)')
+    parser.add_argument('--dry-run', action='store_true', help='Report holdout metrics without saving')
+    args = parser.parse_args()
+
+    update_model(args.samples, args.model, apply=not args.dry_run)
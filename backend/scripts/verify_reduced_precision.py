@@ -0,0 +1,153 @@
+# 📄 backend/scripts/verify_reduced_precision.py - float32 Inference Verification Report
+# ================================================================================
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import time
+import numpy as np
+from sklearn.model_selection import train_test_split
+from models.banking_classifier import BankingAPKClassifier
+from models.model_registry import ModelRegistry
+from models.tree_engine import CompiledTreeEnsemble, NODE_ARRAYS
+from config import Config
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+
+
+def load_holdout(classifier, dataset_path):
+    """Holdout split used by train_on_dataset, or the model's stored reference holdout"""
+    if dataset_path and os.path.exists(dataset_path):
+        X, y, feature_names = classifier._load_training_data(dataset_path)
+        X = classifier.select_model_columns(X, feature_names)
+        _, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42, stratify=y)
+        return X[test_idx], y[test_idx], f"{dataset_path} (20% holdout)"
+
+    if classifier.reference_holdout is not None:
+        X, y = classifier.reference_holdout
+        return X, y, "model reference holdout"
+
+    raise ValueError(f"No dataset at {dataset_path} and the model has no reference holdout")
+
+
+def parameter_bytes(classifier):
+    """Bytes of the arrays each member (and the scaler) reads at inference time"""
+    if classifier.reduced_members is not None:
+        members, scaler_arrays = classifier.reduced_members, classifier.reduced_scaler
+    else:
+        members = classifier._inference_members(1)
+        scaler_arrays = (classifier.scaler.mean_, classifier.scaler.scale_)
+
+    sizes = {'scaler': int(sum(np.asarray(a).nbytes for a in scaler_arrays))}
+    for name, member in members.items():
+        if isinstance(member, CompiledTreeEnsemble):
+            sizes[name] = int(sum(getattr(member, array).nbytes for array in NODE_ARRAYS))
+        elif hasattr(member, 'coef_'):
+            sizes[name] = int(np.asarray(member.coef_).nbytes + np.asarray(member.intercept_).nbytes)
+        elif hasattr(member, 'support_vectors_'):
+            sizes[name] = int(member.support_vectors_.nbytes + member.dual_coef_.nbytes)
+    sizes['total'] = sum(sizes.values())
+    return sizes
+
+
+def run(classifier, X, single_samples):
+    """Probabilities, per-member probabilities and latency of the classifier's current precision"""
+    start = time.perf_counter()
+    predictions, proba, member_proba, _ = classifier._ensemble_predict(classifier._scale(X))
+    batch_time = time.perf_counter() - start
+
+    latencies = []
+    for row in X[:single_samples]:
+        start = time.perf_counter()
+        classifier.predict_with_explanation(row)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        'predictions': predictions,
+        'proba': proba[:, 1],
+        'member_proba': {name: p[:, 1] for name, p in member_proba.items()},
+        'batch_ms_per_sample': batch_time / len(X) * 1000,
+        'single_ms_p50': float(np.percentile(latencies, 50) * 1000) if latencies else None,
+        'single_ms_p95': float(np.percentile(latencies, 95) * 1000) if latencies else None,
+        'parameter_bytes': parameter_bytes(classifier)
+    }
+
+
+def verify_reduced_precision(model_path, dataset_path, single_samples=200, output_path=None):
+    """Compare float32 against float64 inference on the holdout set"""
+    print("🚀 BankGuard AI Reduced-Precision Verification")
+    print("="*60)
+
+    classifier = BankingAPKClassifier()
+    classifier.load_model(model_path, inference_engine='compiled')
+    X, y, holdout_source = load_holdout(classifier, dataset_path)
+    print(f"📂 Model: {model_path}")
+    print(f"📊 Holdout: {len(y)} samples from {holdout_source}")
+
+    classifier.set_precision('float64')
+    reference = run(classifier, X, single_samples)
+    classifier.set_precision('float32')
+    reduced = run(classifier, X, single_samples)
+
+    abs_diff = np.abs(reduced['proba'] - reference['proba'])
+    report = {
+        'model': model_path,
+        'holdout': holdout_source,
+        'samples': int(len(y)),
+        'agreement': float(np.mean(reduced['predictions'] == reference['predictions'])),
+        'disagreements': int(np.sum(reduced['predictions'] != reference['predictions'])),
+        'accuracy': {
+            'float64': float(np.mean(reference['predictions'] == y)),
+            'float32': float(np.mean(reduced['predictions'] == y))
+        },
+        'malicious_probability_abs_diff': {'max': float(abs_diff.max()), 'mean': float(abs_diff.mean())},
+        'member_max_abs_diff': {
+            name: float(np.max(np.abs(reduced['member_proba'][name] - reference['member_proba'][name])))
+            for name in reference['member_proba']
+        },
+        'parameter_bytes': {'float64': reference['parameter_bytes'], 'float32': reduced['parameter_bytes']},
+        'latency_ms': {
+            precision: {key: result[key] for key in ('batch_ms_per_sample', 'single_ms_p50', 'single_ms_p95')}
+            for precision, result in (('float64', reference), ('float32', reduced))
+        }
+    }
+
+    print("\n" + "="*60)
+    print(f"Label agreement:        {report['agreement']:.4%} ({report['disagreements']} differ)")
+    print(f"Accuracy float64/32:    {report['accuracy']['float64']:.4f} / {report['accuracy']['float32']:.4f}")
+    print(f"P(malicious) abs diff:  max {abs_diff.max():.2e}, mean {abs_diff.mean():.2e}")
+    for name, diff in report['member_max_abs_diff'].items():
+        print(f"   {name:<4} max abs diff {diff:.2e}")
+
+    print(f"\n{'Parameters (bytes)':<22}{'float64':>14}{'float32':>14}")
+    print("-"*50)
+    for name, size in report['parameter_bytes']['float64'].items():
+        print(f"{name:<22}{size:>14,}{report['parameter_bytes']['float32'].get(name, 0):>14,}")
+
+    print(f"\n{'Latency (ms)':<22}{'float64':>14}{'float32':>14}")
+    print("-"*50)
+    for key in ('batch_ms_per_sample', 'single_ms_p50', 'single_ms_p95'):
+        print(f"{key:<22}{report['latency_ms']['float64'][key]:>14.3f}{report['latency_ms']['float32'][key]:>14.3f}")
+    print("="*60)
+
+    if output_path:
+        with open(output_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to: {output_path}")
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify float32 inference against float64 on the holdout set")
+    parser.add_argument('--model', default=ModelRegistry(Config.MODEL_REGISTRY_DIR).active_model_path(Config.MODEL_PATH))
+    parser.add_argument('--dataset', default=Config.DATASET_PATH)
+    parser.add_argument('--single-samples', type=int, default=200)
+    parser.add_argument('--output', help='Write the report as JSON')
+    args = parser.parse_args()
+
+    verify_reduced_precision(args.model, args.dataset, single_samples=args.single_samples, output_path=args.output)
@@ -0,0 +1,151 @@
+# 📄 backend/tests/apk_fixtures.py - Synthetic APK Contents for Tests and Benchmarks
+# ================================================================================
+
+import hashlib
+import struct
+import zlib
+
+from analyzers.dex_parser import TYPE_CODE_ITEM, _CODE_ITEM, _HEADER, _MAP_ITEM
+from analyzers.manifest_parser import (ANDROID_NAME_RESOURCE_ID, ANDROID_NAMESPACE, NO_ENTRY, RES_STRING_POOL_TYPE,
+                                       RES_XML_END_ELEMENT_TYPE, RES_XML_END_NAMESPACE_TYPE,
+                                       RES_XML_RESOURCE_MAP_TYPE, RES_XML_START_ELEMENT_TYPE,
+                                       RES_XML_START_NAMESPACE_TYPE, RES_XML_TYPE, TYPE_STRING, UTF8_FLAG,
+                                       _ATTRIBUTE, _CHUNK_HEADER, _START_ELEMENT, _STRING_POOL_HEADER)
+
+
+def encode_binary_manifest(package, permissions=(), intent_actions=(), utf8=False):
+    """Minimal Android binary XML manifest
+
+    One application with an activity whose intent-filter lists intent_actions,
+    laid out like aapt output: string pool, android:name resource map,
+    namespace and element chunks.
+    """
+    strings = ['name', 'package', 'android', ANDROID_NAMESPACE, 'manifest', 'uses-permission',
+               'application', 'activity', 'intent-filter', 'action', package, '.MainActivity']
+    strings += [value for value in list(permissions) + list(intent_actions) if value not in strings]
+    index = {value: i for i, value in enumerate(strings)}
+    ns = index[ANDROID_NAMESPACE]
+
+    def chunk(chunk_type, header_size, body):
+        return _CHUNK_HEADER.pack(chunk_type, header_size, 8 + len(body)) + body
+
+    def node(chunk_type, extension):
+        return chunk(chunk_type, 16, struct.pack('<II', 1, NO_ENTRY) + extension)
+
+    def start(tag, attributes=()):
+        extension = _START_ELEMENT.pack(NO_ENTRY, index[tag], 20, 20, len(attributes)) + struct.pack('<HHH', 0, 0, 0)
+        for attribute_ns, name, value in attributes:
+            extension += _ATTRIBUTE.pack(attribute_ns, index[name], index[value], 8, 0, TYPE_STRING, index[value])
+        return node(RES_XML_START_ELEMENT_TYPE, extension)
+
+    def end(tag):
+        return node(RES_XML_END_ELEMENT_TYPE, struct.pack('<II', NO_ENTRY, index[tag]))
+
+    encoded = []
+    for value in strings:
+        if utf8:
+            raw = value.encode('utf-8')
+            encoded.append(_utf8_length(len(value)) + _utf8_length(len(raw)) + raw + b'\0')
+        else:
+            raw = value.encode('utf-16-le')
+            encoded.append(_utf16_length(len(raw) // 2) + raw + b'\0\0')
+    offsets, position = [], 0
+    for item in encoded:
+        offsets.append(position)
+        position += len(item)
+    string_data = b''.join(encoded)
+    string_data += b'\0' * (-len(string_data) % 4)
+    pool_header_size = 28
+    pool = chunk(RES_STRING_POOL_TYPE, pool_header_size,
+                 _STRING_POOL_HEADER.pack(len(strings), 0, UTF8_FLAG if utf8 else 0,
+                                          pool_header_size + 4 * len(strings), 0) +
+                 struct.pack(f'<{len(strings)}I', *offsets) + string_data)
+    resource_map = chunk(RES_XML_RESOURCE_MAP_TYPE, 8, struct.pack('<I', ANDROID_NAME_RESOURCE_ID))
+
+    body = [pool, resource_map, node(RES_XML_START_NAMESPACE_TYPE, struct.pack('<II', index['android'], ns)),
+            start('manifest', [(NO_ENTRY, 'package', package)])]
+    for permission in permissions:
+        body += [start('uses-permission', [(ns, 'name', permission)]), end('uses-permission')]
+    body += [start('application'), start('activity', [(ns, 'name', '.MainActivity')]), start('intent-filter')]
+    for action in intent_actions:
+        body += [start('action', [(ns, 'name', action)]), end('action')]
+    body += [end('intent-filter'), end('activity'), end('application'), end('manifest'),
+             node(RES_XML_END_NAMESPACE_TYPE, struct.pack('<II', index['android'], ns))]
+
+    return chunk(RES_XML_TYPE, 8, b''.join(body))
+
+
+def _utf8_length(length):
+    return bytes([length]) if length < 0x80 else bytes([0x80 | (length >> 8), length & 0xFF])
+
+
+def _utf16_length(length):
+    return struct.pack('<H', length) if length < 0x8000 else struct.pack('<HH', 0x8000 | (length >> 16), length & 0xFFFF)
+
+
+def encode_dex(method_refs, bodies):
+    """Minimal DEX file
+
+    method_refs is a list of (class descriptor, method name) pairs, all with a
+    ()V prototype; bodies is a list of method bodies as lists of 16-bit code
+    units, stored as code items (no class definitions reference them).
+    """
+    strings = sorted({'V'} | {value for ref in method_refs for value in ref})
+    string_index = {value: i for i, value in enumerate(strings)}
+    types = sorted({'V'} | {descriptor for descriptor, _ in method_refs}, key=string_index.get)
+    type_index = {value: i for i, value in enumerate(types)}
+    methods = sorted(set(method_refs), key=lambda ref: (type_index[ref[0]], string_index[ref[1]]))
+
+    string_ids_off = _HEADER.size
+    type_ids_off = string_ids_off + 4 * len(strings)
+    proto_ids_off = type_ids_off + 4 * len(types)
+    method_ids_off = proto_ids_off + 12
+    data_off = method_ids_off + 8 * len(methods)
+    data_off += -data_off % 4
+
+    code = b''
+    for body in bodies:
+        code += b'\0' * (-len(code) % 4)
+        code += _CODE_ITEM.pack(16, 0, 4, 0, 0, len(body)) + struct.pack(f'<{len(body)}H', *body)
+    string_data_off = data_off + len(code)
+    string_data, string_offsets = b'', []
+    for value in strings:
+        string_offsets.append(string_data_off + len(string_data))
+        string_data += _uleb128(len(value)) + value.encode('utf-8') + b'\0'
+    map_off = string_data_off + len(string_data)
+    map_off += -map_off % 4
+
+    sections = [(0x0000, 1, 0), (0x0001, len(strings), string_ids_off), (0x0002, len(types), type_ids_off),
+                (0x0003, 1, proto_ids_off), (0x0005, len(methods), method_ids_off),
+                (TYPE_CODE_ITEM, len(bodies), data_off), (0x2002, len(strings), string_data_off),
+                (0x1000, 1, map_off)]
+    sections = [section for section in sections if section[1]]
+    map_list = struct.pack('<I', len(sections)) + b''.join(_MAP_ITEM.pack(t, 0, n, o) for t, n, o in sections)
+    file_size = map_off + len(map_list)
+
+    body = (struct.pack(f'<{len(strings)}I', *string_offsets) +
+            struct.pack(f'<{len(types)}I', *(string_index[t] for t in types)) +
+            struct.pack('<III', string_index['V'], type_index['V'], 0) +
+            b''.join(struct.pack('<HHI', type_index[d], 0, string_index[n]) for d, n in methods))
+    body += b'\0' * (data_off - _HEADER.size - len(body)) + code + string_data
+    body += b'\0' * (map_off - _HEADER.size - len(body)) + map_list
+
+    def header(checksum, signature):
+        return _HEADER.pack(b'dex\n035\0', checksum, signature, file_size, _HEADER.size, 0x12345678, 0, 0, map_off,
+                            len(strings), string_ids_off, len(types), type_ids_off, 1, proto_ids_off, 0, 0,
+                            len(methods), method_ids_off, 0, 0, file_size - data_off, data_off)
+
+    signature = hashlib.sha1(header(0, b'\0' * 20)[32:] + body).digest()
+    checksum = zlib.adler32(header(0, signature)[12:] + body)
+    return header(checksum, signature) + body
+
+
+def _uleb128(value):
+    encoded = b''
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            encoded += bytes([byte | 0x80])
+        else:
+            return encoded + bytes([byte])
@@ -2,12 +2,23 @@ import unittest
 import json
 import tempfile
 import os
+import io
+import shutil
+import hashlib
 import sys
+import zipfile
+from unittest import mock
+import numpy as np
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import app as app_module
 from app import app
+from analyzers.manifest_parser import MANIFEST_ENTRY
+from database.analysis_store import AnalysisStore
+from database.operations import DatabaseManager
+from tests.apk_fixtures import encode_binary_manifest
 
 class TestBankGuardAPI(unittest.TestCase):
     def setUp(self):
@@ -29,6 +40,23 @@ class TestBankGuardAPI(unittest.TestCase):
         self.assertIn('model_loaded', data)
         self.assertIn('timestamp', data)
     
+    def test_liveness_and_readiness(self):
+        """Liveness always answers; readiness is 503 until a model is serving"""
+        response = self.client.get('/api/health/live')
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.client.get('/api/health/ready')
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 200 if data['ready'] else 503)
+        self.assertIn('state', data)
+    
+    def test_serving_classifier_uses_cascade_band(self):
+        """Config.CASCADE_BAND is applied to the classifiers the model manager loads"""
+        with mock.patch('config.Config.CASCADE_BAND', (0.05, 0.95)):
+            self.assertEqual(app_module.new_classifier().cascade_band, (0.05, 0.95))
+        with mock.patch('config.Config.CASCADE_BAND', None):
+            self.assertIsNone(app_module.new_classifier().cascade_band)
+    
     def test_statistics_endpoint(self):
         """Test statistics endpoint"""
         response = self.client.get('/api/statistics')
@@ -74,7 +102,138 @@ class TestBankGuardAPI(unittest.TestCase):
                                   content_type='application/json')
         
         # Should work even with partial features
-        self.assertIn(response.status_code, [200, 500])  # May fail if model not trained
+        self.assertIn(response.status_code, [200, 500, 503])  # 503 while no model is loaded
+    
+    def test_explain_endpoint(self):
+        """Explanation endpoint validates its input and answers 503 while no model is loaded"""
+        response = self.client.post('/api/explain', data='[1, 0]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        
+        response = self.client.post('/api/explain?top_k=3',
+                                  data=json.dumps({'features': {'permission_SEND_SMS': 1}}),
+                                  content_type='application/json')
+        self.assertIn(response.status_code, [200, 503])
+        if response.status_code == 200:
+            data = json.loads(response.data)
+            self.assertIn('members', data['explanation'])
+
+class _StubClassifier:
+    """Stand-in serving model that counts how often it is run"""
+    
+    feature_names = ['permission_SEND_SMS', 'permission_INTERNET']
+    feature_schema = None
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def prepare_features(self, features):
+        return np.asarray(features, dtype=float).reshape(1, -1)
+    
+    def predict_with_explanation(self, features, include_member_probabilities=False):
+        self.calls += 1
+        return {'prediction': 'MALICIOUS', 'risk_score': 7.5, 'confidence': 90.0,
+                'explanation': {'risk_factors': [], 'key_indicators': []}}
+
+
+class TestUploadDeduplication(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.temp_dir = tempfile.mkdtemp()
+        self.classifier = _StubClassifier()
+        
+        apk = io.BytesIO()
+        with zipfile.ZipFile(apk, 'w') as archive:
+            archive.writestr(MANIFEST_ENTRY, encode_binary_manifest('com.bank.app', ['android.permission.SEND_SMS']))
+        self.apk_bytes = apk.getvalue()
+        
+        patches = [
+            mock.patch.object(app_module, 'analysis_store', AnalysisStore(os.path.join(self.temp_dir, 'analyses'))),
+            mock.patch.object(app_module, 'prediction_cache', None),
+            mock.patch.object(app_module, 'db_manager', DatabaseManager(os.path.join(self.temp_dir, 'analyses.json'))),
+            mock.patch.dict(self.app.config, {'UPLOAD_FOLDER': os.path.join(self.temp_dir, 'uploads')})
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def upload(self, filename, version='v1', force_rescan=False):
+        data = {'apk_file': (io.BytesIO(self.apk_bytes), filename)}
+        if force_rescan:
+            data['force_rescan'] = 'true'
+        with mock.patch.object(app_module, 'serving_model', return_value=(version, self.classifier)):
+            response = self.client.post('/api/analyze', data=data, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data)
+    
+    def test_repeat_upload_returns_stored_analysis(self):
+        """Same content under another name reuses the stored verdict; new model versions and force_rescan re-analyse"""
+        first = self.upload('bank.apk')
+        self.assertFalse(first['deduplicated'])
+        
+        repeat = self.upload('renamed.apk')
+        self.assertTrue(repeat['deduplicated'])
+        self.assertEqual(repeat['sha256'], first['sha256'])
+        self.assertEqual(repeat['analysis_id'], first['analysis_id'])
+        self.assertEqual(repeat['forensic_report'], first['forensic_report'])
+        self.assertEqual(repeat['filename'], 'renamed.apk')
+        self.assertEqual(self.classifier.calls, 1)
+        
+        self.assertFalse(self.upload('bank.apk', force_rescan=True)['deduplicated'])
+        self.assertFalse(self.upload('bank.apk', version='v2')['deduplicated'])
+        self.assertTrue(self.upload('bank.apk', version='v2')['deduplicated'])
+        self.assertEqual(self.classifier.calls, 3)
+        
+        # Small uploads are analysed from memory and never touch the scratch area
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'uploads')))
+    
+    def test_unreadable_upload_gets_no_verdict(self):
+        """A file that is not a readable APK is answered with 422, not classified"""
+        data = {'apk_file': (io.BytesIO(b'not a zip at all' * 10), 'fake.apk')}
+        with mock.patch.object(app_module, 'serving_model', return_value=('v1', self.classifier)):
+            response = self.client.post('/api/analyze', data=data, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 422)
+        self.assertNotIn('prediction', json.loads(response.data))
+        self.assertEqual(self.classifier.calls, 0)
+        self.assertIsNone(app_module.analysis_store.get(hashlib.sha256(b'not a zip at all' * 10).hexdigest()))
+        
+        # Records stored before extraction failures were rejected are not replayed
+        sha256 = hashlib.sha256(self.apk_bytes).hexdigest()
+        app_module.analysis_store.put(sha256, {'model_version': 'v1', 'prediction': 'LEGITIMATE'})
+        self.assertFalse(self.upload('bank.apk')['deduplicated'])
+        self.assertTrue(self.upload('bank.apk')['deduplicated'])
+    
+    def test_large_uploads_spill_and_are_always_removed(self):
+        """Uploads over the memory limit spill to the scratch area, which is emptied even when analysis fails"""
+        scratch_dir = os.path.join(self.temp_dir, 'uploads')
+        spilled = []
+        extract_features = app_module.static_analyzer.extract_features
+        
+        def record_source(apk, feature_names=None):
+            spilled.append(isinstance(apk, str) and os.path.dirname(apk) == scratch_dir and os.path.exists(apk))
+            return extract_features(apk, feature_names=feature_names)
+        
+        with mock.patch.dict(self.app.config, {'UPLOAD_MEMORY_LIMIT': 64}), \
+                mock.patch.object(app_module.static_analyzer, 'extract_features', side_effect=record_source):
+            result = self.upload('bank.apk')
+        self.assertEqual(spilled, [True])
+        self.assertEqual(result['sha256'], hashlib.sha256(self.apk_bytes).hexdigest())
+        self.assertEqual(result['prediction'], 'MALICIOUS')
+        self.assertEqual(os.listdir(scratch_dir), [])
+        
+        with mock.patch.dict(self.app.config, {'UPLOAD_MEMORY_LIMIT': 64}), \
+                mock.patch.object(app_module.static_analyzer, 'extract_features', side_effect=RuntimeError('boom')), \
+                mock.patch.object(app_module, 'serving_model', return_value=('v1', self.classifier)):
+            response = self.client.post('/api/analyze', data={'apk_file': (io.BytesIO(self.apk_bytes), 'other.apk'),
+                                                              'force_rescan': '1'},
+                                        content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(os.listdir(scratch_dir), [])
+
 
 if __name__ == '__main__':
     unittest.main()
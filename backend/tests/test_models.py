@@ -6,10 +6,35 @@ import numpy as np
 import pandas as pd
 import os
 import sys
+import tempfile
+import shutil
+import struct
+import time
+import io
+import itertools
+import json
+import subprocess
+import zipfile
+from math import factorial
+from unittest import mock
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from analyzers.dex_parser import DexReader, counts_to_features, extract_dex_features
+from analyzers.manifest_parser import MANIFEST_ENTRY, MAX_MANIFEST_BYTES, InvalidAPKError, parse_manifest, read_apk_manifest
+from analyzers.static_analyzer import StaticAnalyzer
 from models.banking_classifier import BankingAPKClassifier
+from models.feature_schema import FeatureSchema, feature_schema_hash
+from models.hyperparameter_search import SuccessiveHalvingSearch, BASELINE_PARAMS
+from models.model_registry import ModelRegistry, ModelManager
+from models.portable_model import PortableModel, member_to_portable, member_from_portable
+from models.prediction_cache import PredictionCache
+from models.training_jobs import TrainingJobManager
+from models.tree_engine import CompiledTreeEnsemble
+from models.tree_explainer import TreePathExplainer
+from utils.dataset_cache import DatasetCache
+from utils.feature_packing import PackedFeatures
+from tests.apk_fixtures import encode_binary_manifest, encode_dex
 
 class TestBankingClassifier(unittest.TestCase):
     def setUp(self):
@@ -26,6 +51,14 @@ class TestBankingClassifier(unittest.TestCase):
         self.assertIsNotNone(self.classifier.scaler)
         self.assertFalse(self.classifier.is_trained)
     
+    def test_svm_member_option(self):
+        """SVM member is selectable and validated"""
+        approx = BankingAPKClassifier(svm_member='rbf_approx')
+        self.assertEqual(approx.model.named_estimators['svm'].steps[0][0], 'feature_map')
+        
+        with self.assertRaises(ValueError):
+            BankingAPKClassifier(svm_member='unknown')
+    
     def test_feature_vector_conversion(self):
         """Test feature dictionary to vector conversion"""
         feature_dict = {
@@ -59,5 +92,1060 @@ class TestBankingClassifier(unittest.TestCase):
         self.assertGreaterEqual(result['confidence'], 0)
         self.assertLessEqual(result['confidence'], 100)
 
+
+class TestFeaturePacking(unittest.TestCase):
+    def test_pack_roundtrip(self):
+        """Packed features unpack to the original binary matrix"""
+        matrix = (np.random.RandomState(1).rand(10, 583) < 0.1).astype(np.int64)
+        packed = PackedFeatures.from_dense(matrix)
+        
+        self.assertEqual(packed.shape, (10, 583))
+        self.assertEqual(packed.nbytes, 10 * 73)
+        np.testing.assert_array_equal(packed.toarray(), matrix)
+        np.testing.assert_array_equal(packed.take([2, 5]).toarray(), matrix[[2, 5]])
+        np.testing.assert_array_equal(packed.tocsr().toarray(), matrix)
+    
+    def test_from_indices(self):
+        """Rows can be packed from set column indices"""
+        packed = PackedFeatures.from_indices([[0, 9], [582]], 583)
+        dense = packed.toarray()
+        self.assertEqual(dense.sum(), 3)
+        self.assertEqual(dense[1, 582], 1)
+
+
+class TestManifestParser(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.permissions = ['android.permission.SEND_SMS', 'android.permission.INTERNET',
+                            'com.google.android.c2dm.permission.RECEIVE']
+        self.actions = ['android.intent.action.BOOT_COMPLETED', 'android.provider.Telephony.SMS_RECEIVED']
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def write_apk(self, manifest):
+        path = os.path.join(self.temp_dir, 'app.apk')
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as apk:
+            apk.writestr(MANIFEST_ENTRY, manifest)
+            apk.writestr('classes.dex', b'dex\n035\0' + bytes(4096))
+        return path
+    
+    def test_binary_manifest_utf8_and_utf16_pools(self):
+        """Permissions, intent-filter actions and package come back from both string pool encodings"""
+        for utf8 in (False, True):
+            manifest = parse_manifest(encode_binary_manifest('com.bank.app', self.permissions, self.actions, utf8=utf8))
+            self.assertEqual(manifest.package, 'com.bank.app')
+            self.assertEqual(manifest.permissions, set(self.permissions))
+            self.assertEqual(manifest.intent_actions, set(self.actions))
+    
+    def test_extract_features_maps_manifest_to_model_columns(self):
+        """extract_features reads the APK manifest and sets only the model's permission and intent columns"""
+        path = self.write_apk(encode_binary_manifest('com.bank.app', self.permissions, self.actions))
+        feature_names = ['permission_SEND_SMS', 'permission_CAMERA', 'permission_RECEIVE',
+                         'intent_SMS_RECEIVED', 'intent_MAIN']
+        
+        features = StaticAnalyzer().extract_features(path, feature_names=feature_names)
+        self.assertEqual(features, {'permission_SEND_SMS': 1, 'permission_CAMERA': 0, 'permission_RECEIVE': 1,
+                                    'intent_SMS_RECEIVED': 1, 'intent_MAIN': 0})
+    
+    def test_app_defined_names_do_not_spoof_platform_columns(self):
+        """Permissions and actions outside the platform namespaces never set DroidRL columns"""
+        path = self.write_apk(encode_binary_manifest(
+            'com.evil.app', ['com.evil.permission.SEND_SMS', 'com.evil.android.permission.READ_SMS',
+                             'android.permission.sub.CAMERA', 'android.permission.INTERNET'],
+            ['com.evil.intent.action.BOOT_COMPLETED']
+        ))
+        feature_names = ['permission_SEND_SMS', 'permission_READ_SMS', 'permission_CAMERA', 'permission_INTERNET',
+                         'intent_BOOT_COMPLETED']
+        
+        features = StaticAnalyzer().extract_features(path, feature_names=feature_names)
+        self.assertEqual(features, {'permission_SEND_SMS': 0, 'permission_READ_SMS': 0, 'permission_CAMERA': 0,
+                                    'permission_INTERNET': 1, 'intent_BOOT_COMPLETED': 0})
+    
+    def test_text_manifest_and_invalid_archives(self):
+        """Plain-text manifests parse too; unreadable uploads raise InvalidAPKError instead of getting features"""
+        path = self.write_apk(
+            '<manifest xmlns:android="http://schemas.android.com/apk/res/android" package="com.bank.app">'
+            '<uses-permission android:name="android.permission.READ_SMS"/>'
+            '<application><receiver android:name=".Sms"><intent-filter>'
+            '<action android:name="android.provider.Telephony.SMS_RECEIVED"/>'
+            '</intent-filter></receiver></application></manifest>'
+        )
+        manifest = read_apk_manifest(path)
+        self.assertEqual(manifest.permissions, {'android.permission.READ_SMS'})
+        self.assertEqual(manifest.intent_actions, {'android.provider.Telephony.SMS_RECEIVED'})
+        
+        not_an_apk = os.path.join(self.temp_dir, 'not_an_apk.apk')
+        with open(not_an_apk, 'wb') as f:
+            f.write(os.urandom(256))
+        no_manifest = os.path.join(self.temp_dir, 'no_manifest.apk')
+        with zipfile.ZipFile(no_manifest, 'w') as apk:
+            apk.writestr('classes.dex', b'dex\n035\0')
+        for path in (not_an_apk, no_manifest, io.BytesIO(b'not a zip at all' * 10)):
+            with self.assertRaises(InvalidAPKError):
+                StaticAnalyzer().extract_features(path)
+    
+    def test_inconsistent_chunk_sizes_are_tolerated(self):
+        """Oversized document and chunk sizes and truncated documents are clamped, not rejected"""
+        manifest = bytearray(encode_binary_manifest('com.bank.app', self.permissions, self.actions))
+        struct.pack_into('<I', manifest, 4, 0x7FFFFFFF)  # document size
+        struct.pack_into('<I', manifest, len(manifest) - 24 + 4, 0x7FFFFFFF)  # last chunk (end namespace)
+        parsed = read_apk_manifest(self.write_apk(bytes(manifest)))
+        self.assertEqual(parsed.permissions, set(self.permissions))
+        self.assertEqual(parsed.intent_actions, set(self.actions))
+        
+        truncated = parse_manifest(encode_binary_manifest('com.bank.app', self.permissions)[:-40])
+        self.assertEqual(truncated.permissions, set(self.permissions))
+        with self.assertRaises(InvalidAPKError):
+            parse_manifest(b'\x02\x00\x08\x00' + bytes(32))
+    
+    def test_oversized_manifest_is_not_inflated(self):
+        """A manifest that inflates past MAX_MANIFEST_BYTES is rejected from its declared size"""
+        path = self.write_apk(b'\0' * (MAX_MANIFEST_BYTES + 1))
+        self.assertLess(os.path.getsize(path), MAX_MANIFEST_BYTES // 100)
+        with self.assertRaises(InvalidAPKError):
+            read_apk_manifest(path)
+
+
+class TestDexParser(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.method_refs = [('Landroid/telephony/SmsManager;', 'sendTextMessage'), ('Ljava/lang/Object;', '<init>'),
+                            ('Ljava/lang/Runtime;', 'exec')]
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_counts_opcodes_and_sensitive_calls(self):
+        """Instructions are walked by width (payloads skipped) and invokes resolve to sensitive APIs"""
+        # Method ids are sorted by class then name: 0 sendTextMessage, 1 Object.<init>, 2 exec
+        # invoke-direct {Object.<init>}, packed-switch, return-void, nop, packed-switch-payload (2 targets)
+        body = [0x0070, 1, 0, 0x002b, 3, 0, 0x000e, 0x0000, 0x0100, 2, 0, 0, 0, 0, 0, 0]
+        dex = encode_dex(self.method_refs, [body, [0x1012, 0x0071, 2, 0, 0x000e]])  # const/4, invoke-static {exec}
+        
+        reader = DexReader(dex)
+        counts = reader.count()
+        reader.release()
+        opcodes = {opcode: n for opcode, n in enumerate(counts['opcodes']) if n}
+        self.assertEqual(opcodes, {0x70: 1, 0x2b: 1, 0x0e: 2, 0x00: 1, 0x12: 1, 0x71: 1})
+        self.assertEqual(counts['api_calls']['api_Runtime_exec'], 1)
+        self.assertEqual(counts['api_calls']['api_SmsManager_sendTextMessage'], 0)
+        
+        features = counts_to_features(counts['opcodes'], counts['api_calls'])
+        self.assertAlmostEqual(features['opcode_invoke'], 2 / 7, places=6)
+        self.assertAlmostEqual(sum(v for k, v in features.items() if k.startswith('opcode_')), 1.0, places=5)
+    
+    def test_multidex_features_merge_into_extract_features(self):
+        """classes*.dex are merged (in a pool or in process alike) and only requested columns are kept"""
+        path = os.path.join(self.temp_dir, 'multidex.apk')
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as apk:
+            apk.writestr(MANIFEST_ENTRY, encode_binary_manifest('com.bank.app', ['android.permission.SEND_SMS']))
+            apk.writestr('classes.dex', encode_dex(self.method_refs, [[0x0070, 1, 0, 0x000e]]))
+            apk.writestr('classes2.dex', encode_dex(self.method_refs, [[0x0071, 0, 0, 0x000e]]))
+        
+        features = extract_dex_features(path, n_jobs=2)
+        self.assertEqual(features, extract_dex_features(path, n_jobs=1))
+        self.assertEqual(features['api_SmsManager_sendTextMessage'], 1)
+        self.assertEqual(features['opcode_invoke'], 0.5)
+        
+        analyzer = StaticAnalyzer(dex_jobs=1)
+        extracted = analyzer.extract_features(path, feature_names=['permission_SEND_SMS', 'api_Runtime_exec',
+                                                                   'api_SmsManager_sendTextMessage'])
+        self.assertEqual(extracted, {'permission_SEND_SMS': 1, 'api_Runtime_exec': 0,
+                                     'api_SmsManager_sendTextMessage': 1})
+        # Models without DEX columns never pay for DEX parsing
+        self.assertEqual(analyzer.extract_features(path, feature_names=['permission_SEND_SMS']),
+                         {'permission_SEND_SMS': 1})
+    
+    def test_oversized_dex_is_not_spooled(self):
+        """A DEX inflating past max_dex_bytes raises before spooling; the analyzer keeps the manifest features"""
+        path = os.path.join(self.temp_dir, 'bomb.apk')
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as apk:
+            apk.writestr(MANIFEST_ENTRY, encode_binary_manifest('com.bank.app', ['android.permission.SEND_SMS']))
+            apk.writestr('classes.dex', encode_dex(self.method_refs, [[0x000e]]) + bytes(2 * 1024 * 1024))
+        
+        with self.assertRaises(ValueError):
+            extract_dex_features(path, n_jobs=1, max_dex_bytes=1024 * 1024)
+        analyzer = StaticAnalyzer(dex_jobs=1, max_dex_bytes=1024 * 1024)
+        self.assertEqual(analyzer.extract_features(path, feature_names=['permission_SEND_SMS', 'api_Runtime_exec']),
+                         {'permission_SEND_SMS': 1})
+
+
+class TestFeatureSchema(unittest.TestCase):
+    def setUp(self):
+        self.feature_names = ['permission_INTERNET', 'permission_SEND_SMS', 'permission_P000',
+                              'permission_SYSTEM_ALERT_WINDOW', 'permission_READ_SMS']
+        self.critical_features = {'permission_SEND_SMS': 9.0, 'permission_READ_SMS': 9.0,
+                                  'permission_SYSTEM_ALERT_WINDOW': 9.5, 'permission_INTERNET': 4.0,
+                                  'permission_CAMERA': 6.5}
+        self.schema = FeatureSchema(self.feature_names, self.critical_features)
+    
+    def test_critical_columns_sorted_by_weight(self):
+        """Critical columns are ordered by descending weight, ties in column order, absent names dropped"""
+        self.assertEqual(self.schema.critical_names, ['permission_SYSTEM_ALERT_WINDOW', 'permission_SEND_SMS',
+                                                      'permission_READ_SMS', 'permission_INTERNET'])
+        np.testing.assert_array_equal(self.schema.critical_indices, [3, 1, 4, 0])
+        
+        hits = self.schema.critical_hits(np.array([[1, 0, 1, 1, 1], [0, 1, 1, 0, 0]]))
+        np.testing.assert_array_equal(hits, [[True, False, True, True], [False, True, False, False]])
+    
+    def test_dicts_to_matrix_matches_name_lookup(self):
+        """Dict conversion matches a per-name lookup and ignores unknown features"""
+        feature_dicts = [{'permission_SEND_SMS': 1, 'permission_CAMERA': 1, 'unknown': 1},
+                         {}, {'permission_READ_SMS': 1, 'permission_INTERNET': 0}]
+        expected = [[features_dict.get(name, 0) for name in self.feature_names] for features_dict in feature_dicts]
+        
+        np.testing.assert_array_equal(self.schema.dicts_to_matrix(feature_dicts), expected)
+        self.assertEqual(self.schema.dicts_to_matrix([]).shape, (0, 5))
+    
+    def test_encode_dense_packed_and_in_place(self):
+        """Rows are written by name lookup, into a preallocated row or straight into packed bits"""
+        features = {'permission_SEND_SMS': 1, 'permission_READ_SMS': 1, 'permission_CAMERA': 1}
+        expected = self.schema.dicts_to_matrix([features])[0]
+        
+        np.testing.assert_array_equal(self.schema.encode(features), expected)
+        batch = np.ones((2, 5), dtype=np.uint8)
+        self.schema.encode(features, out=batch[1])
+        np.testing.assert_array_equal(batch, [[1] * 5, expected])
+        
+        packed = self.schema.encode_packed(features)
+        self.assertEqual(packed.schema_hash, self.schema.schema_hash)
+        np.testing.assert_array_equal(packed.toarray()[0], expected)
+        
+        # opcode_ shares are kept as fractions, so such schemas are float and cannot be packed
+        mixed = FeatureSchema(self.feature_names + ['opcode_invoke'])
+        self.assertEqual(mixed.encode({'opcode_invoke': 0.25})[-1], 0.25)
+        with self.assertRaises(ValueError):
+            mixed.encode_packed({})
+        
+        self.assertEqual(self.schema.schema_hash, feature_schema_hash(self.feature_names))
+        self.assertNotEqual(mixed.schema_hash, self.schema.schema_hash)
+        with self.assertRaises(ValueError):
+            self.schema.check(mixed.schema_hash)
+
+
+def brute_force_tree_shap(ensemble, x):
+    """Shapley values of the path-dependent expected tree output, by enumerating all coalitions"""
+    def expected_output(node, coalition):
+        if ensemble.left[node] == node:
+            return ensemble.value[node]
+        feature = ensemble.feature[node]
+        left, right = ensemble.left[node], ensemble.right[node]
+        if feature in coalition:
+            goes_left = x[feature] <= ensemble.threshold[node] if ensemble.kind == 'rf' else \
+                x[feature] < ensemble.threshold[node]
+            return expected_output(left if goes_left else right, coalition)
+        return (expected_output(left, coalition) * ensemble.cover[left] +
+                expected_output(right, coalition) * ensemble.cover[right]) / ensemble.cover[node]
+    
+    n_features = len(x)
+    phi = np.zeros(n_features)
+    for root in ensemble.roots:
+        for i in range(n_features):
+            others = [j for j in range(n_features) if j != i]
+            for size in range(n_features):
+                weight = factorial(size) * factorial(n_features - size - 1) / factorial(n_features)
+                for coalition in itertools.combinations(others, size):
+                    phi[i] += weight * (expected_output(root, set(coalition) | {i}) -
+                                        expected_output(root, set(coalition)))
+    return phi / ensemble.n_trees if ensemble.kind == 'rf' else phi
+
+
+class TestTreePathExplainer(unittest.TestCase):
+    def test_matches_brute_force_shapley_values(self):
+        """Vectorized TreeSHAP equals exhaustive Shapley values and adds up to the model output"""
+        from sklearn.ensemble import RandomForestClassifier
+        import xgboost as xgb
+        
+        rng = np.random.RandomState(0)
+        X = rng.randn(200, 4).astype(np.float32)
+        X[:, 3] = X[:, 3] > 0
+        y = (X[:, 0] + X[:, 1] * X[:, 2] + X[:, 3] > 0.3).astype(int)
+        
+        forest = RandomForestClassifier(n_estimators=3, max_depth=5, random_state=0).fit(X, y)
+        booster = xgb.XGBClassifier(n_estimators=3, max_depth=3).fit(X, y)
+        for ensemble in (CompiledTreeEnsemble.from_random_forest(forest), CompiledTreeEnsemble.from_xgboost(booster)):
+            explainer = TreePathExplainer(ensemble)
+            for x in X[:3]:
+                phi = explainer.shap_values(x)
+                np.testing.assert_allclose(phi, brute_force_tree_shap(ensemble, x), atol=1e-10)
+                
+                positive = ensemble.predict_proba(x)[0, 1]
+                output = positive if ensemble.kind == 'rf' else np.log(positive / (1 - positive))
+                self.assertAlmostEqual(explainer.base_value + phi.sum(), output, places=6)
+    
+    def test_float32_thresholds_keep_split_decisions(self):
+        """Rounded-down float32 RF thresholds send values right at the threshold the same way"""
+        from sklearn.ensemble import RandomForestClassifier
+        
+        rng = np.random.RandomState(1)
+        X = rng.randn(300, 3)
+        y = (X[:, 0] + X[:, 1] > 0).astype(int)
+        forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+        ensemble = CompiledTreeEnsemble.from_random_forest(forest)
+        reduced = ensemble.to_float32()
+        
+        # Probe every split at the float32 values around its threshold
+        internal = ensemble.left != np.arange(ensemble.n_nodes)
+        probes = np.repeat(X[:1].astype(np.float32), 3 * internal.sum(), axis=0)
+        thresholds = ensemble.threshold[internal].astype(np.float32)
+        rows = np.arange(len(probes))
+        columns = np.repeat(ensemble.feature[internal], 3)
+        probes[rows, columns] = np.concatenate([
+            np.nextafter(thresholds, -np.inf), thresholds, np.nextafter(thresholds, np.inf)
+        ]).reshape(3, -1).T.ravel()
+        
+        np.testing.assert_array_equal(reduced.apply(probes), ensemble.apply(probes))
+        np.testing.assert_allclose(reduced.predict_proba(probes), ensemble.predict_proba(probes), atol=2 ** -16)
+        
+        loaded = CompiledTreeEnsemble.from_arrays(reduced.to_arrays())
+        self.assertEqual(loaded.precision, 'float32')
+        np.testing.assert_array_equal(loaded.predict_proba(probes), reduced.predict_proba(probes))
+    
+    def test_requires_node_cover(self):
+        """Trees exported without node cover cannot be explained"""
+        ensemble = CompiledTreeEnsemble('rf', [0, 0, 0], [0.5, 0, 0], [1, 1, 2], [2, 1, 2], [0, 0.2, 0.9], [0])
+        with self.assertRaises(ValueError):
+            TreePathExplainer(ensemble)
+
+
+class _CountingClassifier:
+    """Stand-in classifier that counts how often the model is run"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def prepare_features(self, features):
+        if isinstance(features, dict):
+            features = [features.get(f'f{i}', 0) for i in range(4)]
+        return np.asarray(features, dtype=float).reshape(1, -1)
+    
+    def predict_with_explanation(self, features, include_member_probabilities=False):
+        self.calls += 1
+        return {'prediction': 'MALICIOUS', 'risk_score': np.float64(7.5), 'explanation': {'risk_factors': []}}
+
+
+class TestPredictionCache(unittest.TestCase):
+    def setUp(self):
+        self.classifier = _CountingClassifier()
+    
+    def test_hits_on_identical_vectors_per_version(self):
+        """Same vector (any input form) and version hits; another version or vector misses"""
+        cache = PredictionCache()
+        result, cache_hit = cache.predict(self.classifier, 'v0001', [1, 0, 1, 0])
+        self.assertFalse(cache_hit)
+        result['risk_score'] = 0  # callers get copies
+        
+        result, cache_hit = cache.predict(self.classifier, 'v0001', {'f0': 1, 'f2': 1})
+        self.assertTrue(cache_hit)
+        self.assertEqual(result['risk_score'], 7.5)
+        self.assertFalse(cache.predict(self.classifier, 'v0002', [1, 0, 1, 0])[1])
+        self.assertFalse(cache.predict(self.classifier, 'v0001', [1, 0, 1, 1])[1])
+        self.assertFalse(cache.predict(self.classifier, 'v0001', [1, 0, 1, 0], include_member_probabilities=True)[1])
+        self.assertNotEqual(PredictionCache.fingerprint([1, 0, 1, 0]), PredictionCache.fingerprint([1, 0, 1, 0, 0]))
+        
+        self.assertEqual(self.classifier.calls, 4)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 4, 4))
+    
+    def test_size_and_ttl_eviction(self):
+        """Least recently used entries are evicted beyond max_entries, and entries expire after the TTL"""
+        cache = PredictionCache(max_entries=2)
+        for vector in ([1, 0, 0, 0], [0, 1, 0, 0], [1, 0, 0, 0], [0, 0, 1, 0]):
+            cache.predict(self.classifier, 'v0001', vector)
+        self.assertTrue(cache.predict(self.classifier, 'v0001', [1, 0, 0, 0])[1])
+        self.assertFalse(cache.predict(self.classifier, 'v0001', [0, 1, 0, 0])[1])
+        self.assertEqual(cache.stats()['evictions'], 2)
+        
+        cache = PredictionCache(ttl_seconds=0.05)
+        cache.predict(self.classifier, 'v0001', [1, 1, 0, 0])
+        time.sleep(0.1)
+        self.assertFalse(cache.predict(self.classifier, 'v0001', [1, 1, 0, 0])[1])
+        self.assertEqual(cache.stats()['expirations'], 1)
+    
+    def test_disk_cache_is_shared_and_invalidated(self):
+        """A second cache over the same directory reuses results until the version changes"""
+        disk_dir = tempfile.mkdtemp()
+        try:
+            PredictionCache(disk_dir=disk_dir).predict(self.classifier, 'v0001', [0, 1, 1, 0])
+            other = PredictionCache(disk_dir=disk_dir)
+            result, cache_hit = other.predict(self.classifier, 'v0001', [0, 1, 1, 0])
+            self.assertTrue(cache_hit)
+            self.assertEqual(result['risk_score'], 7.5)
+            self.assertEqual(other.stats()['disk_hits'], 1)
+            
+            other.invalidate('v0002')
+            self.assertEqual(os.listdir(disk_dir), [])
+            self.assertFalse(PredictionCache(disk_dir=disk_dir).predict(self.classifier, 'v0001', [0, 1, 1, 0])[1])
+        finally:
+            shutil.rmtree(disk_dir, ignore_errors=True)
+
+
+class TestDatasetCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, 'fullset_train.csv')
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_cache_roundtrip_and_reuse(self):
+        """First load parses the CSV; later loads memory-map the cached arrays"""
+        df = make_synthetic_dataset(self.csv_path, n_samples=40)
+        cache = DatasetCache()
+        
+        X, y, feature_names = cache.load(self.csv_path)
+        self.assertEqual(X.dtype, np.uint8)
+        self.assertEqual(feature_names, df.columns[:-1].tolist())
+        np.testing.assert_array_equal(X, df.drop(['class'], axis=1).values)
+        np.testing.assert_array_equal(y, df['class'].values)
+        
+        entries = [name for name in os.listdir(os.path.join(self.temp_dir, '.cache')) if name != 'index.json']
+        self.assertEqual(len(entries), 1)
+        
+        X_cached, _, _ = cache.load(self.csv_path)
+        self.assertIsInstance(X_cached, np.memmap)
+        np.testing.assert_array_equal(X_cached, X)
+    
+    def test_changed_source_is_reparsed(self):
+        """A modified CSV gets a new cache entry keyed by its hash"""
+        make_synthetic_dataset(self.csv_path, n_samples=40, seed=1)
+        DatasetCache().load(self.csv_path)
+        
+        df = make_synthetic_dataset(self.csv_path, n_samples=30, seed=2)
+        X, y, _ = DatasetCache().load(self.csv_path)
+        self.assertEqual(X.shape[0], 30)
+        np.testing.assert_array_equal(y, df['class'].values)
+
+
+def make_synthetic_dataset(path, n_samples=300, seed=0):
+    """Write a small DroidRL-shaped CSV (583 binary features + class) for training tests"""
+    rng = np.random.RandomState(seed)
+    feature_names = ['permission_SEND_SMS', 'permission_READ_SMS', 'permission_SYSTEM_ALERT_WINDOW',
+                     'permission_INTERNET', 'permission_CAMERA']
+    feature_names += [f'permission_P{i:03d}' for i in range(457 - len(feature_names))]
+    feature_names += [f'intent_I{i:03d}' for i in range(126)]
+    
+    labels = rng.randint(0, 2, n_samples)
+    features = (rng.rand(n_samples, len(feature_names)) < rng.beta(0.3, 3, len(feature_names))).astype(int)
+    for j in range(5):
+        features[:, j] = np.where(labels == 1, rng.rand(n_samples) < 0.7, rng.rand(n_samples) < 0.15)
+    
+    df = pd.DataFrame(features, columns=feature_names)
+    df['class'] = labels
+    df.to_csv(path, index=False)
+    return df
+
+
+class TestTrainedClassifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Train one classifier on a small synthetic dataset for all tests"""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.dataset_path = os.path.join(cls.temp_dir, 'fullset_train.csv')
+        cls.df = make_synthetic_dataset(cls.dataset_path)
+        cls.classifier = BankingAPKClassifier()
+        cls.classifier.train_on_dataset(cls.dataset_path)
+        cls.X = cls.df.drop(['class'], axis=1).values
+    
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+    
+    def test_predict_batch_matches_single(self):
+        """Batch prediction returns the same records as one-at-a-time prediction"""
+        results = self.classifier.predict_batch(self.X[:20])
+        self.assertEqual(len(results), 20)
+        
+        for i, result in enumerate(results):
+            single = self.classifier.predict_with_explanation(self.X[i])
+            self.assertEqual(result['prediction'], single['prediction'])
+            self.assertAlmostEqual(result['risk_score'], single['risk_score'], places=2)
+            self.assertEqual(result['prediction_probabilities'], single['prediction_probabilities'])
+            self.assertEqual(result['explanation'], single['explanation'])
+    
+    def test_predict_batch_accepts_feature_dicts(self):
+        """Batch prediction accepts a list of feature dictionaries"""
+        feature_dicts = [
+            {'permission_SEND_SMS': 1, 'permission_READ_SMS': 1},
+            {'permission_INTERNET': 1}
+        ]
+        results = self.classifier.predict_batch(feature_dicts)
+        
+        self.assertEqual(len(results), 2)
+        for result, feature_dict in zip(results, feature_dicts):
+            self.assertEqual(result, {**self.classifier.predict_with_explanation(feature_dict),
+                                      'processing_time': result['processing_time']})
+    
+    def test_mismatched_feature_layouts_are_rejected(self):
+        """Rows of another width or schema hash are rejected instead of padded; analyzer rows are accepted"""
+        schema = self.classifier.feature_schema
+        for features in (self.X[0][:-3], np.append(self.X[0], 0),
+                         FeatureSchema(self.classifier.feature_names[::-1]).encode_packed({})):
+            with self.assertRaises(ValueError):
+                self.classifier.prepare_features(features)
+            self.assertEqual(self.classifier.predict_with_explanation(features)['prediction'], 'ERROR')
+        
+        features = {'permission_SEND_SMS': 1, 'permission_READ_SMS': 1, 'unknown_feature': 1}
+        packed = StaticAnalyzer().features_to_vector(features, packed=True, feature_schema=schema)
+        self.assertEqual(packed.schema_hash, schema.schema_hash)
+        self.assertEqual(self.classifier.predict_with_explanation(packed)['risk_score'],
+                         self.classifier.predict_with_explanation(features)['risk_score'])
+    
+    def test_predict_batch_accepts_packed_and_sparse(self):
+        """Packed and CSR inputs give the same predictions as dense input"""
+        dense = self.classifier.predict_batch(self.X[:10])
+        packed = PackedFeatures.from_dense(self.X[:10])
+        
+        for results in (self.classifier.predict_batch(packed), self.classifier.predict_batch(packed.tocsr())):
+            self.assertEqual([r['risk_score'] for r in results], [r['risk_score'] for r in dense])
+    
+    def test_single_pass_matches_voting_classifier(self):
+        """Single-pass ensemble inference matches VotingClassifier predict/predict_proba"""
+        X_scaled = self.classifier.scaler.transform(self.X[:50])
+        predictions, prediction_proba, member_probabilities, _ = self.classifier._ensemble_predict(X_scaled)
+        
+        np.testing.assert_allclose(prediction_proba, self.classifier.model.predict_proba(X_scaled))
+        np.testing.assert_array_equal(predictions, self.classifier.model.predict(X_scaled))
+        self.assertEqual(set(member_probabilities), {'rf', 'xgb', 'svm', 'lr'})
+    
+    def test_compiled_trees_match_predict_proba(self):
+        """Compiled RF/XGBoost node arrays reproduce the fitted members' probabilities"""
+        X_scaled = self.classifier.scaler.transform(self.X)
+        
+        for name, compiled in self.classifier._compile_tree_members().items():
+            expected = self.classifier.model.named_estimators_[name].predict_proba(X_scaled)
+            np.testing.assert_allclose(compiled.predict_proba(X_scaled), expected, atol=1e-6)
+    
+    def model_path(self):
+        """Path of a saved copy of the shared trained classifier"""
+        model_path = os.path.join(self.temp_dir, 'model.joblib')
+        if not os.path.exists(model_path):
+            self.classifier.save_model(model_path)
+        return model_path
+    
+    def test_load_model_with_compiled_engine(self):
+        """load_model(inference_engine='compiled') gives the same predictions"""
+        compiled = BankingAPKClassifier()
+        compiled.load_model(self.model_path(), inference_engine='compiled')
+        self.assertEqual(set(compiled.compiled_members), {'rf', 'xgb'})
+        
+        expected = self.classifier.predict_batch(self.X[:25])
+        actual = compiled.predict_batch(self.X[:25])
+        for a, b in zip(actual, expected):
+            self.assertEqual(a['prediction'], b['prediction'])
+            self.assertAlmostEqual(a['risk_score'], b['risk_score'], places=2)
+    
+    def test_serving_artifact_is_memory_mapped(self):
+        """save_model writes a serving artifact whose arrays load memory-mapped"""
+        serving = BankingAPKClassifier()
+        serving.load_serving_model(self.model_path())
+        
+        self.assertTrue(os.path.exists(BankingAPKClassifier.serving_artifact_path(self.model_path())))
+        self.assertIsInstance(serving.serving_members['rf'], CompiledTreeEnsemble)
+        self.assertIsInstance(serving.serving_members['rf'].threshold.base, np.memmap)
+        self.assertIsInstance(serving.scaler.mean_, np.memmap)
+        
+        expected = self.classifier.predict_batch(self.X[:25], include_member_probabilities=True)
+        actual = serving.predict_batch(self.X[:25], include_member_probabilities=True)
+        for a, b in zip(actual, expected):
+            self.assertEqual(a['prediction'], b['prediction'])
+            self.assertAlmostEqual(a['risk_score'], b['risk_score'], places=2)
+            self.assertEqual(set(a['member_probabilities']), set(b['member_probabilities']))
+        
+        with self.assertRaises(ValueError):
+            serving.save_model(os.path.join(self.temp_dir, 'resaved.joblib'))
+    
+    def test_portable_artifact_roundtrip(self):
+        """save_model writes a portable file that reproduces the full model's probabilities"""
+        portable_path = BankingAPKClassifier.portable_artifact_path(self.model_path())
+        self.assertTrue(os.path.exists(portable_path))
+        expected = self.classifier.model.predict_proba(self.classifier.scaler.transform(self.X[:50]))
+        
+        portable = BankingAPKClassifier()
+        portable.load_portable(portable_path)
+        self.assertEqual(portable.feature_names, self.classifier.feature_names)
+        self.assertIsInstance(portable.serving_members['rf'].threshold.base, np.memmap)
+        _, prediction_proba, _, _ = portable._ensemble_predict(portable._scale(self.X[:50]))
+        np.testing.assert_allclose(prediction_proba, expected, atol=1e-6)
+        self.assertEqual(portable.predict_with_explanation(self.X[0])['prediction'],
+                         self.classifier.predict_with_explanation(self.X[0])['prediction'])
+        
+        np.testing.assert_allclose(PortableModel.load(portable_path).predict_proba(self.X[:50]), expected, atol=1e-6)
+    
+    def test_portable_model_loads_without_sklearn(self):
+        """PortableModel loads and predicts in a process that never imports sklearn or xgboost"""
+        script = (
+            "import sys, numpy as np\n"
+            "from models.portable_model import PortableModel\n"
+            "model = PortableModel.load(sys.argv[1])\n"
+            "print(model.predict_proba(np.zeros((2, len(model.feature_names))))[:, 1].tolist())\n"
+            "print('sklearn' in sys.modules or 'xgboost' in sys.modules)\n"
+        )
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        completed = subprocess.run(
+            [sys.executable, '-c', script, BankingAPKClassifier.portable_artifact_path(self.model_path())],
+            cwd=backend_dir, capture_output=True, text=True, check=True
+        )
+        probabilities, imported = completed.stdout.strip().splitlines()
+        
+        expected = self.classifier.model.predict_proba(self.classifier.scaler.transform(np.zeros((2, self.X.shape[1]))))
+        np.testing.assert_allclose(json.loads(probabilities), expected[:, 1], atol=1e-6)
+        self.assertEqual(imported, 'False')
+    
+    def test_portable_approximate_svm_member(self):
+        """The Nystroem + calibrated linear SVM member converts to an equivalent NumPy predictor"""
+        member = BankingAPKClassifier(svm_member='rbf_approx', svm_approx_components=50)._build_svm_member()
+        X_scaled = self.classifier.scaler.transform(self.X)
+        member.fit(X_scaled, self.df['class'].values)
+        
+        portable = member_from_portable(*member_to_portable(member))
+        np.testing.assert_allclose(portable.predict_proba(X_scaled), member.predict_proba(X_scaled), atol=1e-9)
+    
+    def test_export_tree_arrays_roundtrip(self):
+        """Exported node arrays load back into an equivalent compiled ensemble"""
+        paths = self.classifier.export_tree_arrays(os.path.join(self.temp_dir, 'trees'))
+        X_scaled = self.classifier.scaler.transform(self.X[:10])
+        
+        for name, path in paths.items():
+            loaded = CompiledTreeEnsemble.load(path)
+            expected = self.classifier.model.named_estimators_[name].predict_proba(X_scaled)
+            np.testing.assert_allclose(loaded.predict_proba(X_scaled), expected, atol=1e-6)
+    
+    def test_explain_contributions_are_additive_and_cached(self):
+        """Member contributions add up to each member's output and repeat requests hit the cache"""
+        contributions = self.classifier._compute_contributions(self.X[:1].astype(float))
+        self.assertEqual(set(contributions['members']), {'rf', 'xgb', 'lr'})
+        self.assertEqual(contributions['unexplained_members'], ['svm'])
+        
+        X_scaled = self.classifier.scaler.transform(self.X[:1])
+        members = self.classifier.model.named_estimators_
+        rf_output = members['rf'].predict_proba(X_scaled)[0, 1]
+        xgb_output = members['xgb'].predict(X_scaled, output_margin=True)[0]
+        lr_output = members['lr'].decision_function(X_scaled)[0]
+        for name, expected in (('rf', rf_output), ('xgb', xgb_output), ('lr', lr_output)):
+            _, base_value, phi = contributions['members'][name]
+            self.assertAlmostEqual(base_value + phi.sum(), expected, places=5)
+        
+        classifier = BankingAPKClassifier()
+        classifier.load_serving_model(self.model_path())
+        first = classifier.explain_contributions(self.X[0], top_k=5)
+        second = classifier.explain_contributions(self.X[0], top_k=5)
+        self.assertFalse(first['cached'])
+        self.assertTrue(second['cached'])
+        self.assertEqual(len(first['members']['rf']['contributions']), 5)
+        self.assertAlmostEqual(first['members']['xgb']['output'], xgb_output, places=4)
+        self.assertEqual(first['members'], second['members'])
+    
+    def test_float32_precision_agrees_with_float64(self):
+        """Reduced-precision inference stores float32 parameters and reproduces float64 predictions"""
+        reduced = BankingAPKClassifier(precision='float32')
+        reduced.load_serving_model(self.model_path())
+        self.assertEqual(reduced.reduced_members['rf'].threshold.dtype, np.float32)
+        self.assertEqual(reduced.reduced_members['rf'].value.dtype, np.uint16)
+        self.assertEqual(reduced.reduced_members['lr'].coef_.dtype, np.float32)
+        
+        X_scaled = self.classifier.scaler.transform(self.X)
+        expected = self.classifier._ensemble_predict(X_scaled)
+        actual = reduced._ensemble_predict(reduced._scale(self.X))
+        np.testing.assert_array_equal(actual[0], expected[0])
+        np.testing.assert_allclose(actual[1], expected[1], atol=1e-5)
+        
+        for name in ('rf', 'xgb'):
+            compiled = reduced.serving_members[name]
+            np.testing.assert_array_equal(compiled.to_float32().apply(X_scaled), compiled.apply(X_scaled))
+        
+        reduced.set_precision('float64')
+        self.assertIsNone(reduced.reduced_members)
+    
+    def test_cascade_escalates_only_uncertain_rows(self):
+        """Cascade mode decides confident rows with LR and escalates the rest to the full ensemble"""
+        X_scaled = self.classifier.scaler.transform(self.X)
+        lr_proba = self.classifier.model.named_estimators_['lr'].predict_proba(X_scaled)[:, 1]
+        full_proba = self.classifier.model.predict_proba(X_scaled)
+        
+        self.classifier.set_cascade(0.2, 0.8)
+        try:
+            _, prediction_proba, _, stages = self.classifier._ensemble_predict(X_scaled)
+            results = self.classifier.predict_batch(self.X[:5])
+        finally:
+            self.classifier.set_cascade(None)
+        
+        uncertain = (lr_proba > 0.2) & (lr_proba < 0.8)
+        np.testing.assert_array_equal(stages == 'ensemble', uncertain)
+        np.testing.assert_allclose(prediction_proba[uncertain], full_proba[uncertain])
+        np.testing.assert_allclose(prediction_proba[~uncertain, 1], lr_proba[~uncertain])
+        self.assertTrue(all(result['decision_stage'] in ('lr', 'ensemble') for result in results))
+        self.assertNotIn('decision_stage', self.classifier.predict_with_explanation(self.X[0]))
+    
+    def test_cascade_escalating_every_row_matches_full_ensemble(self):
+        """A single escalated row and an all-escalated batch are scored by every member, not over NaNs"""
+        expected = self.classifier.predict_batch(self.X[:3])
+        self.classifier.set_cascade(0.0, 1.0)
+        try:
+            single = self.classifier.predict_with_explanation(self.X[0], include_member_probabilities=True)
+            batch = self.classifier.predict_batch(self.X[:3])
+        finally:
+            self.classifier.set_cascade(None)
+        
+        self.assertEqual(single['decision_stage'], 'ensemble')
+        self.assertEqual(single['risk_score'], expected[0]['risk_score'])
+        self.assertEqual(set(single['member_probabilities']), set(self.classifier.model.named_estimators_))
+        self.assertEqual([r['risk_score'] for r in batch], [r['risk_score'] for r in expected])
+        self.assertTrue(all(r['decision_stage'] == 'ensemble' for r in batch))
+    
+    def test_train_with_kernel_approximation_member(self):
+        """Ensemble trains and predicts with the Nystroem SVM member"""
+        classifier = BankingAPKClassifier(svm_member='rbf_approx', svm_approx_components=50)
+        accuracy = classifier.train_on_dataset(self.dataset_path)
+        
+        self.assertGreater(accuracy, 0.5)
+        result = classifier.predict_with_explanation(self.X[0], include_member_probabilities=True)
+        self.assertIn('svm', result['member_probabilities'])
+    
+    def test_feature_selection_keeps_budget_and_persists(self):
+        """Feature selection trains on the retained columns, saves them and accepts full-width input"""
+        classifier = BankingAPKClassifier(min_feature_frequency=0.01, feature_budget=40)
+        classifier.train_on_dataset(self.dataset_path)
+        
+        self.assertEqual(len(classifier.feature_names), 40)
+        self.assertEqual(classifier.feature_selection['source_features'], self.X.shape[1])
+        self.assertIn('permission_SEND_SMS', classifier.feature_names)
+        self.assertEqual(classifier.feature_names,
+                         [classifier.source_feature_names[i] for i in classifier.selected_columns])
+        
+        # Full-width rows are reduced to the retained columns, not truncated
+        reduced = self.X[:20][:, classifier.selected_columns]
+        full_results = classifier.predict_batch(self.X[:20])
+        self.assertEqual([r['risk_score'] for r in full_results],
+                         [r['risk_score'] for r in classifier.predict_batch(reduced)])
+        
+        model_path = os.path.join(self.temp_dir, 'selected_model.joblib')
+        classifier.save_model(model_path)
+        for load in ('load_model', 'load_serving_model'):
+            reloaded = BankingAPKClassifier()
+            getattr(reloaded, load)(model_path)
+            self.assertEqual(reloaded.feature_names, classifier.feature_names)
+            np.testing.assert_array_equal(reloaded.selected_columns, classifier.selected_columns)
+            self.assertEqual([r['risk_score'] for r in reloaded.predict_batch(self.X[:20])],
+                             [r['risk_score'] for r in full_results])
+        
+        # The analyzer only extracts the retained features, in the model's column order
+        apk_path = os.path.join(self.temp_dir, 'app.apk')
+        with zipfile.ZipFile(apk_path, 'w') as apk:
+            apk.writestr(MANIFEST_ENTRY, encode_binary_manifest('com.bank.app', ['android.permission.SEND_SMS']))
+        analyzer = StaticAnalyzer()
+        features = analyzer.extract_features(apk_path, feature_names=classifier.feature_names)
+        self.assertTrue(set(features) <= set(classifier.feature_names))
+        vector = analyzer.features_to_vector(features, feature_schema=classifier.feature_schema)
+        self.assertEqual(vector.shape, (40,))
+        self.assertEqual(vector[classifier.feature_schema.index['permission_SEND_SMS']],
+                         features['permission_SEND_SMS'])
+    
+    def test_cross_validation_is_optional_and_saved(self):
+        """CV only runs on request, in parallel folds, and its metrics persist with the artifact"""
+        self.assertIsNone(self.classifier.cv_metrics)
+        
+        classifier = BankingAPKClassifier()
+        classifier.load_model(self.model_path())
+        cv_metrics = classifier.run_cross_validation(self.dataset_path, cv_folds=3, cv_jobs=2)
+        
+        self.assertEqual(len(cv_metrics['folds']), 3)
+        self.assertGreater(cv_metrics['mean']['accuracy'], 0.5)
+        
+        model_path = os.path.join(self.temp_dir, 'cv_model.joblib')
+        classifier.save_model(model_path)
+        reloaded = BankingAPKClassifier()
+        reloaded.load_model(model_path)
+        self.assertEqual(reloaded.cv_metrics['mean'], cv_metrics['mean'])
+    
+    def test_member_probabilities_optional(self):
+        """Per-member probabilities are only returned when requested"""
+        result = self.classifier.predict_with_explanation(self.X[0])
+        self.assertNotIn('member_probabilities', result)
+        
+        result = self.classifier.predict_with_explanation(self.X[0], include_member_probabilities=True)
+        self.assertEqual(set(result['member_probabilities']), {'rf', 'xgb', 'svm', 'lr'})
+        for member in result['member_probabilities'].values():
+            self.assertAlmostEqual(member['legitimate'] + member['malicious'], 100.0, places=0)
+    
+    def test_incremental_update_reports_before_swapping(self):
+        """Incremental updates score current vs candidate first and only swap when accepted"""
+        classifier = BankingAPKClassifier()
+        classifier.load_model(self.model_path())
+        current_model = classifier.model
+        n_trees = len(current_model.named_estimators_['xgb'].get_booster().get_dump())
+        
+        new_df = make_synthetic_dataset(os.path.join(self.temp_dir, 'new_samples.csv'), n_samples=60, seed=1)
+        new_X, new_y = new_df.drop(['class'], axis=1).values, new_df['class'].values
+        
+        report = classifier.incremental_update(new_X, new_y, xgb_rounds=5, rf_refresh_trees=10, apply=False)
+        self.assertFalse(report['swapped'])
+        self.assertIs(classifier.model, current_model)
+        self.assertEqual(set(report['metrics']['candidate']), {'new_samples', 'reference', 'combined'})
+        self.assertEqual(report['metrics']['candidate']['new_samples']['samples'], report['holdout_samples'])
+        
+        report = classifier.incremental_update(new_X, new_y, xgb_rounds=5, rf_refresh_trees=10, max_accuracy_drop=1.0)
+        self.assertTrue(report['swapped'])
+        self.assertIsNot(classifier.model, current_model)
+        self.assertEqual(len(classifier.model.named_estimators_['xgb'].get_booster().get_dump()), n_trees + 5)
+        self.assertEqual(len(current_model.named_estimators_['xgb'].get_booster().get_dump()), n_trees)
+        self.assertEqual(len(classifier.model.named_estimators_['rf'].estimators_), 300)
+        self.assertIn(classifier.predict_with_explanation(self.X[0])['prediction'], ('LEGITIMATE', 'MALICIOUS'))
+        
+        model_path = os.path.join(self.temp_dir, 'updated_model.joblib')
+        classifier.save_model(model_path)
+        reloaded = BankingAPKClassifier()
+        reloaded.load_model(model_path)
+        self.assertEqual(len(reloaded.update_history), 1)
+        self.assertEqual(len(reloaded.update_window[1]), len(classifier.update_window[1]))
+
+
+class TestModelRegistry(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Train one small classifier to publish as registry versions"""
+        cls.temp_dir = tempfile.mkdtemp()
+        dataset_path = os.path.join(cls.temp_dir, 'fullset_train.csv')
+        cls.X = make_synthetic_dataset(dataset_path, n_samples=200).drop(['class'], axis=1).values
+        cls.classifier = BankingAPKClassifier()
+        cls.classifier.train_on_dataset(dataset_path)
+    
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+    
+    def setUp(self):
+        self.registry = ModelRegistry(tempfile.mkdtemp(dir=self.temp_dir))
+    
+    def test_publish_records_metadata(self):
+        """Published versions carry accuracy, schema hash and training time"""
+        version = self.registry.publish(self.classifier, note='baseline')
+        metadata = self.registry.get_metadata(version)
+        
+        self.assertEqual(version, 'v0001')
+        self.assertEqual(metadata['accuracy'], self.classifier.training_metrics['accuracy'])
+        self.assertEqual(metadata['feature_schema_hash'], feature_schema_hash(self.classifier.feature_names))
+        self.assertIsNotNone(metadata['training_seconds'])
+        self.assertEqual(metadata['note'], 'baseline')
+        self.assertTrue(os.path.exists(BankingAPKClassifier.serving_artifact_path(self.registry.model_path(version))))
+        self.assertIsNone(self.registry.active_version())
+        
+        with self.assertRaises(ValueError):
+            self.registry.get_metadata('../v0001')
+    
+    def test_activate_and_rollback(self):
+        """Activation keeps a history that rollback walks back through"""
+        first = self.registry.publish(self.classifier, activate=True)
+        second = self.registry.publish(self.classifier, activate=True)
+        
+        self.assertEqual(self.registry.active_version(), second)
+        self.assertEqual([m['active'] for m in self.registry.list_versions()], [False, True])
+        self.assertEqual(self.registry.rollback(), first)
+        self.assertEqual(self.registry.active_version(), first)
+        with self.assertRaises(ValueError):
+            self.registry.rollback()
+    
+    def test_hot_swap_keeps_in_flight_reference(self):
+        """A swap replaces the serving model without touching references already handed out"""
+        first = self.registry.publish(self.classifier, activate=True)
+        second = self.registry.publish(self.classifier)
+        manager = ModelManager(self.registry)
+        manager.load_active(wait=True)
+        
+        in_flight_version, in_flight = manager.snapshot()
+        manager.load_version(second).join()
+        
+        self.assertEqual(in_flight_version, first)
+        self.assertEqual(manager.current_version(), second)
+        self.assertEqual(self.registry.active_version(), second)
+        self.assertIsNot(manager.current(), in_flight)
+        self.assertIn(in_flight.predict_with_explanation(self.X[0])['prediction'], ('LEGITIMATE', 'MALICIOUS'))
+        
+        # Rollback swaps back to the copy still held in memory
+        self.assertEqual(manager.rollback(), first)
+        self.assertIs(manager.current(), in_flight)
+        self.assertEqual(self.registry.active_version(), first)
+    
+    def test_swap_invalidates_prediction_cache(self):
+        """Cached results are keyed by version and dropped whenever the serving model changes"""
+        first = self.registry.publish(self.classifier, activate=True)
+        second = self.registry.publish(self.classifier)
+        cache = PredictionCache()
+        manager = ModelManager(self.registry, on_swap=cache.invalidate)
+        manager.load_active(wait=True)
+        
+        self.assertFalse(cache.predict(*reversed(manager.snapshot()), self.X[0])[1])
+        self.assertTrue(cache.predict(*reversed(manager.snapshot()), self.X[0])[1])
+        
+        manager.load_version(second, wait=True)
+        self.assertEqual(cache.stats()['entries'], 0)
+        result, cache_hit = cache.predict(*reversed(manager.snapshot()), self.X[0])
+        self.assertFalse(cache_hit)
+        self.assertEqual(result['prediction'], self.classifier.predict_with_explanation(self.X[0])['prediction'])
+        
+        manager.rollback()
+        self.assertEqual(manager.current_version(), first)
+        self.assertEqual(cache.stats()['entries'], 0)
+    
+    def test_failed_load_keeps_serving_version(self):
+        """A version that fails to load or warm up is never swapped in"""
+        first = self.registry.publish(self.classifier, activate=True)
+        second = self.registry.publish(self.classifier)
+        self.registry.update_metadata(second, feature_schema_hash='mismatch')
+        manager = ModelManager(self.registry)
+        manager.load_active(wait=True)
+        
+        manager.load_version(second).join()
+        
+        self.assertEqual(manager.current_version(), first)
+        self.assertEqual(self.registry.active_version(), first)
+        self.assertEqual(manager.status()['pending']['state'], 'failed')
+
+    
+    def test_start_imports_legacy_artifact_without_training(self):
+        """Startup imports an existing artifact into an empty registry in the background"""
+        legacy_path = os.path.join(self.registry.root_dir, 'bankguard_model.joblib')
+        self.classifier.save_model(legacy_path)
+        manager = ModelManager(self.registry, warmup_batch_sizes=(1, 4), import_path=legacy_path)
+        
+        self.assertFalse(manager.readiness()['ready'])
+        manager.start().join()
+        
+        self.assertTrue(manager.is_ready())
+        self.assertEqual(manager.readiness()['state'], 'ready')
+        self.assertEqual(manager.readiness()['last_load']['warmup_batch_sizes'], [1, 4])
+        self.assertEqual(self.registry.get_metadata(manager.current_version())['imported_from'],
+                         os.path.abspath(legacy_path))
+        self.assertIsNone(manager.start())
+    
+    def test_start_without_model_never_trains(self):
+        """With nothing to load, startup reports no_model instead of training"""
+        manager = ModelManager(self.registry, import_path=os.path.join(self.temp_dir, 'missing.joblib'))
+        manager.start().join()
+        
+        start = time.time()
+        self.assertEqual(manager.wait_until_ready(timeout=30), (None, None))
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(manager.readiness()['state'], 'no_model')
+        self.assertEqual(self.registry.list_versions(), [])
+
+class TestTrainingJobs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.temp_dir, 'fullset_train.csv')
+        make_synthetic_dataset(self.dataset_path, n_samples=200)
+        self.registry = ModelRegistry(os.path.join(self.temp_dir, 'trained_models'))
+        self.published = []
+        self.jobs = TrainingJobManager(self.registry, on_published=self.published.append)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_job_reports_phases_and_publishes(self):
+        """A training job runs in its own process, reports each phase and publishes a version"""
+        job_id = self.jobs.submit(self.dataset_path)
+        with self.assertRaises(RuntimeError):
+            self.jobs.submit(self.dataset_path)
+        
+        state = self.jobs.wait(job_id, timeout=120)
+        
+        self.assertEqual(state['status'], 'succeeded', state['error'])
+        self.assertEqual([phase['name'] for phase in state['phases']], [
+            'loading', 'scaling', 'fitting_rf', 'fitting_xgb', 'fitting_svm', 'fitting_lr', 'evaluating', 'publishing'
+        ])
+        self.assertTrue(all(phase['elapsed_seconds'] >= 0 for phase in state['phases']))
+        self.assertEqual(self.registry.get_metadata(state['result']['version'])['training_job'], job_id)
+        self.assertEqual([job['job_id'] for job in self.jobs.list()], [job_id])
+        
+        for _ in range(50):
+            if self.published:
+                break
+            time.sleep(0.1)
+        self.assertEqual(self.published, [state['result']['version']])
+    
+    def test_cancelled_job_publishes_nothing(self):
+        """Cancelling stops the training process and no version is published"""
+        job_id = self.jobs.submit(self.dataset_path)
+        start = time.time()
+        self.assertTrue(self.jobs.cancel(job_id)['cancel_requested'])
+        self.assertLess(time.time() - start, 1)
+        
+        self.assertEqual(self.jobs.wait(job_id, timeout=60)['status'], 'cancelled')
+        self.assertEqual(self.registry.list_versions(), [])
+        self.assertEqual(self.published, [])
+        with self.assertRaises(ValueError):
+            self.jobs.get('../registry')
+
+
+    def test_publishing_job_is_not_cancelled(self):
+        """A job in its publishing phase is left to finish; stale staging directories are swept"""
+        job_id = 'abc123'
+        os.makedirs(self.jobs.jobs_dir)
+        state_path = os.path.join(self.jobs.jobs_dir, f'{job_id}.json')
+        with open(state_path, 'w') as f:
+            json.dump({'job_id': job_id, 'status': 'running', 'phase': 'publishing', 'phases': [],
+                       'submitted_at': 'now'}, f)
+        process = mock.Mock()
+        process.poll.return_value = None
+        self.jobs._processes[job_id] = process
+        
+        self.assertEqual(self.jobs.cancel(job_id)['status'], 'running')
+        process.terminate.assert_not_called()
+        
+        # A publisher killed mid-save leaves its staging directory behind
+        os.makedirs(os.path.join(self.registry.versions_dir, '.staging-999999999-dead'))
+        os.makedirs(os.path.join(self.registry.versions_dir, f'.staging-{os.getpid()}-live'))
+        self.registry._sweep_staging()
+        self.assertEqual(os.listdir(self.registry.versions_dir), [f'.staging-{os.getpid()}-live'])
+
+
+class TestHyperparameterSearch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        df = make_synthetic_dataset(os.path.join(self.temp_dir, 'fullset_train.csv'), n_samples=200)
+        self.X = df.drop(['class'], axis=1).values.astype(np.uint8)
+        self.y = df['class'].values
+        self.feature_names = df.columns[:-1].tolist()
+        self.checkpoint_path = os.path.join(self.temp_dir, 'search.json')
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def search(self, **kwargs):
+        return SuccessiveHalvingSearch(self.checkpoint_path, n_candidates=4, eta=2, n_jobs=2, latency_samples=10,
+                                       classifier_kwargs={'svm_member': 'rbf_approx', 'svm_approx_components': 20},
+                                       **kwargs)
+    
+    def test_search_halves_candidates_and_resumes(self):
+        """Each rung keeps the best 1/eta candidates, and a rerun only fits what the checkpoint lacks"""
+        state = self.search().run(self.X, self.y, self.feature_names, progress=lambda message: None)
+        
+        self.assertEqual(state['candidates'][0], BASELINE_PARAMS)
+        self.assertEqual([len(rung['results']) for rung in state['rungs']], [4, 2])
+        best = state['best']
+        self.assertEqual(best['score'], max(r['score'] for r in state['rungs'][-1]['results'].values()))
+        self.assertAlmostEqual(best['score'], best['accuracy'] - 0.002 * best['latency_ms'])
+        
+        # Drop one final-rung result: only that candidate is refitted on resume
+        with open(self.checkpoint_path) as f:
+            checkpoint = json.load(f)
+        dropped, kept = list(checkpoint['rungs'][-1]['results'])
+        del checkpoint['rungs'][-1]['results'][dropped]
+        with open(self.checkpoint_path, 'w') as f:
+            json.dump(checkpoint, f)
+        
+        resumed = self.search().run(self.X, self.y, self.feature_names, progress=lambda message: None)
+        self.assertEqual(resumed['rungs'][0]['results'], state['rungs'][0]['results'])
+        self.assertEqual(resumed['rungs'][-1]['results'][kept], state['rungs'][-1]['results'][kept])
+        self.assertEqual(resumed['rungs'][-1]['results'][dropped]['accuracy'],
+                         state['rungs'][-1]['results'][dropped]['accuracy'])
+        
+        with self.assertRaises(ValueError):
+            self.search(latency_weight=0.01).run(self.X, self.y, self.feature_names)
+        
+        classifier = BankingAPKClassifier(ensemble_params=best['params'])
+        self.assertEqual(classifier.model.get_params()['rf__n_estimators'], best['params']['rf__n_estimators'])
+
 if __name__ == '__main__':
     unittest.main()
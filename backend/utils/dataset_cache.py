@@ -0,0 +1,169 @@
+# 📄 backend/utils/dataset_cache.py - Binary Dataset Cache
+# ================================================================================
+
+import os
+import json
+import hashlib
+import shutil
+import tempfile
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+
+
+def read_droidrl_csv(csv_path):
+    """Parse a DroidRL CSV into a uint8 feature matrix, label vector, feature names and label column"""
+    columns = pd.read_csv(csv_path, nrows=0).columns.tolist()
+
+    # DroidRL dataset has 'class' column: 0=benign, 1=malware
+    if 'class' in columns:
+        label_column = 'class'
+    elif 'label' in columns:
+        label_column = 'label'
+    else:
+        # Assume last column is label
+        label_column = columns[-1]
+    feature_names = [column for column in columns if column != label_column]
+
+    # Parse features straight into uint8 so no int64 copy of the matrix is built
+    df = pd.read_csv(csv_path, dtype={name: np.uint8 for name in feature_names})
+    X = df[feature_names].to_numpy()
+    y = df[label_column].to_numpy()
+
+    return X, y, feature_names, label_column
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """Cache parsed DroidRL CSVs as memory-mappable .npy arrays plus a schema file
+
+    Entries are keyed by the SHA-256 of the source CSV, so an edited or replaced
+    file is re-parsed automatically. The hash itself is remembered per path
+    together with the file size and mtime, so unchanged files are not re-hashed.
+
+    Layout (cache_dir defaults to <csv dir>/.cache):
+        <cache_dir>/index.json                    path -> size, mtime, sha256
+        <cache_dir>/<csv stem>-<sha256[:16]>/     one entry per source version
+            features.npy   uint8 (n_samples, n_features)
+            labels.npy     labels
+            schema.json    feature names, label column, source hash
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+
+    def load(self, csv_path, mmap_mode='r'):
+        """Return (X, y, feature_names) for a CSV, building the cache entry on first use"""
+        cache_dir = self._cache_dir_for(csv_path)
+        sha256 = self._source_hash(csv_path, cache_dir)
+        entry_dir = os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(csv_path))[0]}-{sha256[:16]}")
+
+        cached = self._read_entry(entry_dir, sha256, mmap_mode)
+        if cached is not None:
+            logger.info(f"⚡ Dataset loaded from cache: {entry_dir}")
+            return cached
+
+        X, y, feature_names, label_column = read_droidrl_csv(csv_path)
+        try:
+            self._write_entry(entry_dir, csv_path, sha256, X, y, feature_names, label_column)
+            logger.info(f"💾 Dataset cached: {entry_dir}")
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write dataset cache {entry_dir}: {str(e)}")
+            return X, y, feature_names
+
+        # Hand back memory-mapped arrays so first and later loads behave the same
+        return self._read_entry(entry_dir, sha256, mmap_mode) or (X, y, feature_names)
+
+    def _cache_dir_for(self, csv_path):
+        return self.cache_dir or os.path.join(os.path.dirname(os.path.abspath(csv_path)), '.cache')
+
+    def _source_hash(self, csv_path, cache_dir):
+        """SHA-256 of the CSV, reusing the indexed hash when size and mtime are unchanged"""
+        index_path = os.path.join(cache_dir, 'index.json')
+        source = os.path.abspath(csv_path)
+        stat = os.stat(source)
+
+        index = {}
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+
+        known = index.get(source)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['sha256']
+
+        sha256 = file_sha256(source)
+        index[source] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._atomic_write_json(index_path, index)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not update dataset cache index: {str(e)}")
+        return sha256
+
+    def _read_entry(self, entry_dir, sha256, mmap_mode):
+        schema_path = os.path.join(entry_dir, 'schema.json')
+        if not os.path.exists(schema_path):
+            return None
+
+        try:
+            with open(schema_path, 'r') as f:
+                schema = json.load(f)
+            if schema.get('format_version') != CACHE_FORMAT_VERSION or schema.get('source_sha256') != sha256:
+                return None
+
+            X = np.load(os.path.join(entry_dir, 'features.npy'), mmap_mode=mmap_mode)
+            y = np.load(os.path.join(entry_dir, 'labels.npy'), mmap_mode=mmap_mode)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable dataset cache {entry_dir}: {str(e)}")
+            return None
+
+        return X, y, schema['feature_names']
+
+    def _write_entry(self, entry_dir, csv_path, sha256, X, y, feature_names, label_column):
+        """Write the entry into a temporary directory and rename it into place"""
+        os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix='.staging-', dir=os.path.dirname(entry_dir))
+        try:
+            os.chmod(staging_dir, 0o755)
+            np.save(os.path.join(staging_dir, 'features.npy'), np.ascontiguousarray(X, dtype=np.uint8))
+            np.save(os.path.join(staging_dir, 'labels.npy'), np.ascontiguousarray(y))
+            with open(os.path.join(staging_dir, 'schema.json'), 'w') as f:
+                json.dump({
+                    'format_version': CACHE_FORMAT_VERSION,
+                    'source': os.path.abspath(csv_path),
+                    'source_sha256': sha256,
+                    'n_samples': int(X.shape[0]),
+                    'feature_names': feature_names,
+                    'label_column': label_column,
+                    'feature_dtype': 'uint8',
+                    'created': datetime.now().isoformat()
+                }, f)
+
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir)
+            os.replace(staging_dir, entry_dir)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def _atomic_write_json(self, path, data):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, path)
@@ -0,0 +1,80 @@
+# 📄 backend/utils/feature_packing.py - Compact Binary Feature Storage
+# ================================================================================
+
+import numpy as np
+from scipy import sparse
+
+
+class PackedFeatures:
+    """Bit-packed binary feature matrix (8 DroidRL features per byte)
+
+    DroidRL permission and intent features are 0/1, so a row of 583 features
+    fits in 73 bytes instead of 4.6KB as int64. Rows are packed with
+    np.packbits along the feature axis; unpacking restores a dense uint8 matrix.
+    schema_hash, when set, names the column layout the rows were built for
+    (see models.feature_schema).
+    """
+
+    def __init__(self, packed, n_features, schema_hash=None):
+        """Wrap an already packed (n_samples, ceil(n_features / 8)) uint8 array"""
+        packed = np.asarray(packed, dtype=np.uint8)
+        if packed.ndim == 1:
+            packed = packed.reshape(1, -1)
+        if packed.shape[1] != (n_features + 7) // 8:
+            raise ValueError(f"Packed width {packed.shape[1]} does not match {n_features} features")
+
+        self.packed = packed
+        self.n_features = n_features
+        self.schema_hash = schema_hash
+
+    @classmethod
+    def from_dense(cls, matrix):
+        """Pack a dense binary matrix (any numeric dtype, values 0/1)"""
+        matrix = np.asarray(matrix)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.dtype != np.bool_:
+            matrix = matrix != 0
+        return cls(np.packbits(matrix, axis=1), matrix.shape[1])
+
+    @classmethod
+    def from_indices(cls, rows, n_features):
+        """Pack rows given as iterables of set column indices"""
+        rows = list(rows)
+        matrix = np.zeros((len(rows), n_features), dtype=np.bool_)
+        for i, indices in enumerate(rows):
+            matrix[i, list(indices)] = True
+        return cls.from_dense(matrix)
+
+    @property
+    def shape(self):
+        return (self.packed.shape[0], self.n_features)
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+    def __len__(self):
+        return self.packed.shape[0]
+
+    def take(self, rows):
+        """Select a subset of rows without unpacking"""
+        return PackedFeatures(self.packed[rows], self.n_features, self.schema_hash)
+
+    def toarray(self, dtype=np.uint8):
+        """Unpack to a dense (n_samples, n_features) matrix"""
+        dense = np.unpackbits(self.packed, axis=1, count=self.n_features)
+        return dense if dtype == np.uint8 else dense.astype(dtype)
+
+    def tocsr(self):
+        """Unpack to a scipy CSR matrix (uint8 data)"""
+        return sparse.csr_matrix(np.unpackbits(self.packed, axis=1, count=self.n_features))
+
+
+def to_dense_features(features):
+    """Return a dense 2-D matrix for packed, sparse or array-like feature input"""
+    if isinstance(features, PackedFeatures):
+        return features.toarray()
+    if sparse.issparse(features):
+        return features.toarray()
+    return np.asarray(features)
@@ -53,6 +53,7 @@ class ForensicReportGenerator:
                     'permission_features': 457,
                     'intent_features': 126,
                     'prediction_breakdown': prediction_result.get('prediction_probabilities', {}),
+                    'member_breakdown': prediction_result.get('member_probabilities', {}),
                     'model_confidence': prediction_result['confidence'],
                     'ensemble_weights': {
                         'random_forest': '35%',
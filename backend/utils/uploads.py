@@ -0,0 +1,139 @@
+# 📄 backend/utils/uploads.py - Spooled, Hashed Upload Buffers
+# ================================================================================
+
+import io
+import os
+import time
+import hashlib
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+UPLOAD_MEMORY_LIMIT = 8 * 1024 * 1024
+SCRATCH_PREFIX = 'upload_'
+
+
+class SpooledUpload:
+    """Writable, seekable upload buffer that hashes what is written to it
+
+    Uploads up to max_memory_bytes stay in memory and are handed to zipfile
+    as they are; a larger upload spills to a file in scratch_dir that is
+    deleted when the buffer is closed (path is then set, so multidex parsing
+    can share it with worker processes). The SHA-256 is computed as the
+    bytes arrive, which assumes sequential writes, as multipart parsing does.
+    """
+
+    def __init__(self, scratch_dir, max_memory_bytes=UPLOAD_MEMORY_LIMIT):
+        self.scratch_dir = scratch_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.path = None
+        self.size = 0
+        self._file = io.BytesIO()
+        self._digest = hashlib.sha256()
+
+    @property
+    def sha256(self):
+        return self._digest.hexdigest()
+
+    @property
+    def in_memory(self):
+        return self.path is None
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def write(self, data):
+        self._digest.update(data)
+        self.size += len(data)
+        if self.path is None and self.size > self.max_memory_bytes:
+            self._spill()
+        return self._file.write(data)
+
+    def _spill(self):
+        os.makedirs(self.scratch_dir, exist_ok=True)
+        spill = tempfile.NamedTemporaryFile(prefix=SCRATCH_PREFIX, suffix='.apk', dir=self.scratch_dir)
+        try:
+            spill.write(self._file.getbuffer())
+        except BaseException:
+            spill.close()
+            raise
+        self._file.close()
+        self._file = spill
+        self.path = spill.name
+
+    def source(self):
+        """What to open the APK from: the spill file path, or the in-memory buffer rewound"""
+        self._file.flush()
+        self._file.seek(0)
+        return self.path if self.path is not None else self._file
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def readline(self, size=-1):
+        return self._file.readline(size)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def close(self):
+        """Release the buffer (a spill file is deleted)"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def spool_upload(stream, scratch_dir, max_memory_bytes=UPLOAD_MEMORY_LIMIT, chunk_size=UPLOAD_CHUNK_BYTES):
+    """Copy a stream into a SpooledUpload (hashing it on the way), rewound for reading"""
+    upload = SpooledUpload(scratch_dir, max_memory_bytes)
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            upload.write(chunk)
+    except BaseException:
+        upload.close()
+        raise
+    upload.seek(0)
+    return upload
+
+
+def purge_scratch_dir(scratch_dir, max_age_seconds=3600):
+    """Remove spill files left in scratch_dir by processes that were killed mid-request"""
+    if not os.path.isdir(scratch_dir):
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(scratch_dir):
+        try:
+            if entry.name.startswith(SCRATCH_PREFIX) and entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove stale upload {entry.path}: {str(e)}")
+    if removed:
+        logger.info(f"🧹 Removed {removed} stale uploads from {scratch_dir}")
+    return removed